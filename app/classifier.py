@@ -0,0 +1,144 @@
+from collections import namedtuple
+import numpy as np
+
+# Resultado por mano: etiqueta ganadora (o None), su índice en `labels`
+# (-1 si la mano no tiene candidatos), distancia al prototipo más cercano,
+# distancia relativa a su umbral (inf sin candidatos) y si queda por debajo
+# del umbral.
+Classification = namedtuple(
+    "Classification", ["labels", "label_ids", "distances", "ratios", "accepted"]
+)
+
+# Filas de prototipos comparadas por bloque; acota la memoria de la búsqueda.
+BLOCK_ROWS = 4096
+
+
+def best_ratios(labels, ratios, result=None):
+    """
+    {etiqueta: menor ratio} de un grupo de manos (las de etiqueta None se
+    ignoran). Con `result`, lo actualiza en lugar de crear uno nuevo.
+    """
+    result = {} if result is None else result
+    for label, ratio in zip(labels, ratios):
+        if label is not None:
+            result[label] = min(ratio, result.get(label, ratio))
+    return result
+
+
+class PrototypeIndex:
+    """
+    Índice de búsqueda del prototipo más cercano por fuerza bruta en bloques.
+    Guarda los prototipos apilados en una matriz float32 (R, D) junto con sus
+    normas al cuadrado, la etiqueta de cada fila y su umbral, de modo que una
+    consulta es un producto de matrices por bloque.
+    """
+
+    def __init__(self, labels, matrix, row_labels, thresholds, sq_norms=None):
+        self.labels = list(labels)
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.row_labels = np.asarray(row_labels, dtype=np.int32)
+        self.thresholds = np.asarray(thresholds, dtype=np.float32)
+        if sq_norms is None:
+            sq_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+        self.sq_norms = np.asarray(sq_norms, dtype=np.float32)
+
+    @classmethod
+    def build(cls, prototypes, thresholds):
+        """Construye el índice a partir de los dicts etiqueta -> prototipo/umbral."""
+        labels = list(prototypes)
+        rows = [np.atleast_2d(prototypes[l]) for l in labels]
+        row_labels = np.repeat(np.arange(len(labels)), [len(r) for r in rows])
+        row_thr = np.concatenate(
+            [np.broadcast_to(thresholds[l], len(r)) for l, r in zip(labels, rows)]
+        )
+        return cls(labels, np.concatenate(rows), row_labels, row_thr)
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def search(self, features, start=0, stop=None):
+        """
+        Fila más cercana y su distancia para cada vector (N, D), buscando solo
+        en las filas [start, stop). Devuelve (filas, distancias).
+        """
+        X = np.asarray(features, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        stop = len(self.matrix) if stop is None else stop
+        x_sq = np.einsum("ij,ij->i", X, X)
+        best_row = np.full(len(X), -1, dtype=np.int64)
+        best_sq = np.full(len(X), np.inf, dtype=np.float32)
+        for lo in range(start, stop, BLOCK_ROWS):
+            hi = min(lo + BLOCK_ROWS, stop)
+            sq = self.sq_norms[lo:hi] - 2 * X @ self.matrix[lo:hi].T
+            arg = sq.argmin(axis=1)
+            val = sq[np.arange(len(X)), arg] + x_sq
+            better = val < best_sq
+            best_row[better] = arg[better] + lo
+            best_sq[better] = val[better]
+        return best_row, np.sqrt(np.maximum(best_sq, 0))
+
+
+class PrototypeClassifier:
+    """
+    Clasificador por prototipo más cercano. Las filas del índice se reordenan
+    una sola vez para que los prototipos de cada jugador queden contiguos
+    (repetidos si un gesto es de varios jugadores); así cada mano solo se
+    compara con el bloque de su jugador y el coste no crece con el
+    vocabulario de los demás.
+    """
+
+    def __init__(self, index, players=None):
+        # Etiquetas de cada jugador; una tecla compartida por varios jugadores
+        # repite sus filas en el bloque de cada uno. Las que no son de nadie
+        # forman el bloque 0.
+        groups = {}
+        for player, keys in (players or {}).items():
+            ids = groups.setdefault(int(player), set())
+            for key in [keys] if isinstance(keys, str) else keys:
+                if key in index.labels:
+                    ids.add(index.labels.index(key))
+        owned = set().union(*groups.values())
+        groups[0] = set(range(len(index.labels))) - owned
+        parts = []
+        self.blocks = {}
+        start = 0
+        for player in sorted(groups):
+            rows = np.flatnonzero(np.isin(index.row_labels, list(groups[player])))
+            if len(rows):
+                parts.append(rows)
+                self.blocks[player] = (start, start + len(rows))
+                start += len(rows)
+        order = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        self.index = PrototypeIndex(
+            index.labels,
+            index.matrix[order],
+            index.row_labels[order],
+            index.thresholds[order],
+            index.sq_norms[order],
+        )
+        self.labels = self.index.labels
+
+    def classify(self, features, hand_players=None):
+        """
+        Clasifica un lote (N, D) de manos. Si se da `hand_players` (N,), cada
+        mano solo se compara con los prototipos de su jugador.
+        """
+        X = np.asarray(features, dtype=np.float32)
+        if hand_players is None:
+            rows, dists = self.index.search(X)
+        else:
+            hand_players = np.asarray(hand_players)
+            rows = np.full(len(X), -1, dtype=np.int64)
+            dists = np.full(len(X), np.inf, dtype=np.float32)
+            for player in np.unique(hand_players):
+                block = self.blocks.get(int(player))
+                if block is None or player == 0:
+                    continue
+                sel = hand_players == player
+                rows[sel], dists[sel] = self.index.search(X[sel], *block)
+        valid = rows >= 0
+        safe = np.where(valid, rows, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(valid, dists / self.index.thresholds[safe], np.inf)
+        label_ids = np.where(valid, self.index.row_labels[safe], -1)
+        labels = [self.labels[i] if i >= 0 else None for i in label_ids]
+        return Classification(labels, label_ids, dists, ratios, ratios < 1)
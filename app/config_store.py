@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+
+
+class FrozenDict(dict):
+    """dict de solo lectura; sigue siendo serializable con json."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("La configuración en caché es de solo lectura")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+
+
+def freeze(value):
+    """
+    Copia inmutable de una estructura JSON: los dicts pasan a FrozenDict y
+    las listas a tuplas.
+    """
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class ConfigStore:
+    """
+    Acceso en caché a un archivo de configuración JSON. El archivo se parsea
+    una sola vez y `get` devuelve siempre la misma instantánea inmutable
+    hasta que cambian su mtime o tamaño, así que comparar con `is` basta
+    para detectar una recarga. Si el archivo nuevo no se puede leer (JSON a
+    medio escribir, una errata) o le falta alguna clave de `required`, se
+    conserva la última instantánea válida.
+    """
+
+    def __init__(self, path, required=()):
+        self.path = path
+        self.required = tuple(required)
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._snapshot = None
+        # Motivo por el que se descartó la última versión del archivo.
+        self.error = None
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self):
+        with open(self.path, "r") as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError("la configuración no es un objeto JSON")
+        missing = [k for k in self.required if k not in config]
+        if missing:
+            raise ValueError(f"faltan claves: {', '.join(missing)}")
+        return freeze(config)
+
+    def get(self):
+        """Instantánea actual, o None si el archivo no existe o nunca fue válido."""
+        stamp = self._file_stamp()
+        with self._lock:
+            if stamp != self._stamp:
+                self._stamp = stamp
+                self.error = None
+                if stamp is None:
+                    self._snapshot = None
+                else:
+                    try:
+                        self._snapshot = self._read()
+                    except (OSError, ValueError) as e:
+                        self.error = e
+            return self._snapshot
+
+    def save(self, config):
+        """Escribe el archivo de forma atómica y actualiza la caché."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(config, f, indent=4)
+        os.replace(tmp_path, self.path)
+        with self._lock:
+            self._stamp = self._file_stamp()
+            self._snapshot = freeze(json.loads(json.dumps(config)))
+        return self._snapshot
@@ -1,39 +1,112 @@
-import json
 import os
 import glob
+import threading
+import time
+from contextlib import nullcontext
 import numpy as np
-import pandas as pd
-import joblib
-import cv2
-import mediapipe as mp
-from pynput.keyboard import Controller
 
-from app.utils import normalize_landmarks, get_player_zone, draw_zones
+from app.startup import lazy_import
+from app.utils import (
+    NORMALIZATION,
+    landmarks_to_array,
+    normalize_landmarks_batch,
+    get_zone_map,
+    draw_zones,
+)
+from app.classifier import PrototypeClassifier, PrototypeIndex, best_ratios
+from app.frame_sources import open_source
+from app.pipeline import LatestSlot, FrameBuffers, FrameRing
+from app.scheduler import InferenceScheduler
+from app.key_dispatcher import GestureDebouncer, KeyDispatcher, PynputBackend
+from app.metrics import STATS_DEFAULTS, PipelineStats, StatsWriter
+from app.landmark_log import LandmarkRecorder, hand_info
+from app.tracking import make_tracker
+from app.evaluation import evaluate_dataset
+from app.config_store import ConfigStore
+from app.dataset import GestureDataset
+from app.training import PROTOTYPE_BUDGET, IncrementalTrainer
+from app.model_store import save_model, load_model, read_header
+
+# OpenCV y MediaPipe se importan al usarse por primera vez, no al arrancar.
+cv2 = lazy_import("cv2")
+mp = lazy_import("mediapipe")
 
 CONFIG_FILE = "config.json"
 DATA_DIR = "data"
 MODELS_DIR = "models"
-MODEL_PATH = os.path.join(MODELS_DIR, "gesture_prototypes.joblib")
+MODEL_PATH = os.path.join(MODELS_DIR, "gesture_prototypes.gpm")
+DATASET_DIR = os.path.join(DATA_DIR, "gestures")
+TRAINING_STATE_PATH = os.path.join(MODELS_DIR, "training_state.npz")
+# Fotogramas en vuelo en run_play: uno en cada etapa y uno en cada cola.
+PLAY_RING_SIZE = 5
+
+_dataset = None
+_dataset_lock = threading.Lock()
+
+
+config_store = ConfigStore(CONFIG_FILE, required=("num_players", "players"))
 
 
 def save_config(num_players, players_keys):
-    config = {"num_players": num_players, "players": players_keys}
-    f = open(CONFIG_FILE, "w")
-    json.dump(config, f, indent=4)
-    f.close()
+    # Se conservan las demás claves (layout, inference...) del archivo actual.
+    config = dict(load_config() or {})
+    config.update(num_players=num_players, players=players_keys)
+    config_store.save(config)
     return True
 
 
 def load_config():
-    return json.load(open(CONFIG_FILE, "r")) if os.path.exists(CONFIG_FILE) else None
+    """
+    Configuración actual como instantánea inmutable en caché; solo se vuelve
+    a leer del disco cuando cambia el archivo. None si no existe.
+    """
+    return config_store.get()
+
+
+def get_player_keys(config):
+    """
+    Normaliza config["players"] a {jugador: [teclas]}. Cada jugador puede
+    tener una sola tecla ("a") o una lista de gestos (["a", "b", ...]).
+    """
+    return {
+        p: [k] if isinstance(k, str) else list(k) for p, k in config["players"].items()
+    }
+
+
+def get_all_keys(config):
+    """Lista de todas las teclas configuradas, sin repetir."""
+    return list(dict.fromkeys(k for ks in get_player_keys(config).values() for k in ks))
+
+
+def get_dataset():
+    """
+    Dataset binario de gestos compartido por toda la aplicación. Al abrirlo
+    por primera vez importa los CSV del formato anterior (data/<tecla>.csv)
+    que aún no estén en él.
+    """
+    global _dataset
+    with _dataset_lock:
+        if _dataset is None:
+            _dataset = GestureDataset(DATASET_DIR)
+            known = set(_dataset.labels())
+            for csv_path in sorted(glob.glob(os.path.join(DATA_DIR, "*.csv"))):
+                label = os.path.splitext(os.path.basename(csv_path))[0]
+                if label not in known:
+                    _dataset.import_csv(csv_path, label)
+        return _dataset
+
+
+def is_gesture_captured(key):
+    return get_dataset().count(key) > 0
 
 
 def get_capture_status():
+    """Por jugador, True si ya se capturaron todos sus gestos."""
     config = load_config()
     return (
         {
-            p: os.path.exists(os.path.join(DATA_DIR, f"{k}.csv"))
-            for p, k in config["players"].items()
+            p: all(is_gesture_captured(k) for k in keys)
+            for p, keys in get_player_keys(config).items()
         }
         if config
         else {}
@@ -42,17 +115,36 @@ def get_capture_status():
 
 # --- NUEVA FUNCIÓN ---
 def is_model_trained():
-    """Revisa si el archivo del modelo de gestos ha sido entrenado y existe."""
-    return os.path.exists(MODEL_PATH)
+    """Revisa si el modelo de gestos existe y corresponde a los datos actuales."""
+    try:
+        load_gesture_model()
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def load_gesture_model():
+    """
+    Carga el índice de prototipos del modelo. Se valida la normalización y,
+    si hay datos capturados en esta máquina, que el modelo se haya entrenado
+    con ellos (si no, hay que reentrenar).
+    """
+    dataset = get_dataset()
+    fingerprint = None
+    if dataset.labels():
+        fingerprint = dataset.fingerprint(read_header(MODEL_PATH)["labels"])
+    return load_model(MODEL_PATH, NORMALIZATION, fingerprint)
 
 
 def cleanup_project_files():
+    files_deleted_count = get_dataset().clear()
     files_to_check = (
         [CONFIG_FILE]
         + glob.glob(os.path.join(DATA_DIR, "*.csv"))
+        + glob.glob(os.path.join(MODELS_DIR, "*.gpm"))
         + glob.glob(os.path.join(MODELS_DIR, "*.joblib"))
+        + glob.glob(os.path.join(MODELS_DIR, "*.npz"))
     )
-    files_deleted_count = 0
     for f in files_to_check:
         if os.path.exists(f):
             os.remove(f)
@@ -61,126 +153,482 @@ def cleanup_project_files():
 
 
 def train_model():
-    if not any(f.endswith(".csv") for f in os.listdir(DATA_DIR)):
+    """
+    Entrena de forma incremental: solo se leen las etiquetas cuyos datos
+    cambiaron desde el último entrenamiento (y, si solo se añadieron
+    muestras, únicamente las nuevas).
+    """
+    dataset = get_dataset()
+    if not dataset.labels():
         return "No hay datos para entrenar.", False
-    prototypes, thresholds = {}, {}
     os.makedirs(MODELS_DIR, exist_ok=True)
-    for file in os.listdir(DATA_DIR):
-        if file.endswith(".csv"):
-            label = os.path.splitext(file)[0]
-            X = pd.read_csv(os.path.join(DATA_DIR, file), header=None).values
-            if X.shape[0] > 0:
-                proto = X.mean(axis=0)
-                dists = np.linalg.norm(X - proto, axis=1)
-                thr = dists.max() * 1.2
-                prototypes[label], thresholds[label] = proto, thr
+    # config["training"]: "prototypes_per_label" (k-means por gesto),
+    # "prototype_budget" (prototipos totales) y "workers" (procesos).
+    training = (load_config() or {}).get("training") or {}
+    trainer = IncrementalTrainer(
+        dataset,
+        TRAINING_STATE_PATH,
+        k=training.get("prototypes_per_label", 1),
+        budget=training.get("prototype_budget", PROTOTYPE_BUDGET),
+        workers=training.get("workers"),
+    )
+    updated = trainer.refresh()
+    prototypes, thresholds = trainer.prototypes()
     if not prototypes:
         return "No se generaron prototipos válidos.", False
-    joblib.dump({"prototypes": prototypes, "thresholds": thresholds}, MODEL_PATH)
-    return f"Modelo guardado con {len(prototypes)} gestos.", True
+    index = PrototypeIndex.build(prototypes, thresholds)
+    # Con config["training"]["target_far"], los umbrales se calibran con
+    # las muestras de los demás gestos (solo se estrechan: aquí no hay
+    # muestras sin gesto, ver Evaluation.threshold_scales).
+    target_far = training.get("target_far")
+    if target_far and len(index.labels) > 1:
+        try:
+            index = evaluate_dataset(dataset, index).calibrated_index(target_far)
+        except ValueError as e:
+            return f"No se guardó el modelo: {e}.", False
+    save_model(MODEL_PATH, index, NORMALIZATION, dataset.fingerprint(index.labels))
+    trainer.save()
+    return (
+        f"Modelo guardado con {len(prototypes)} gestos "
+        f"({len(index)} prototipos, {len(updated)} actualizados).",
+        True,
+    )
+
+
+def stats_output(config):
+    """Ajustes de config["stats"] y su StatsWriter (None si no hay archivo)."""
+    settings = {**STATS_DEFAULTS, **(config.get("stats") or {})}
+    writer = None
+    if settings["path"]:
+        writer = StatsWriter(settings["path"], settings["format"], settings["interval"])
+    return settings, writer
+
+
+class PlayOutput:
+    """
+    Etapa de salida común a los motores de juego y a la reproducción: a
+    partir de las manos de cada fotograma aplica zonas, seguimiento
+    (config["tracking"]), clasificación, mejor ratio por gesto e histéresis,
+    y recarga config.json si cambia. Con `views` > 1 (una por cámara) cada
+    vista tiene su HandTracker y las teclas se deciden con el menor ratio
+    de cada gesto entre vistas.
+    """
+
+    def __init__(self, config, model, views=1):
+        self.model = model
+        self.views = views
+        self.debouncer = GestureDebouncer(
+            get_all_keys(config), config.get("hysteresis")
+        )
+        self._configure(config)
+
+    def _configure(self, config):
+        self.config = config
+        self.classifier = PrototypeClassifier(self.model, config["players"])
+        self.trackers = [
+            make_tracker(config.get("tracking")) for _ in range(self.views)
+        ]
+        self.view_ratios = [{} for _ in range(self.views)]
+        self._zone_map = None
+
+    def reload(self):
+        """
+        Aplica config.json si cambió desde el último fotograma. Devuelve las
+        teclas pulsadas que ya no están configuradas (hay que soltarlas).
+        """
+        latest = load_config()
+        if latest is self.config or latest is None:
+            return []
+        self._configure(latest)
+        return self.debouncer.set_keys(get_all_keys(latest))
+
+    def players(self, centroids, width, height):
+        """Zona (N,) de centroides normalizados sobre una imagen `width` x `height`."""
+        zone_map = self._zone_map
+        if zone_map is None or (zone_map.width, zone_map.height) != (width, height):
+            zone_map = self._zone_map = get_zone_map(
+                width, height, self.config["num_players"], self.config.get("layout")
+            )
+        return zone_map.lookup(centroids)
+
+    def classify(self, features, centroids, players, view=0):
+        """
+        Clasifica las manos válidas de un fotograma de la vista `view`:
+        características (N, D), centroides (N, 2) y zona (N,). Guarda el
+        mejor ratio de cada gesto de la vista y devuelve [(etiqueta,
+        aceptada)] por mano.
+        """
+        tracker = self.trackers[view]
+        if tracker is not None:
+            tracks = tracker.update(centroids, features, players)
+            if tracks:
+                tracker.classify(tracks, self.classifier)
+            self.view_ratios[view] = tracker.ratios()
+            return [(t.label, t.accepted) for t in tracks]
+        if not len(features):
+            self.view_ratios[view] = {}
+            return []
+        match = self.classifier.classify(features, players)
+        self.view_ratios[view] = best_ratios(match.labels, match.ratios)
+        return list(zip(match.labels, match.accepted))
+
+    def keys(self):
+        """Cambios de tecla [(tecla, pulsada, ratio)] con los ratios actuales."""
+        ratios = self.view_ratios[0]
+        if self.views > 1:
+            ratios = {}
+            for view_ratios in self.view_ratios:
+                best_ratios(view_ratios.keys(), view_ratios.values(), ratios)
+        return [
+            (key, pressed, ratios.get(key))
+            for key, pressed in self.debouncer.update(ratios)
+        ]
 
 
 class OpenCVController:
-    # (El resto de esta clase no cambia en absoluto)
-    def __init__(self, update_callback):
-        self.cap = cv2.VideoCapture(0)
+    def __init__(
+        self,
+        update_callback,
+        source=0,
+        keyboard=None,
+        draw_overlay=True,
+        pool=None,
+        mirror_landmarks=False,
+        record_path=None,
+    ):
+        """
+        `source` es cualquier especificación aceptada por `open_source`
+        (por defecto la webcam 0) o una FrameSource ya construida.
+        `keyboard` es el backend de teclas (press/release): por defecto
+        PynputBackend, o MemoryBackend para medir sin tocar el sistema.
+        Con `draw_overlay=False` no se dibujan zonas ni landmarks (vista
+        previa oculta o ejecución sin interfaz). Con un SessionPool, la
+        cámara y los modelos de MediaPipe se toman de él y se le devuelven
+        en `release`, en lugar de abrirse y cerrarse en cada tarea.
+        Con `mirror_landmarks=True` y sin dibujo, la imagen no se voltea: se
+        reflejan las coordenadas x de los landmarks, que es equivalente.
+        Con `record_path` (o config["record_dir"]) run_play graba los
+        landmarks de cada fotograma en un registro reproducible con
+        app.replay.
+        """
+        self.pool = pool
+        self.cap = pool.acquire_source() if pool is not None else open_source(source)
         if not self.cap.isOpened():
-            raise IOError("No se puede abrir la webcam")
+            raise IOError(
+                "No se puede abrir la webcam"
+                if self.cap.live
+                else f"No se puede abrir la fuente de video: {source}"
+            )
         self.mp_hands = mp.solutions.hands
         self.mp_draw = mp.solutions.drawing_utils
-        self.kb = Controller()
+        self.kb = keyboard if keyboard is not None else PynputBackend()
         self.update_callback = update_callback
+        self.draw_overlay = draw_overlay
+        # La vista previa se muestra en espejo, así que con dibujo se voltea.
+        self.flip_image = draw_overlay or not mirror_landmarks
+        self.record_path = record_path
 
-    def run_capture(self, player_id, key, stop_event):
+    def run_capture(self, player_id, key, stop_event, append=False):
+        """
+        Captura SAMPLES muestras del gesto `key` escribiéndolas en streaming
+        al dataset; solo se confirman si la captura se completa. Con
+        `append=True` se suman a las muestras existentes en vez de
+        reemplazarlas, y el siguiente entrenamiento solo lee las nuevas.
+        Devuelve (mensaje, éxito).
+        """
         SAMPLES = 300
-        gesture_data = []
-        with self.mp_hands.Hands(
-            min_detection_confidence=0.7, max_num_hands=1
-        ) as hands:
+        message = None
+        config = load_config()
+        layout = config.get("layout")
+        buffers = FrameBuffers()
+        # Misma resolución de inferencia que en el juego, pero sin saltos.
+        scheduler = InferenceScheduler(config.get("inference"))
+        stats_config, writer = stats_output(config)
+        self.stats = stats = PipelineStats()
+        with self._hands_session(1) as hands, get_dataset().writer(
+            key, int(player_id)
+        ) as gesture_data:
             while len(gesture_data) < SAMPLES and not stop_event.is_set():
-                ret, frame = self.cap.read()
-                if not ret:
+                t = time.perf_counter()
+                frame = buffers.read(self.cap)
+                if frame is None:
                     break
-                img = cv2.flip(frame, 1)
+                t0 = stats.lap("read", t)
+                img = buffers.mirror() if self.flip_image else frame
+                t = stats.lap("flip", t0)
                 h, w, _ = img.shape
-                results = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-                config = load_config()
-                draw_zones(img, config["num_players"], active_player=int(player_id))
+                zone = get_zone_map(w, h, config["num_players"], layout).zones.get(
+                    int(player_id)
+                )
+                if zone is None:
+                    message = f"El layout no define la zona del jugador {player_id}."
+                    break
+                rgb = scheduler.to_rgb(img)
+                t = stats.lap("convert", t)
+                results = hands.process(rgb)
+                t = stats.lap("inference", t)
+                if self.draw_overlay:
+                    draw_zones(
+                        img,
+                        config["num_players"],
+                        active_player=int(player_id),
+                        layout=layout,
+                    )
+                    t = stats.lap("draw", t)
                 if results.multi_hand_landmarks:
-                    for lm in results.multi_hand_landmarks:
-                        cx = np.mean([p.x for p in lm.landmark]) * w
-                        cy = np.mean([p.y for p in lm.landmark]) * h
-                        x1, y1, x2, y2 = get_player_zone(
-                            int(player_id), w, h, config["num_players"]
-                        )
+                    features, centroids, valid = normalize_landmarks_batch(
+                        self._hand_coords(results.multi_hand_landmarks)
+                    )
+                    t = stats.lap("normalize", t)
+                    x1, y1, x2, y2 = zone
+                    for lm, (cx, cy), data, ok in zip(
+                        results.multi_hand_landmarks,
+                        centroids * (w, h),
+                        features,
+                        valid,
+                    ):
                         if x1 <= cx <= x2 and y1 <= cy <= y2:
-                            normalized_data = normalize_landmarks(lm)
-                            if normalized_data is not None:
-                                gesture_data.append(normalized_data)
-                            self.mp_draw.draw_landmarks(
-                                img, lm, self.mp_hands.HAND_CONNECTIONS
-                            )
+                            if ok:
+                                gesture_data.add(data)
+                            if self.draw_overlay:
+                                self.mp_draw.draw_landmarks(
+                                    img, lm, self.mp_hands.HAND_CONNECTIONS
+                                )
+                    if self.draw_overlay:
+                        t = stats.lap("draw", t)
+                if stats_config["overlay"] and self.draw_overlay:
+                    stats.draw(img)
                 self.update_callback(
                     image=img,
                     progress=len(gesture_data) / SAMPLES,
                     count=len(gesture_data),
                     total=SAMPLES,
+                    timestamp=t0,
                 )
-        success = len(gesture_data) >= SAMPLES
+                stats.lap("handoff", t)
+                stats.frame_done()
+                if writer is not None:
+                    writer.maybe_write(stats)
+            if writer is not None:
+                writer.maybe_write(stats, force=True)
+            success = len(gesture_data) >= SAMPLES
+            if success:
+                gesture_data.commit(replace=not append)
         if success:
-            np.savetxt(
-                os.path.join(DATA_DIR, f"{key}.csv"), gesture_data, delimiter=","
-            )
-        return success
+            return "¡Gesto capturado!", True
+        return message or "Captura cancelada o incompleta.", False
 
     def run_play(self, stop_event):
+        """
+        Bucle de juego en tres etapas: un hilo lector (read + flip), un hilo
+        de inferencia (MediaPipe) y la etapa de salida en el hilo actual
+        (clasificación, dibujo, teclado e interfaz). Las etapas se comunican
+        por colas de un solo elemento, así que con una cámara en vivo cada
+        etapa trabaja siempre con el fotograma más reciente.
+        Si config.json cambia durante la partida, las teclas se reasignan sin
+        reiniciar la sesión. Las teclas se deciden con histéresis
+        (config["hysteresis"]) y se envían desde un KeyDispatcher, fuera del
+        bucle de visión. Los fotogramas circulan en un FrameRing de
+        buffers preasignados, así que en régimen estacionario no se reserva
+        memoria por fotograma. Un InferenceScheduler (config["inference"])
+        decide en qué fotogramas se vuelve a ejecutar MediaPipe; su contador
+        queda en `self.scheduler` al terminar. Las latencias por etapa quedan
+        en `self.stats` y, según config["stats"], se dibujan sobre la imagen
+        o se vuelcan a un archivo. Zonas, seguimiento, clasificación e
+        histéresis los aplica un PlayOutput, que queda en `self.output`.
+        """
         config = load_config()
-        model = joblib.load(MODEL_PATH)
-        protos, thresholds = model["prototypes"], model["thresholds"]
-        keys_pressed = {key: False for key in config["players"].values()}
-        with self.mp_hands.Hands(
-            min_detection_confidence=0.7, max_num_hands=config["num_players"]
-        ) as hands:
+        self.output = output = PlayOutput(config, load_gesture_model())
+        self.scheduler = InferenceScheduler(
+            config.get("inference"), governor=self.cap.live
+        )
+        ring = FrameRing(PLAY_RING_SIZE)
+        frames = LatestSlot(on_drop=lambda item: ring.release(item[1]))
+        detections = LatestSlot(on_drop=lambda item: ring.release(item[1]))
+        stats_config, writer = stats_output(config)
+        self.stats = stats = PipelineStats((frames, detections))
+        record_path = self.record_path
+        if record_path is None and config.get("record_dir"):
+            os.makedirs(config["record_dir"], exist_ok=True)
+            record_path = os.path.join(
+                config["record_dir"], time.strftime("%Y%m%d-%H%M%S") + ".glog"
+            )
+        recorder = None
+        halt = threading.Event()
+        errors = []
+        stages = [
+            threading.Thread(
+                target=self._run_stage,
+                args=(self._grab_frames, frames, halt, errors, ring, stats),
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._run_stage,
+                args=(
+                    self._detect_hands,
+                    detections,
+                    halt,
+                    errors,
+                    frames,
+                    config["num_players"],
+                    self.scheduler,
+                    stats,
+                ),
+                daemon=True,
+            ),
+        ]
+        for stage in stages:
+            stage.start()
+        self.dispatcher = KeyDispatcher(self.kb)
+        try:
             while not stop_event.is_set():
-                ret, frame = self.cap.read()
-                if not ret:
-                    break
-                img = cv2.flip(frame, 1)
+                item = detections.get(timeout=0.1)
+                if item is None:
+                    if detections.exhausted:
+                        break
+                    continue
+                t0, buffers, img, results = item
+                t = time.perf_counter()
                 h, w, _ = img.shape
-                results = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-                draw_zones(img, config["num_players"])
-                current_gestures = {key: False for key in config["players"].values()}
-                if results.multi_hand_landmarks:
-                    for lm in results.multi_hand_landmarks:
-                        normalized_data = normalize_landmarks(lm)
-                        if normalized_data is None:
+                for key in output.reload():
+                    self.dispatcher.submit(key, False, t0)
+                config = output.config
+                if self.draw_overlay:
+                    draw_zones(img, config["num_players"], layout=config.get("layout"))
+                    t = stats.lap("draw", t)
+                hands_lm = results.multi_hand_landmarks or []
+                coords = self._hand_coords(hands_lm)
+                if record_path is not None:
+                    if recorder is None:
+                        recorder = LandmarkRecorder(record_path, w, h)
+                    recorder.write(
+                        t0, coords, *hand_info(results.multi_handedness, len(coords))
+                    )
+                features, centroids, valid = normalize_landmarks_batch(coords)
+                t = stats.lap("normalize", t)
+                hands_lm = [lm for lm, ok in zip(hands_lm, valid) if ok]
+                hand_results = output.classify(
+                    features[valid],
+                    centroids[valid],
+                    output.players(centroids[valid], w, h),
+                )
+                if hand_results:
+                    t = stats.lap("classify", t)
+                if self.draw_overlay and hand_results:
+                    for lm, (label, accepted) in zip(hands_lm, hand_results):
+                        if label is None:
                             continue
-                        cx = np.mean([p.x for p in lm.landmark]) * w
-                        cy = np.mean([p.y for p in lm.landmark]) * h
-                        for i, key in config["players"].items():
-                            x1, y1, x2, y2 = get_player_zone(
-                                int(i), w, h, config["num_players"]
-                            )
-                            if x1 <= cx <= x2 and y1 <= cy <= y2 and key in protos:
-                                d = np.linalg.norm(normalized_data - protos[key])
-                                color = (0, 0, 255)
-                                if d < thresholds[key]:
-                                    current_gestures[key] = True
-                                    color = (0, 255, 0)
-                                ds = self.mp_draw.DrawingSpec(color=color, thickness=2)
-                                self.mp_draw.draw_landmarks(
-                                    img, lm, self.mp_hands.HAND_CONNECTIONS, ds, ds
-                                )
-                                break
-                for key, active in current_gestures.items():
-                    if active and not keys_pressed[key]:
-                        self.kb.press(key)
-                        keys_pressed[key] = True
-                    elif not active and keys_pressed[key]:
-                        self.kb.release(key)
-                        keys_pressed[key] = False
-                self.update_callback(image=img)
+                        color = (0, 255, 0) if accepted else (0, 0, 255)
+                        ds = self.mp_draw.DrawingSpec(color=color, thickness=2)
+                        self.mp_draw.draw_landmarks(
+                            img, lm, self.mp_hands.HAND_CONNECTIONS, ds, ds
+                        )
+                    t = stats.lap("draw", t)
+                for key, pressed, ratio in output.keys():
+                    self.dispatcher.submit(key, pressed, t0, ratio)
+                t = stats.lap("keys", t)
+                if stats_config["overlay"] and self.draw_overlay:
+                    stats.draw(img)
+                self.update_callback(image=img, timestamp=t0)
+                stats.lap("handoff", t)
+                stats.frame_done()
+                ring.release(buffers)
+                if writer is not None:
+                    writer.maybe_write(stats)
+        finally:
+            halt.set()
+            frames.close()
+            detections.close()
+            for stage in stages:
+                stage.join()
+            self.dispatcher.close()
+            if writer is not None:
+                writer.maybe_write(stats, force=True)
+            if recorder is not None:
+                recorder.close()
+        # Un error de la cámara o de MediaPipe termina la partida como en el
+        # hilo principal.
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def _run_stage(stage, output, halt, errors, *args):
+        """
+        Ejecuta una etapa del pipeline. Pase lo que pase cierra su cola de
+        salida, para que la etapa siguiente termine; si falla, guarda la
+        excepción en `errors` para que run_play la relance.
+        """
+        try:
+            stage(output, halt, *args)
+        except BaseException as e:
+            errors.append(e)
+            halt.set()
+        finally:
+            output.close()
+
+    def _grab_frames(self, frames, halt, ring, stats):
+        """Etapa lectora: lee y voltea fotogramas hasta que se agote la fuente."""
+        while not halt.is_set():
+            buffers = ring.acquire(timeout=0.1)
+            if buffers is None:
+                continue
+            t = time.perf_counter()
+            frame = buffers.read(self.cap)
+            if frame is None:
+                break
+            t0 = stats.lap("read", t)
+            img = buffers.mirror() if self.flip_image else frame
+            stats.lap("flip", t0)
+            if not frames.put((t0, buffers, img), block=not self.cap.live):
+                break
+
+    def _detect_hands(self, detections, halt, frames, max_num_hands, scheduler, stats):
+        """
+        Etapa de inferencia: ejecuta MediaPipe sobre el último fotograma, o
+        reutiliza el resultado anterior si el planificador lo indica.
+        """
+        with self._hands_session(max_num_hands) as hands:
+            while not halt.is_set():
+                item = frames.get(timeout=0.1)
+                if item is None:
+                    if frames.exhausted:
+                        break
+                    continue
+                t0, buffers, img = item
+                results, _ = scheduler.process(hands, img, stats)
+                if not detections.put(
+                    (t0, buffers, img, results), block=not self.cap.live
+                ):
+                    break
+
+    def _hand_coords(self, multi_hand_landmarks):
+        """Landmarks (N, 21, 3); reflejados en x si la imagen no se volteó."""
+        coords = landmarks_to_array(multi_hand_landmarks)
+        if not self.flip_image:
+            np.subtract(1.0, coords[..., 0], out=coords[..., 0])
+        return coords
+
+    def _hands_session(self, max_num_hands):
+        """Hands del pool (sin cerrarlo al salir) o una instancia nueva."""
+        if self.pool is not None:
+            return nullcontext(self.pool.hands(max_num_hands, 0.7))
+        return self.mp_hands.Hands(
+            min_detection_confidence=0.7, max_num_hands=max_num_hands
+        )
+
+    @property
+    def tracker(self):
+        """HandTracker de la última partida (None sin seguimiento)."""
+        output = getattr(self, "output", None)
+        return output.trackers[0] if output is not None else None
+
+    @property
+    def inferences(self):
+        """Ejecuciones de MediaPipe en la última partida."""
+        return self.scheduler.inferred
 
     def release(self):
-        if self.cap.isOpened():
+        if self.pool is not None:
+            self.pool.release()
+        elif self.cap.isOpened():
             self.cap.release()
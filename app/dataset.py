@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+
+FEATURE_DIM = 63
+SCHEMA_VERSION = 1
+INDEX_FILE = "index.json"
+
+# Columnas del almacén: nombre -> (archivo, dtype). Una fila por muestra.
+COLUMNS = {
+    "features": ("features.f32", np.float32),
+    "labels": ("labels.i32", np.int32),
+    "players": ("players.i16", np.int16),
+    "timestamps": ("timestamps.f64", np.float64),
+}
+
+
+class GestureDataset:
+    """
+    Almacén binario columnar de muestras de gestos. Cada columna es un archivo
+    de solo-añadir (features en float32 de `dim` valores por fila) que se lee
+    con np.memmap sin copiar. `index.json` guarda el número de filas
+    confirmadas y, por etiqueta, los rangos de filas [inicio, fin) vigentes.
+    Las filas escritas pero no confirmadas se descartan al abrir.
+    """
+
+    def __init__(self, path, dim=FEATURE_DIM):
+        self.path = path
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._writer = None
+        os.makedirs(path, exist_ok=True)
+        self._load_index()
+        self._truncate_uncommitted()
+
+    # --- Índice y archivos ---
+
+    def _file(self, name):
+        return os.path.join(self.path, COLUMNS[name][0])
+
+    def _width(self, name):
+        return self.dim if name == "features" else 1
+
+    def _load_index(self):
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, "r") as f:
+                index = json.load(f)
+            if index.get("version") != SCHEMA_VERSION or index.get("dim") != self.dim:
+                raise ValueError(f"Dataset incompatible en {self.path}")
+        else:
+            index = {
+                "version": SCHEMA_VERSION,
+                "dim": self.dim,
+                "rows": 0,
+                "label_ids": {},
+                "ranges": {},
+                "updated": {},
+            }
+        self.index = index
+
+    def _save_index(self):
+        index_path = os.path.join(self.path, INDEX_FILE)
+        with open(f"{index_path}.tmp", "w") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(f"{index_path}.tmp", index_path)
+
+    def _truncate_uncommitted(self):
+        for name, (_, dtype) in COLUMNS.items():
+            size = self.rows * self._width(name) * np.dtype(dtype).itemsize
+            with open(self._file(name), "ab") as f:
+                if f.tell() > size:
+                    f.truncate(size)
+
+    # --- Lectura ---
+
+    @property
+    def rows(self):
+        return self.index["rows"]
+
+    def labels(self):
+        """Etiquetas con al menos una muestra."""
+        with self._lock:
+            return [l for l, r in self.index["ranges"].items() if r]
+
+    def count(self, label):
+        with self._lock:
+            return sum(
+                stop - start for start, stop in self.index["ranges"].get(label, [])
+            )
+
+    def updated_at(self, label):
+        """Momento (time.time()) de la última modificación de la etiqueta."""
+        return self.index["updated"].get(label)
+
+    def fingerprint(self, labels=None):
+        """
+        Huella de las filas vigentes de `labels` (por defecto, todas). Sirve
+        para comprobar que un modelo corresponde a estos datos; cambia al
+        recapturar, añadir muestras o compactar.
+        """
+        with self._lock:
+            ranges = {
+                l: self.index["ranges"].get(l, [])
+                for l in sorted(labels or self.labels())
+            }
+        blob = json.dumps({"dim": self.dim, "ranges": ranges}, sort_keys=True)
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+    def column(self, name):
+        """Columna completa (filas confirmadas) como memmap de solo lectura."""
+        _, dtype = COLUMNS[name]
+        width, rows = self._width(name), self.rows
+        if rows == 0:
+            return np.empty((0, width), dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=(rows, width))
+
+    def get(self, label, name="features"):
+        """
+        Filas de `label` en la columna `name`. Si la etiqueta ocupa un solo
+        rango contiguo se devuelve una vista del memmap, sin copia.
+        """
+        with self._lock:
+            ranges = list(self.index["ranges"].get(label, []))
+            data = self.column(name)
+        if len(ranges) == 1:
+            start, stop = ranges[0]
+            return data[start:stop]
+        if not ranges:
+            return data[:0]
+        return np.concatenate([data[start:stop] for start, stop in ranges])
+
+    # --- Escritura ---
+
+    def writer(self, label, player=0):
+        """Escritor en streaming para `label`; ver DatasetWriter."""
+        with self._lock:
+            if self._writer is not None:
+                raise RuntimeError("Ya hay una captura escribiendo en el dataset")
+            self._truncate_uncommitted()
+            self._writer = DatasetWriter(self, label, player)
+            return self._writer
+
+    def _label_id(self, label):
+        ids = self.index["label_ids"]
+        if label not in ids:
+            ids[label] = len(ids)
+        return ids[label]
+
+    def _finish(self, writer, stop, replace):
+        with self._lock:
+            self._writer = None
+            if stop is None:
+                self._truncate_uncommitted()
+                return
+            ranges = self.index["ranges"]
+            span = [writer.start, stop]
+            ranges[writer.label] = (
+                [span] if replace else ranges.get(writer.label, []) + [span]
+            )
+            self.index["rows"] = stop
+            self.index["updated"][writer.label] = time.time()
+            self._save_index()
+
+    def remove(self, label):
+        """Olvida las muestras de `label` (el espacio se recupera con compact)."""
+        with self._lock:
+            self.index["ranges"].pop(label, None)
+            self.index["updated"][label] = time.time()
+            self._save_index()
+
+    def compact(self):
+        """Reescribe las columnas dejando solo las filas vigentes."""
+        with self._lock:
+            if self._writer is not None:
+                raise RuntimeError("Ya hay una captura escribiendo en el dataset")
+            order = [(l, r) for l, rs in self.index["ranges"].items() for r in rs]
+            new_ranges, pos = {}, 0
+            for name in COLUMNS:
+                data = self.column(name)
+                parts = [np.array(data[start:stop]) for _, (start, stop) in order]
+                with open(f"{self._file(name)}.tmp", "wb") as f:
+                    for part in parts:
+                        part.tofile(f)
+            for name in COLUMNS:
+                os.replace(f"{self._file(name)}.tmp", self._file(name))
+            for label, (start, stop) in order:
+                new_ranges.setdefault(label, []).append([pos, pos + stop - start])
+                pos += stop - start
+            self.index["ranges"], self.index["rows"] = new_ranges, pos
+            self._save_index()
+
+    def clear(self):
+        """Borra todos los archivos del dataset. Devuelve cuántos se borraron."""
+        with self._lock:
+            deleted = 0
+            for f in [INDEX_FILE] + [file for file, _ in COLUMNS.values()]:
+                p = os.path.join(self.path, f)
+                if os.path.exists(p) and (f == INDEX_FILE or os.path.getsize(p)):
+                    deleted += 1
+                if os.path.exists(p):
+                    os.remove(p)
+            self._load_index()
+            self._truncate_uncommitted()
+            return deleted
+
+    # --- Compatibilidad CSV ---
+
+    def import_csv(self, csv_path, label, player=0):
+        """Importa un CSV de 63 columnas (formato anterior) como `label`."""
+        X = np.loadtxt(csv_path, delimiter=",", ndmin=2)
+        with self.writer(label, player) as writer:
+            writer.add_batch(X, timestamps=np.full(len(X), os.path.getmtime(csv_path)))
+            writer.commit()
+        return len(X)
+
+    def export_csv(self, label, csv_path):
+        """Exporta las muestras de `label` al CSV del formato anterior."""
+        np.savetxt(csv_path, self.get(label), delimiter=",")
+
+
+class DatasetWriter:
+    """
+    Añade muestras de una etiqueta en streaming directamente a los archivos
+    de columnas. Nada es visible hasta `commit()`; si el bloque `with` sale
+    sin confirmar, las filas escritas se descartan.
+    """
+
+    def __init__(self, dataset, label, player):
+        self.dataset = dataset
+        self.label = label
+        self.player = player
+        self.label_id = dataset._label_id(label)
+        self.start = dataset.rows
+        self.count = 0
+        self._files = {name: open(dataset._file(name), "ab") for name in COLUMNS}
+
+    def __len__(self):
+        return self.count
+
+    def add(self, features, timestamp=None):
+        self.add_batch(np.asarray(features)[None, :], [timestamp or time.time()])
+
+    def add_batch(self, features, timestamps=None):
+        X = np.ascontiguousarray(features, dtype=np.float32).reshape(
+            -1, self.dataset.dim
+        )
+        n = len(X)
+        if timestamps is None:
+            timestamps = np.full(n, time.time())
+        X.tofile(self._files["features"])
+        np.full(n, self.label_id, dtype=np.int32).tofile(self._files["labels"])
+        np.full(n, self.player, dtype=np.int16).tofile(self._files["players"])
+        np.asarray(timestamps, dtype=np.float64).tofile(self._files["timestamps"])
+        self.count += n
+
+    def _close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def commit(self, replace=True):
+        """
+        Confirma las filas escritas. Con `replace=True` sustituyen a las
+        muestras anteriores de la etiqueta; si no, se añaden a ellas.
+        """
+        self._close()
+        self.dataset._finish(self, self.start + self.count, replace)
+
+    def abort(self):
+        if self._files:
+            self._close()
+            self.dataset._finish(self, None, False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.abort()
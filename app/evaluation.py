@@ -0,0 +1,294 @@
+"""
+Evalúa el modelo de gestos sobre los datos capturados.
+
+Uso:
+    python -m app.evaluation --far 0.01
+    python -m app.evaluation --far 0.005 --negatives sesion.glog --apply
+"""
+
+import argparse
+import json
+import sys
+import numpy as np
+
+from app.classifier import PrototypeIndex
+from app.utils import normalize_landmarks_batch
+
+# Memoria máxima de las matrices por bloque (muestras x prototipos), en bytes.
+BLOCK_BYTES = 64 * 1024 * 1024
+# Histogramas de distancia relativa al umbral actual: RATIO_BINS cubos en
+# [0, RATIO_MAX) más uno de desbordamiento.
+RATIO_BINS = 400
+RATIO_MAX = 4.0
+# Tasa de falsas aceptaciones objetivo por defecto.
+TARGET_FAR = 0.01
+
+
+class Evaluation:
+    """
+    Acumula, bloque a bloque, la evaluación de un PrototypeIndex: matriz de
+    confusión con los umbrales actuales y, por etiqueta, histogramas de la
+    distancia relativa a su umbral (mejor fila de la etiqueta / umbral de
+    esa fila) para muestras propias (genuinas) y ajenas (impostoras). La
+    memoria no depende del número de muestras.
+    `y` usa los índices de `index.labels`; -1 son muestras sin gesto.
+    """
+
+    def __init__(self, index, bins=RATIO_BINS, ratio_max=RATIO_MAX):
+        self.index = index
+        self.labels = list(index.labels)
+        self.bins, self.ratio_max = bins, ratio_max
+        n = len(self.labels)
+        # Columnas agrupadas por etiqueta para reducir filas -> etiquetas.
+        self._order = np.argsort(index.row_labels, kind="stable")
+        sorted_labels = index.row_labels[self._order]
+        self._starts = np.minimum(
+            np.searchsorted(sorted_labels, np.arange(n)), max(len(sorted_labels) - 1, 0)
+        )
+        self._present = np.isin(np.arange(n), sorted_labels)
+        # Filas: etiqueta real (la última, sin gesto); columnas: predicha
+        # (la última, ninguna).
+        self.confusion = np.zeros((n + 1, n + 1), dtype=np.int64)
+        self.genuine = np.zeros((n, bins + 1), dtype=np.int64)
+        self.impostor = np.zeros((n, bins + 1), dtype=np.int64)
+        # Muestras sin gesto recibidas (y = -1).
+        self.negatives = 0
+
+    @property
+    def block_size(self):
+        # Cuatro matrices float32 de (bloque, filas) a la vez.
+        return max(1, BLOCK_BYTES // (4 * 4 * max(len(self.index), 1)))
+
+    def add(self, features, y):
+        """Incorpora muestras (N, D) con etiquetas (N,), por bloques."""
+        X = np.asarray(features, dtype=np.float32).reshape(
+            -1, self.index.matrix.shape[1]
+        )
+        y = np.asarray(y, dtype=np.int64)
+        for lo in range(0, len(X), self.block_size):
+            self._add_block(X[lo : lo + self.block_size], y[lo : lo + self.block_size])
+
+    def _add_block(self, X, y):
+        n = len(self.labels)
+        index = self.index
+        sq = (
+            np.einsum("ij,ij->i", X, X)[:, None]
+            + index.sq_norms
+            - 2 * X @ index.matrix.T
+        )
+        dist = np.sqrt(np.maximum(sq, 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            row_ratio = dist / index.thresholds
+        row_ratio[np.isnan(row_ratio)] = np.inf
+        # Predicción del clasificador: fila más cercana y su umbral.
+        nearest = dist.argmin(axis=1)
+        accepted = row_ratio[np.arange(len(X)), nearest] < 1
+        predicted = np.where(accepted, index.row_labels[nearest], n)
+        true = np.where(y >= 0, y, n)
+        self.negatives += int((y < 0).sum())
+        self.confusion += np.bincount(
+            true * (n + 1) + predicted, minlength=(n + 1) ** 2
+        ).reshape(n + 1, n + 1)
+        # Mejor distancia relativa por etiqueta.
+        ratio = np.minimum.reduceat(row_ratio[:, self._order], self._starts, axis=1)
+        ratio[:, ~self._present] = np.inf
+        bin_of = np.minimum(ratio * (self.bins / self.ratio_max), self.bins).astype(
+            np.int64
+        )
+        cols = np.broadcast_to(np.arange(n), bin_of.shape)
+        own = cols == y[:, None]
+        flat = cols * (self.bins + 1) + bin_of
+        size = n * (self.bins + 1)
+        self.genuine += np.bincount(flat[own], minlength=size).reshape(n, -1)
+        self.impostor += np.bincount(flat[~own], minlength=size).reshape(n, -1)
+
+    @property
+    def edges(self):
+        """Distancias relativas al umbral en el borde superior de cada cubo."""
+        return np.arange(1, self.bins + 1) * (self.ratio_max / self.bins)
+
+    def roc(self, label):
+        """
+        Curva ROC de `label`: (escala del umbral, FAR, TAR) para cada borde
+        de cubo. Con escala s se aceptan las muestras con distancia < s * umbral.
+        """
+        i = self.labels.index(label)
+        genuine = np.cumsum(self.genuine[i, :-1]) / max(self.genuine[i].sum(), 1)
+        impostor = np.cumsum(self.impostor[i, :-1]) / max(self.impostor[i].sum(), 1)
+        return self.edges, impostor, genuine
+
+    def threshold_scales(self, target_far=TARGET_FAR):
+        """
+        Escala por etiqueta del umbral actual que da la mayor tasa de
+        aceptación sin superar `target_far` de falsas aceptaciones. Las
+        etiquetas sin impostores conservan su umbral (escala 1). Sin
+        muestras sin gesto los impostores son solo los demás gestos, que no
+        dicen nada de las poses intermedias: entonces el umbral solo puede
+        estrecharse (escala <= 1). Una escala 0 significa que ningún umbral
+        cumple el objetivo.
+        """
+        scales = np.ones(len(self.labels))
+        for i, label in enumerate(self.labels):
+            if not self.impostor[i].sum():
+                continue
+            edges, far, _ = self.roc(label)
+            ok = np.flatnonzero(far <= target_far)
+            scales[i] = edges[ok[-1]] if len(ok) else 0.0
+        if not self.negatives:
+            np.minimum(scales, 1.0, out=scales)
+        return scales
+
+    def calibrated_index(self, target_far=TARGET_FAR):
+        """
+        Copia (en memoria) del índice con los umbrales ajustados a
+        `target_far`. ValueError si algún gesto quedaría desactivado
+        (ningún umbral cumple el objetivo).
+        """
+        scales = self.threshold_scales(target_far)
+        disabled = [l for l, s in zip(self.labels, scales) if not s]
+        if disabled:
+            message = f"Ningún umbral cumple FAR <= {target_far} para: "
+            raise ValueError(message + ", ".join(disabled))
+        index = self.index
+        return PrototypeIndex(
+            index.labels,
+            np.array(index.matrix),
+            np.array(index.row_labels),
+            index.thresholds * scales[index.row_labels],
+            np.array(index.sq_norms),
+        )
+
+    def summary(self, target_far=TARGET_FAR):
+        """
+        Dict con exactitud, confusión y, por etiqueta, FAR/TAR con los
+        umbrales actuales y con los calibrados.
+        """
+        n = len(self.labels)
+        total = self.confusion.sum()
+        labelled = self.confusion[:n].sum()
+        scales = self.threshold_scales(target_far)
+        per_label = {}
+        one = int(round(self.bins / self.ratio_max)) - 1
+        for i, label in enumerate(self.labels):
+            edges, far, tar = self.roc(label)
+            k = min(
+                max(int(round(scales[i] * self.bins / self.ratio_max)) - 1, 0),
+                self.bins - 1,
+            )
+            per_label[label] = {
+                "samples": int(self.genuine[i].sum()),
+                "far": float(far[one]),
+                "tar": float(tar[one]),
+                "scale": float(scales[i]),
+                "calibrated_far": float(far[k]) if scales[i] else 0.0,
+                "calibrated_tar": float(tar[k]) if scales[i] else 0.0,
+            }
+        return {
+            "samples": int(total),
+            "accuracy": (
+                float(np.trace(self.confusion[:n, :n]) / labelled) if labelled else 0.0
+            ),
+            "labels": self.labels,
+            "confusion": self.confusion.tolist(),
+            "per_label": per_label,
+            "negatives": self.negatives,
+        }
+
+
+def evaluate_dataset(dataset, index, negatives=()):
+    """
+    Evalúa `index` con todas las muestras vigentes de `dataset` (leídas del
+    memmap por rangos contiguos) y los arrays de `negatives` (muestras sin
+    gesto, p. ej. de sesiones grabadas). Las etiquetas que el modelo no
+    conoce se cuentan como muestras sin gesto.
+    """
+    evaluation = Evaluation(index)
+    features = dataset.column("features")
+    for label in dataset.labels():
+        y = index.labels.index(label) if label in index.labels else -1
+        for start, stop in dataset.index["ranges"][label]:
+            evaluation.add(features[start:stop], np.full(stop - start, y))
+    for X in negatives:
+        evaluation.add(X, np.full(len(X), -1))
+    return evaluation
+
+
+def log_features(log):
+    """Características normalizadas de las manos válidas de un LandmarkLog."""
+    features, _, valid = normalize_landmarks_batch(log.hands["landmarks"])
+    return features[valid]
+
+
+def print_summary(summary, target_far):
+    labels = summary["labels"]
+    print(f"Muestras: {summary['samples']}  exactitud: {summary['accuracy']:.4f}")
+    names = labels + ["ninguno"]
+    width = max(8, *(len(n) for n in names))
+    print("Confusión (filas: real, columnas: predicha)")
+    print(" " * width + "".join(f"{n:>{width}}" for n in names))
+    for name, row in zip(labels + ["sin gesto"], summary["confusion"]):
+        print(f"{name:>{width}}" + "".join(f"{v:>{width}}" for v in row))
+    print(f"Umbrales para FAR <= {target_far}:")
+    print(
+        f"{'gesto':>{width}} {'FAR':>7} {'TAR':>7} {'escala':>7} {'FAR':>7} {'TAR':>7}"
+    )
+    for label, s in summary["per_label"].items():
+        print(
+            f"{label:>{width}} {s['far']:7.4f} {s['tar']:7.4f} {s['scale']:7.3f} "
+            f"{s['calibrated_far']:7.4f} {s['calibrated_tar']:7.4f}"
+        )
+
+
+def main(argv=None):
+    from app.core_logic import (
+        MODEL_PATH,
+        get_dataset,
+        is_model_trained,
+        load_gesture_model,
+    )
+    from app.landmark_log import read_landmark_log
+    from app.model_store import save_model
+    from app.utils import NORMALIZATION
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--far", type=float, default=TARGET_FAR, help="FAR objetivo")
+    parser.add_argument(
+        "--negatives",
+        nargs="*",
+        default=[],
+        help="registros de landmarks grabados sin gestos (falsas aceptaciones)",
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="guardar los umbrales calibrados"
+    )
+    parser.add_argument("--json", action="store_true", help="salida en formato JSON")
+    args = parser.parse_args(argv)
+
+    if not is_model_trained():
+        print("Se necesita un modelo entrenado.", file=sys.stderr)
+        return 1
+    model = load_gesture_model()
+    dataset = get_dataset()
+    negatives = [log_features(read_landmark_log(path)) for path in args.negatives]
+    evaluation = evaluate_dataset(dataset, model, negatives)
+    fingerprint = model.header["dataset_fingerprint"]
+    del model
+    summary = evaluation.summary(args.far)
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print_summary(summary, args.far)
+    if args.apply:
+        try:
+            calibrated = evaluation.calibrated_index(args.far)
+        except ValueError as e:
+            print(f"No se guardan los umbrales: {e}", file=sys.stderr)
+            return 1
+        del evaluation
+        save_model(MODEL_PATH, calibrated, NORMALIZATION, fingerprint)
+        print(f"Umbrales guardados en {MODEL_PATH}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
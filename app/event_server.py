@@ -0,0 +1,204 @@
+import asyncio
+import json
+import math
+import os
+import time
+
+from app.key_dispatcher import KeyEvent
+
+PROTOCOL_VERSION = 1
+# Socket Unix por defecto (relativo al directorio de trabajo).
+DEFAULT_SOCKET = "gesture-events.sock"
+# Mensajes pendientes por suscriptor antes de considerarlo lento.
+SUBSCRIBER_QUEUE = 256
+# Segundos que se espera a que los suscriptores reciban lo pendiente al cerrar.
+CLOSE_TIMEOUT = 1.0
+
+
+def _ratio(value):
+    """Ratio como número JSON válido (None si no hay o es infinito)."""
+    return float(value) if value is not None and math.isfinite(value) else None
+
+
+class Subscriber:
+    """
+    Cliente conectado: una cola acotada de líneas ya codificadas. Si se
+    llena (el cliente lee más despacio de lo que llegan eventos), lo
+    pendiente se descarta y se sustituye por un mensaje "sync" con las
+    teclas pulsadas en ese momento, así que el cliente recupera el estado
+    sin que la memoria crezca.
+    """
+
+    def __init__(self, size=SUBSCRIBER_QUEUE):
+        self.queue = asyncio.Queue(size)
+        self.dropped = 0
+        # Tarea que atiende la conexión (se cancela al cerrar el servidor).
+        self.task = None
+
+    def offer(self, line, server):
+        try:
+            self.queue.put_nowait(line)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.dropped += 1
+            self.queue.put_nowait(server.sync_line(self.dropped))
+
+
+class GestureEventServer:
+    """
+    Publica los eventos de gestos en un socket local (Unix en `path`, o TCP
+    en `host`:`port`) para cualquier número de suscriptores, como líneas
+    JSON. Al conectarse, cada cliente recibe un "hello" con las teclas
+    pulsadas; después, un "gesture" por cada pulsación o liberación:
+
+        {"type": "gesture", "seq": 12, "key": "a", "pressed": true,
+         "frame_time": 1834.52, "latency_ms": 3.1, "ratio": 0.42}
+
+    `frame_time` es el instante de captura del fotograma (time.perf_counter,
+    CLOCK_MONOTONIC en Linux) y `ratio` la distancia relativa al umbral del
+    gesto. Cada cliente se atiende con su propia tarea y `drain()`, de modo
+    que uno lento no frena a los demás ni al bucle de visión (ver Subscriber).
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, port=None, host="127.0.0.1"):
+        self.path = path
+        self.port = port
+        self.host = host
+        self.subscribers = set()
+        self.pressed = set()
+        self.seq = 0
+        self.loop = None
+        self._server = None
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}" if self.port is not None else self.path
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        if self.port is not None:
+            self._server = await asyncio.start_server(self._serve, self.host, self.port)
+            if self.port == 0:
+                self.port = self._server.sockets[0].getsockname()[1]
+        else:
+            # Un socket de una ejecución anterior que no se cerró bien.
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._server = await asyncio.start_unix_server(self._serve, self.path)
+
+    async def close(self):
+        """Deja de aceptar clientes, entrega lo pendiente y los desconecta."""
+        if self._server is None:
+            return
+        self._server.close()
+        pending = [asyncio.ensure_future(s.queue.join()) for s in self.subscribers]
+        if pending:
+            _, late = await asyncio.wait(pending, timeout=CLOSE_TIMEOUT)
+            # Clientes que no leyeron a tiempo: no se espera más por ellos.
+            for waiter in late:
+                waiter.cancel()
+        tasks = [s.task for s in self.subscribers]
+        for task in tasks:
+            task.cancel()
+        # Cada tarea quita su suscriptor y cierra su conexión al terminar.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        if self.port is None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def publish_threadsafe(self, event):
+        """publish desde otro hilo (el KeyDispatcher)."""
+        self.loop.call_soon_threadsafe(self.publish, event)
+
+    def publish(self, event):
+        """Envía un KeyEvent a todos los suscriptores."""
+        self.seq += 1
+        message = {
+            "type": "gesture",
+            "seq": self.seq,
+            "key": event.key,
+            "pressed": event.pressed,
+            "frame_time": event.timestamp,
+            "latency_ms": (time.perf_counter() - event.timestamp) * 1000.0,
+            "ratio": _ratio(event.ratio),
+        }
+        if event.pressed:
+            self.pressed.add(event.key)
+        else:
+            self.pressed.discard(event.key)
+        line = self._encode(message)
+        for subscriber in self.subscribers:
+            subscriber.offer(line, self)
+
+    def sync_line(self, dropped):
+        return self._encode(
+            {
+                "type": "sync",
+                "seq": self.seq,
+                "pressed": sorted(self.pressed),
+                "dropped": dropped,
+            }
+        )
+
+    def _encode(self, message):
+        return (json.dumps(message) + "\n").encode("utf-8")
+
+    async def _serve(self, reader, writer):
+        subscriber = Subscriber()
+        subscriber.queue.put_nowait(
+            self._encode(
+                {
+                    "type": "hello",
+                    "version": PROTOCOL_VERSION,
+                    "seq": self.seq,
+                    "pressed": sorted(self.pressed),
+                }
+            )
+        )
+        subscriber.task = asyncio.current_task()
+        self.subscribers.add(subscriber)
+        pump = asyncio.ensure_future(self._pump(subscriber, writer))
+        # Los clientes no envían nada: la lectura solo detecta el cierre.
+        closed = asyncio.ensure_future(reader.read())
+        try:
+            await asyncio.wait([pump, closed], return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+            pump.cancel()
+            closed.cancel()
+            writer.close()
+
+    async def _pump(self, subscriber, writer):
+        """Escribe la cola del suscriptor esperando a que el socket drene."""
+        try:
+            while True:
+                line = await subscriber.queue.get()
+                writer.write(line)
+                subscriber.queue.task_done()
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+
+
+class EventBackend:
+    """
+    Backend de KeyDispatcher que publica los eventos en un
+    GestureEventServer en lugar de pulsar teclas en el sistema.
+    """
+
+    def __init__(self, server):
+        self.server = server
+
+    def send(self, event):
+        self.server.publish_threadsafe(event)
+
+    def press(self, key):
+        self.send(KeyEvent(key, True, time.perf_counter()))
+
+    def release(self, key):
+        self.send(KeyEvent(key, False, time.perf_counter()))
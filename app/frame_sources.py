@@ -0,0 +1,153 @@
+import os
+import time
+import numpy as np
+
+from app.startup import lazy_import
+
+cv2 = lazy_import("cv2")
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class FrameSource:
+    """
+    Fuente de fotogramas con la misma interfaz que cv2.VideoCapture
+    (read / isOpened / release). `live` indica si la fuente produce
+    fotogramas en tiempo real (cámara) o bajo demanda (archivos, sintética).
+    """
+
+    live = False
+
+    def read(self, image=None):
+        """
+        Devuelve (ret, frame). Si `image` es un array del tamaño adecuado, el
+        fotograma se escribe en él en lugar de reservar uno nuevo.
+        """
+        raise NotImplementedError
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """Cámara física a través de cv2.VideoCapture."""
+
+    live = True
+
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+
+    def read(self, image=None):
+        return self.cap.read(image)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        if self.cap.isOpened():
+            self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Archivo de video grabado; con `loop=True` vuelve al inicio al terminar."""
+
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+
+    def read(self, image=None):
+        ret, frame = self.cap.read(image)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(image)
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        if self.cap.isOpened():
+            self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Directorio de imágenes leídas en orden alfabético."""
+
+    def __init__(self, directory, loop=False):
+        self.files = sorted(
+            os.path.join(directory, f)
+            for f in os.listdir(directory)
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.loop = loop
+        self.pos = 0
+
+    def read(self, image=None):
+        if self.pos >= len(self.files):
+            if not self.loop or not self.files:
+                return False, None
+            self.pos = 0
+        frame = cv2.imread(self.files[self.pos])
+        self.pos += 1
+        return frame is not None, frame
+
+    def isOpened(self):
+        return bool(self.files)
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generador de fotogramas sintéticos (una barra que se desplaza sobre ruido
+    fijo). Sirve para medir el rendimiento sin cámara ni archivos.
+    `fps` limita la velocidad para simular una cámara; None = sin límite.
+    """
+
+    def __init__(self, width=640, height=480, num_frames=300, fps=None, seed=0):
+        rng = np.random.default_rng(seed)
+        self.background = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        self.num_frames = num_frames
+        self.fps = fps
+        self.live = fps is not None
+        self.count = 0
+        self._next_time = None
+
+    def read(self, image=None):
+        if self.num_frames is not None and self.count >= self.num_frames:
+            return False, None
+        if self.fps:
+            now = time.perf_counter()
+            if self._next_time is not None and now < self._next_time:
+                time.sleep(self._next_time - now)
+            self._next_time = max(now, self._next_time or now) + 1.0 / self.fps
+        if image is not None and image.shape == self.background.shape:
+            np.copyto(image, self.background)
+            frame = image
+        else:
+            frame = self.background.copy()
+        w = frame.shape[1]
+        x = (self.count * 8) % w
+        frame[:, x : x + 40] = 255
+        self.count += 1
+        return True, frame
+
+
+def open_source(spec=0, loop=False):
+    """
+    Construye una FrameSource a partir de una especificación:
+    un índice de cámara (int o "0"), un directorio de imágenes, un archivo
+    de video o "synthetic[:N]" para N fotogramas sintéticos.
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if spec.startswith("synthetic"):
+        _, _, n = spec.partition(":")
+        return SyntheticSource(num_frames=int(n) if n else 300)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, loop=loop)
+    return VideoFileSource(spec, loop=loop)
@@ -4,8 +4,8 @@ import os
 import threading
 from PIL import Image
 from customtkinter import CTkImage
-import cv2
 
+from app.startup import mark, warm_up
 from app.core_logic import (
     save_config,
     load_config,
@@ -14,12 +14,19 @@ from app.core_logic import (
     train_model,
     OpenCVController,
     is_model_trained,
+    get_player_keys,
+    is_gesture_captured,
 )
+from app.multi_camera import MultiCameraController
+from app.session_pool import SessionPool
+from app.pipeline import PreviewFrames
 
 # Constantes para el centrado de la ventana de la cámara
 CAM_WIDTH, CAM_HEIGHT = 640, 480
 # Padding vertical para alojar el título, el label de muestras y la barra de progreso
 VERTICAL_PADDING = 120
+# Máximo de jugadores seleccionable; a partir de 5 se usa una rejilla de zonas
+MAX_PLAYERS = 8
 
 
 class GestureApp(ctk.CTk):
@@ -33,10 +40,27 @@ class GestureApp(ctk.CTk):
         self.opencv_controller = None
         self.video_window = None
         self.stop_event = threading.Event()
-        self.frame_lock = threading.Lock()
-        self.last_frame_data = {}
+        self.thread = None
+        self.preview = PreviewFrames((CAM_WIDTH, CAM_HEIGHT))
+        self.rendered_seq = 0
+        # Cámara y MediaPipe se mantienen abiertos entre capturas y partidas
+        self.session_pool = SessionPool()
         self.setup_widgets()
         self.update_button_states()
+        self.after_idle(self.on_first_window)
+
+    def on_first_window(self):
+        # Las dependencias pesadas se cargan después de mostrar el panel
+        mark("primera ventana")
+        warm_up()
+        self.after(100, self.prewarm_sessions)
+
+    def prewarm_sessions(self):
+        config = load_config()
+        hands_configs = [(1, 0.7)]
+        if config and config["num_players"] > 1:
+            hands_configs.append((config["num_players"], 0.7))
+        self.session_pool.prewarm(hands_configs)
 
     def setup_widgets(self):
         # (Sin cambios en esta función)
@@ -88,10 +112,21 @@ class GestureApp(ctk.CTk):
         if self.video_window:
             return
         self.stop_event.clear()
-        self.last_frame_data = {}
+        self.preview = PreviewFrames((CAM_WIDTH, CAM_HEIGHT))
+        self.rendered_seq = 0
 
+        config = load_config() or {}
         try:
-            self.opencv_controller = OpenCVController(self.update_gui_from_cv)
+            if mode != "capture" and config.get("cameras"):
+                # El motor multicámara abre sus propias cámaras.
+                self.session_pool.close()
+                self.opencv_controller = MultiCameraController(
+                    self.update_gui_from_cv, config["cameras"]
+                )
+            else:
+                self.opencv_controller = OpenCVController(
+                    self.update_gui_from_cv, pool=self.session_pool
+                )
         except IOError as e:
             messagebox.showerror("Error de Cámara", str(e))
             return
@@ -147,12 +182,10 @@ class GestureApp(ctk.CTk):
         if self.stop_event.is_set():
             return
 
-        with self.frame_lock:
-            frame_data = self.last_frame_data.copy()
-        image = frame_data.get("image")
-
-        if image is not None and self.video_window and self.video_label.winfo_exists():
-            img_pil = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        frame = self.preview.acquire(self.rendered_seq)
+        if frame is not None and self.video_window and self.video_label.winfo_exists():
+            self.rendered_seq, rgb, frame_data = frame
+            img_pil = Image.fromarray(rgb)
             if not hasattr(self.video_label, "_ctk_image_obj"):
                 self.video_label._ctk_image_obj = CTkImage(
                     light_image=img_pil, size=img_pil.size
@@ -171,11 +204,13 @@ class GestureApp(ctk.CTk):
                     text=f"Muestras: {frame_data['count']} / {frame_data['total']}"
                 )
 
-        self.after(16, self.render_loop)
+        # El refresco se adapta a la velocidad de la cámara
+        self.after(self.preview.refresh_ms(), self.render_loop)
 
-    def update_gui_from_cv(self, **kwargs):
-        with self.frame_lock:
-            self.last_frame_data = kwargs
+    def update_gui_from_cv(self, image, **kwargs):
+        # Se ejecuta en el hilo de visión: la conversión de color y el
+        # escalado se hacen aquí y no en el hilo de Tk.
+        self.preview.publish(image, **kwargs)
 
     def stop_opencv_task(self):
         if not self.stop_event.is_set():
@@ -183,6 +218,11 @@ class GestureApp(ctk.CTk):
             self.after(200, self.cleanup_after_stop)
 
     def cleanup_after_stop(self):
+        # La tarea puede seguir usando la cámara o los procesos de inferencia
+        # hasta que vea stop_event: se libera solo cuando su hilo terminó.
+        if self.thread is not None and self.thread.is_alive():
+            self.after(50, self.cleanup_after_stop)
+            return
         if self.opencv_controller:
             self.opencv_controller.release()
             self.opencv_controller = None
@@ -191,13 +231,10 @@ class GestureApp(ctk.CTk):
             self.video_window = None
         self.update_button_states()
 
-    def handle_capture_completion(self, success):
+    def handle_capture_completion(self, result):
         self.stop_opencv_task()
-        (
-            messagebox.showinfo("Éxito", "¡Gesto capturado!")
-            if success
-            else messagebox.showwarning("Cancelado", "Captura cancelada o incompleta.")
-        )
+        message, success = result
+        (messagebox.showinfo if success else messagebox.showwarning)("Captura", message)
         self.open_capture_window()
 
     def thread_wrapper(self, target_func, args, on_complete):
@@ -208,7 +245,14 @@ class GestureApp(ctk.CTk):
     def on_closing(self):
         if self.video_window:
             self.stop_opencv_task()
-        self.after(250, self.destroy)
+        self.after(250, self.shutdown)
+
+    def shutdown(self):
+        if self.opencv_controller:
+            self.after(50, self.shutdown)
+            return
+        self.session_pool.close()
+        self.destroy()
 
     def update_button_states(self):
         config = load_config()
@@ -260,7 +304,7 @@ class SetupWindow(ctk.CTkToplevel):
         super().__init__(master)
         self.master = master
         self.title("Configurar Jugadores")
-        self.geometry("350x400")
+        self.geometry("350x560")
         self.transient(master)
         ctk.CTkLabel(
             self,
@@ -270,7 +314,7 @@ class SetupWindow(ctk.CTkToplevel):
         ctk.CTkLabel(self, text="Número de Jugadores:").pack(pady=(5, 0))
         self.num_players_combo = ctk.CTkComboBox(
             self,
-            values=[str(i) for i in range(1, 5)],
+            values=[str(i) for i in range(1, MAX_PLAYERS + 1)],
             command=self.update_player_entries,
         )
         self.num_players_combo.pack()
@@ -288,8 +332,8 @@ class SetupWindow(ctk.CTkToplevel):
 
     def create_entry(self, i):
         f = ctk.CTkFrame(self.entries_frame)
-        ctk.CTkLabel(f, text=f"Tecla Jugador {i}:").pack(side="left", padx=5)
-        e = ctk.CTkEntry(f, width=50)
+        ctk.CTkLabel(f, text=f"Teclas Jugador {i}:").pack(side="left", padx=5)
+        e = ctk.CTkEntry(f, width=120, placeholder_text="a, b, c")
         e.pack(side="left", padx=5)
         self.player_entries[str(i)] = e
         f.pack(pady=5)
@@ -298,12 +342,17 @@ class SetupWindow(ctk.CTkToplevel):
         try:
             num_p = int(self.num_players_combo.get())
             keys = {
-                str(i): self.player_entries[str(i)].get().strip().lower()
+                str(i): [
+                    k.strip()
+                    for k in self.player_entries[str(i)].get().lower().split(",")
+                ]
                 for i in range(1, num_p + 1)
             }
-            if any(not key or len(key) != 1 for key in keys.values()):
+            if any(not k or len(k) != 1 for ks in keys.values() for k in ks):
                 messagebox.showerror("Error", "Tecla debe ser un solo caracter.")
                 return
+            # Un solo gesto se guarda como tecla simple, igual que antes.
+            keys = {p: ks[0] if len(ks) == 1 else ks for p, ks in keys.items()}
             save_config(num_p, keys)
             messagebox.showinfo("Éxito", "Guardado")
             self.master.update_button_states()
@@ -320,30 +369,30 @@ class CaptureWindow(ctk.CTkToplevel):
         self.geometry("420x300")
         self.transient(master)
         self.config = load_config()
-        self.capture_status = get_capture_status()
         ctk.CTkLabel(
             self,
             text="Selecciona un jugador para capturar:",
             font=ctk.CTkFont(weight="bold"),
         ).pack(pady=10)
+        # Desplazable: cada jugador puede tener muchos gestos.
+        self.entries_frame = ctk.CTkScrollableFrame(self, fg_color="transparent")
+        self.entries_frame.pack(fill="both", expand=True)
         if self.config:
-            for p_id, key in self.config["players"].items():
-                self.create_capture_entry(p_id, key)
+            for p_id, keys in get_player_keys(self.config).items():
+                for key in keys:
+                    self.create_capture_entry(p_id, key)
 
     def create_capture_entry(self, p_id, key):
-        frame = ctk.CTkFrame(self)
-        status = "✅ Capturado" if self.capture_status.get(p_id) else "❌ Pendiente"
-        color = (
-            ("#2ECC71", "#27AE60")
-            if self.capture_status.get(p_id)
-            else ("#E74C3C", "#C0392B")
-        )
+        frame = ctk.CTkFrame(self.entries_frame)
+        captured = is_gesture_captured(key)
+        status = "✅ Capturado" if captured else "❌ Pendiente"
+        color = ("#2ECC71", "#27AE60") if captured else ("#E74C3C", "#C0392B")
         ctk.CTkLabel(frame, text=f"Jugador {p_id} (Tecla: '{key}') - {status}").pack(
             side="left", padx=10, pady=5
         )
         btn = ctk.CTkButton(
             frame,
-            text="Re-capturar" if self.capture_status.get(p_id) else "Capturar",
+            text="Re-capturar" if captured else "Capturar",
             fg_color=color[0],
             hover_color=color[1],
             command=lambda p=p_id, k=key: self.start_capture(p, k),
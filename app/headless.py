@@ -0,0 +1,163 @@
+"""
+Ejecución sin interfaz gráfica del pipeline de juego.
+
+Uso:
+    python -m app.headless video.mp4 --frames 500
+    python -m app.headless synthetic:300 --json
+    python -m app.headless 0 1 --tiles 2x1     # dos cámaras, cuatro procesos
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import numpy as np
+
+from app.core_logic import OpenCVController, load_config, is_model_trained
+from app.frame_sources import open_source
+from app.key_dispatcher import MemoryBackend
+from app.multi_camera import MultiCameraController
+
+
+def run_play_benchmark(
+    source,
+    max_frames=None,
+    warmup=5,
+    draw_overlay=True,
+    mirror_landmarks=False,
+    record_path=None,
+    cameras=None,
+):
+    """
+    Pasa todos los fotogramas de `source` por `OpenCVController.run_play`
+    y devuelve un dict con fotogramas/segundo y latencia por fotograma
+    (desde que se captura hasta que se entrega a la interfaz), en milisegundos.
+    Los primeros `warmup` fotogramas no se incluyen en las estadísticas.
+    Las teclas van a un MemoryBackend; se informa cuántos eventos hubo y su
+    latencia desde la captura del fotograma hasta el envío.
+    Con `cameras` (formato de config["cameras"]) se usa el motor
+    multicámara en lugar de `source`.
+    """
+    stop_event = threading.Event()
+    keyboard = MemoryBackend()
+    latencies, arrivals = [], []
+
+    def on_frame(image=None, timestamp=None, **kwargs):
+        now = time.perf_counter()
+        arrivals.append(now)
+        if timestamp is not None:
+            latencies.append(now - timestamp)
+        if max_frames is not None and len(arrivals) >= max_frames + warmup:
+            stop_event.set()
+
+    if cameras:
+        controller = MultiCameraController(
+            on_frame,
+            cameras,
+            keyboard=keyboard,
+            draw_overlay=draw_overlay,
+            mirror_landmarks=mirror_landmarks,
+        )
+    else:
+        controller = OpenCVController(
+            on_frame,
+            source=open_source(source),
+            keyboard=keyboard,
+            draw_overlay=draw_overlay,
+            mirror_landmarks=mirror_landmarks,
+            record_path=record_path,
+        )
+    try:
+        controller.run_play(stop_event)
+    finally:
+        controller.release()
+
+    measured = np.array(latencies[warmup:]) * 1000.0
+    key_latency = np.array(controller.dispatcher.latencies) * 1000.0
+    times = arrivals[warmup:]
+    elapsed = times[-1] - times[0] if len(times) > 1 else 0.0
+    tracker = getattr(controller, "tracker", None)
+    return {
+        "frames": len(measured),
+        "elapsed_s": elapsed,
+        "fps": (len(times) - 1) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms_mean": float(measured.mean()) if measured.size else 0.0,
+        "latency_ms_p50": float(np.percentile(measured, 50)) if measured.size else 0.0,
+        "latency_ms_p95": float(np.percentile(measured, 95)) if measured.size else 0.0,
+        "latency_ms_max": float(measured.max()) if measured.size else 0.0,
+        "key_presses": keyboard.presses,
+        "key_events": len(keyboard.events),
+        "key_latency_ms_p50": (
+            float(np.percentile(key_latency, 50)) if key_latency.size else 0.0
+        ),
+        "key_latency_ms_p95": (
+            float(np.percentile(key_latency, 95)) if key_latency.size else 0.0
+        ),
+        "inferences": controller.inferences,
+        # Manos clasificadas y manos que repitieron la clasificación de su pista.
+        "classified": tracker.classified if tracker is not None else None,
+        "reused": tracker.reused if tracker is not None else None,
+        "dropped": controller.stats.dropped,
+        "stages": controller.stats.summary()["stages"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "source",
+        nargs="+",
+        help="video, directorio de imágenes, índice de cámara o synthetic[:N]; "
+        "con varias se usa el motor multicámara",
+    )
+    parser.add_argument(
+        "--tiles",
+        help="COLSxFILAS: dividir cada cámara en mosaicos, un proceso por mosaico",
+    )
+    parser.add_argument(
+        "--frames", type=int, default=None, help="máximo de fotogramas a medir"
+    )
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--no-overlay", action="store_true", help="no dibujar zonas ni landmarks"
+    )
+    parser.add_argument(
+        "--mirror-landmarks",
+        action="store_true",
+        help="reflejar los landmarks en vez de voltear la imagen (con --no-overlay)",
+    )
+    parser.add_argument("--record", help="grabar los landmarks en este archivo")
+    parser.add_argument("--json", action="store_true", help="salida en formato JSON")
+    args = parser.parse_args(argv)
+
+    if load_config() is None or not is_model_trained():
+        print("Se necesita config.json y un modelo entrenado.", file=sys.stderr)
+        return 1
+    cameras = None
+    if len(args.source) > 1 or args.tiles:
+        tiles = [int(n) for n in (args.tiles or "1x1").lower().split("x")]
+        cameras = [{"source": s, "tiles": tiles} for s in args.source]
+    stats = run_play_benchmark(
+        args.source[0],
+        args.frames,
+        args.warmup,
+        draw_overlay=not args.no_overlay,
+        mirror_landmarks=args.mirror_landmarks,
+        record_path=args.record,
+        cameras=cameras,
+    )
+    if args.json:
+        print(json.dumps(stats))
+    else:
+        stages = stats.pop("stages")
+        for k, v in stats.items():
+            print(f"{k:>18}: {v:.3f}" if isinstance(v, float) else f"{k:>18}: {v}")
+        print(f"{'etapa (ms)':>18}  {'p50':>7} {'p95':>7} {'p99':>7}")
+        for stage, s in stages.items():
+            print(f"{stage:>18}  {s['p50']:7.2f} {s['p95']:7.2f} {s['p99']:7.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+
+from app.startup import timed_import
+
+# Pulsación (pressed=True) o liberación de `key`; `timestamp` es el instante
+# de captura del fotograma que la originó (time.perf_counter()) y `ratio` la
+# distancia relativa al umbral del gesto en ese fotograma (None si no hay).
+KeyEvent = namedtuple(
+    "KeyEvent", ["key", "pressed", "timestamp", "ratio"], defaults=(None,)
+)
+
+# Valores por defecto de config["hysteresis"], en múltiplos del umbral del
+# prototipo: se pulsa por debajo de `enter` y se suelta a partir de `exit`,
+# y una tecla se mantiene al menos `min_hold_frames` fotogramas.
+HYSTERESIS_DEFAULTS = {"enter": 1.0, "exit": 1.15, "min_hold_frames": 3}
+# Latencias recientes que conserva el despachador para sus estadísticas.
+LATENCY_HISTORY = 1024
+
+
+class PynputBackend:
+    """Envía las teclas al sistema operativo con pynput."""
+
+    def __init__(self):
+        self.controller = timed_import("pynput.keyboard").Controller()
+
+    def press(self, key):
+        self.controller.press(key)
+
+    def release(self, key):
+        self.controller.release(key)
+
+
+class MemoryBackend:
+    """Guarda las pulsaciones en memoria como (tecla, pulsada, instante)."""
+
+    def __init__(self):
+        self.events = []
+
+    def press(self, key):
+        self.events.append((key, True, time.perf_counter()))
+
+    def release(self, key):
+        self.events.append((key, False, time.perf_counter()))
+
+    @property
+    def presses(self):
+        return sum(1 for _, pressed, _ in self.events if pressed)
+
+
+class GestureDebouncer:
+    """
+    Convierte las clasificaciones de cada fotograma en pulsaciones con
+    histéresis: una tecla se pulsa cuando su mejor distancia relativa al
+    umbral baja de `enter`, y se suelta cuando supera `exit` (o su gesto
+    desaparece) tras haberse mantenido al menos `min_hold_frames`
+    fotogramas. Así el ruido alrededor del umbral no genera ráfagas.
+    """
+
+    def __init__(self, keys, settings=None):
+        settings = {**HYSTERESIS_DEFAULTS, **(settings or {})}
+        self.enter = float(settings["enter"])
+        self.exit = max(self.enter, float(settings["exit"]))
+        self.min_hold_frames = int(settings["min_hold_frames"])
+        self.held = {}
+        self.set_keys(keys)
+
+    def set_keys(self, keys):
+        """Cambia las teclas vigiladas; devuelve las pulsadas que ya no lo están."""
+        keys = list(keys)
+        dropped = [k for k in self.pressed() if k not in keys]
+        self.held = {k: self.held.get(k) for k in keys}
+        return dropped
+
+    def update(self, ratios):
+        """
+        `ratios` es {tecla: mejor distancia relativa del fotograma}. Devuelve
+        la lista de cambios [(tecla, pulsada)].
+        """
+        changes = []
+        for key, frames in self.held.items():
+            ratio = ratios.get(key, float("inf"))
+            if frames is None:
+                if ratio < self.enter:
+                    self.held[key] = 1
+                    changes.append((key, True))
+            elif ratio >= self.exit and frames >= self.min_hold_frames:
+                self.held[key] = None
+                changes.append((key, False))
+            else:
+                self.held[key] = frames + 1
+        return changes
+
+    def pressed(self):
+        return [k for k, frames in self.held.items() if frames is not None]
+
+
+class KeyDispatcher:
+    """
+    Hilo dedicado que ejecuta las pulsaciones en `backend`, para que las
+    llamadas al sistema no detengan la visión. Los eventos llegan por una
+    queue.SimpleQueue (put no bloquea al productor) y se anota la latencia
+    desde la captura del fotograma hasta que se envió la tecla. Si el
+    backend tiene `send(event)`, recibe el KeyEvent completo en lugar de
+    press/release.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._queue = queue.SimpleQueue()
+        self._pressed = set()
+        self.sent = 0
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+        self._thread = threading.Thread(
+            target=self._run, name="key-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, key, pressed, timestamp=None, ratio=None):
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        self._queue.put(KeyEvent(key, pressed, timestamp, ratio))
+
+    def _send(self, event):
+        send = getattr(self.backend, "send", None)
+        if send is not None:
+            send(event)
+        elif event.pressed:
+            self.backend.press(event.key)
+        else:
+            self.backend.release(event.key)
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            self._send(event)
+            if event.pressed:
+                self._pressed.add(event.key)
+            else:
+                self._pressed.discard(event.key)
+            self.sent += 1
+            self.latencies.append(time.perf_counter() - event.timestamp)
+
+    def close(self):
+        """Envía los eventos pendientes, suelta las teclas pulsadas y termina."""
+        self._queue.put(None)
+        self._thread.join()
+        for key in list(self._pressed):
+            self._send(KeyEvent(key, False, time.perf_counter()))
+        self._pressed.clear()
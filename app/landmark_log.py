@@ -0,0 +1,150 @@
+import json
+import mmap
+import os
+import struct
+import time
+import numpy as np
+
+MAGIC = b"GESTLMKS"
+SCHEMA_VERSION = 1
+# Cabecera de cada fotograma: segundos desde el inicio y número de manos.
+FRAME_HEADER = struct.Struct("<dB")
+# Registro de cada mano: lateralidad (0 izquierda, 1 derecha, 255 desconocida),
+# confianza de MediaPipe y los 21 landmarks en coordenadas normalizadas.
+HAND_DTYPE = np.dtype(
+    [("handedness", "u1"), ("score", "<f4"), ("landmarks", "<f4", (21, 3))]
+)
+HANDEDNESS = {"Left": 0, "Right": 1}
+UNKNOWN_HANDEDNESS = 255
+
+
+class LandmarkLogFormatError(ValueError):
+    pass
+
+
+def hand_info(multi_handedness, count):
+    """(lateralidad (N,) uint8, confianza (N,) float32) de multi_handedness."""
+    handedness = np.full(count, UNKNOWN_HANDEDNESS, dtype=np.uint8)
+    scores = np.zeros(count, dtype=np.float32)
+    for i, hand in enumerate((multi_handedness or [])[:count]):
+        top = hand.classification[0]
+        handedness[i] = HANDEDNESS.get(top.label, UNKNOWN_HANDEDNESS)
+        scores[i] = top.score
+    return handedness, scores
+
+
+class LandmarkRecorder:
+    """
+    Registro binario de los landmarks de cada fotograma de una partida.
+    Tras una cabecera JSON (resolución, inicio, metadatos), cada fotograma
+    ocupa FRAME_HEADER más un registro HAND_DTYPE por mano detectada. Los
+    landmarks se guardan tal como entran en la normalización (ya en espejo).
+    """
+
+    def __init__(self, path, width, height, **meta):
+        self.path = path
+        self.start = None
+        self.frames = 0
+        self._file = open(path, "wb")
+        header = {
+            "schema_version": SCHEMA_VERSION,
+            "width": width,
+            "height": height,
+            "created": time.time(),
+            **meta,
+        }
+        raw = json.dumps(header).encode("utf-8")
+        self._file.write(MAGIC + struct.pack("<I", len(raw)) + raw)
+
+    def write(self, timestamp, coords, handedness=None, scores=None):
+        """Añade un fotograma: `coords` (N, 21, 3) capturado en `timestamp`."""
+        if self.start is None:
+            self.start = timestamp
+        hands = np.zeros(len(coords), dtype=HAND_DTYPE)
+        hands["landmarks"] = coords
+        hands["handedness"] = UNKNOWN_HANDEDNESS if handedness is None else handedness
+        if scores is not None:
+            hands["score"] = scores
+        self._file.write(FRAME_HEADER.pack(timestamp - self.start, len(hands)))
+        self._file.write(hands.tobytes())
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkLog:
+    """
+    Registro leído completo en arrays planos: `timestamps` (F,) y
+    `counts` (F,) por fotograma, y `hands` (H,) HAND_DTYPE con todas las
+    manos en orden; `frame_of_hand` (H,) indica a qué fotograma pertenece
+    cada una.
+    """
+
+    def __init__(self, header, timestamps, counts, hands):
+        self.header = header
+        self.timestamps = timestamps
+        self.counts = counts
+        self.hands = hands
+        self.frame_of_hand = np.repeat(np.arange(len(counts)), counts)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def duration(self):
+        return float(self.timestamps[-1]) if len(self.timestamps) else 0.0
+
+
+def read_landmark_log(path):
+    """
+    Lee un registro de LandmarkRecorder. Un último fotograma truncado se
+    ignora. El archivo se recorre mapeado en memoria y las manos se copian
+    fotograma a fotograma, así que la memoria es la de los arrays
+    resultantes aunque el registro cubra horas de juego.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < len(MAGIC) + 4:
+            raise LandmarkLogFormatError(f"{path} no es un registro de landmarks")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _parse_log(path, data)
+
+
+def _parse_log(path, data):
+    if data[: len(MAGIC)] != MAGIC:
+        raise LandmarkLogFormatError(f"{path} no es un registro de landmarks")
+    (size,) = struct.unpack_from("<I", data, len(MAGIC))
+    offset = len(MAGIC) + 4 + size
+    header = json.loads(data[len(MAGIC) + 4 : offset].decode("utf-8"))
+    if header.get("schema_version") != SCHEMA_VERSION:
+        raise LandmarkLogFormatError(
+            f"Versión de registro {header.get('schema_version')} no soportada"
+        )
+    timestamps, counts, starts = [], [], []
+    end = len(data)
+    while offset + FRAME_HEADER.size <= end:
+        t, n = FRAME_HEADER.unpack_from(data, offset)
+        stop = offset + FRAME_HEADER.size + n * HAND_DTYPE.itemsize
+        if stop > end:
+            break
+        timestamps.append(t)
+        counts.append(n)
+        starts.append(offset + FRAME_HEADER.size)
+        offset = stop
+    counts = np.array(counts, dtype=np.int64)
+    # Las manos de cada fotograma son contiguas: un registro por copia.
+    hands = np.empty(int(counts.sum()), dtype=HAND_DTYPE)
+    pos = 0
+    for start, n in zip(starts, counts.tolist()):
+        if n:
+            hands[pos : pos + n] = np.frombuffer(
+                data, dtype=HAND_DTYPE, count=n, offset=start
+            )
+            pos += n
+    return LandmarkLog(header, np.array(timestamps, dtype=np.float64), counts, hands)
@@ -0,0 +1,200 @@
+import json
+import os
+import time
+from bisect import bisect_left
+
+from app.startup import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# Etapas medidas en run_play / run_capture, en el orden del pipeline.
+STAGES = (
+    "read",
+    "flip",
+    "motion",
+    "convert",
+    "inference",
+    "normalize",
+    "classify",
+    "draw",
+    "keys",
+    "handoff",
+)
+# Límites superiores de los cubos del histograma, en segundos: 10 cubos
+# logarítmicos por década entre 10 µs y 10 s.
+BUCKET_BOUNDS = tuple(10 ** (e / 10) * 1e-5 for e in range(61))
+# Percentiles que se informan.
+QUANTILES = (0.5, 0.95, 0.99)
+# Valores por defecto de config["stats"].
+STATS_DEFAULTS = {"overlay": False, "path": None, "format": "jsonl", "interval": 5.0}
+
+
+class Histogram:
+    """
+    Histograma de duraciones con cubos fijos: registrar cuesta una búsqueda
+    binaria y un incremento, sin guardar las muestras. Los percentiles se
+    aproximan por el límite superior de su cubo.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                break
+        bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+        return min(bound, self.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class PipelineStats:
+    """
+    Latencias por etapa de una sesión. Cada etapa la registra un solo hilo,
+    así que no hace falta bloqueo; `lap(etapa, inicio)` anota la duración
+    desde `inicio` y devuelve el instante actual para encadenar etapas.
+    `drop_counters` son objetos con atributo `dropped` (colas LatestSlot).
+    """
+
+    def __init__(self, drop_counters=()):
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.drop_counters = list(drop_counters)
+        self.frames = 0
+        self.start = time.perf_counter()
+
+    def lap(self, stage, start):
+        now = time.perf_counter()
+        self.histograms[stage].record(now - start)
+        return now
+
+    def frame_done(self):
+        self.frames += 1
+
+    @property
+    def dropped(self):
+        return sum(counter.dropped for counter in self.drop_counters)
+
+    @property
+    def fps(self):
+        elapsed = time.perf_counter() - self.start
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """Dict con fps, fotogramas, descartes y p50/p95/p99/media por etapa (ms)."""
+        stages = {}
+        for stage, hist in self.histograms.items():
+            if not hist.count:
+                continue
+            stages[stage] = {
+                f"p{round(q * 100)}": hist.percentile(q) * 1000 for q in QUANTILES
+            }
+            stages[stage]["mean"] = hist.mean * 1000
+            stages[stage]["count"] = hist.count
+        return {
+            "fps": self.fps,
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "stages": stages,
+        }
+
+    def to_prometheus(self, prefix="gesture"):
+        """Estado actual en el formato de texto de Prometheus."""
+        lines = [
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, hist in self.histograms.items():
+            if not hist.count:
+                continue
+            for q in QUANTILES:
+                lines.append(
+                    f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} '
+                    f"{hist.percentile(q):.6g}"
+                )
+            lines.append(
+                f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {hist.total:.6g}'
+            )
+            lines.append(
+                f'{prefix}_stage_seconds_count{{stage="{stage}"}} {hist.count}'
+            )
+        lines += [
+            f"# TYPE {prefix}_fps gauge",
+            f"{prefix}_fps {self.fps:.3f}",
+            f"# TYPE {prefix}_frames_total counter",
+            f"{prefix}_frames_total {self.frames}",
+            f"# TYPE {prefix}_dropped_frames_total counter",
+            f"{prefix}_dropped_frames_total {self.dropped}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def draw(self, img, stages=("read", "inference", "classify", "draw", "handoff")):
+        """Escribe fps, descartes y p50/p95 de algunas etapas sobre `img`."""
+        lines = [f"{self.fps:5.1f} fps  {self.dropped} descartados"]
+        for stage in stages:
+            hist = self.histograms[stage]
+            if hist.count:
+                lines.append(
+                    f"{stage:>9} {hist.percentile(0.5) * 1000:6.1f} "
+                    f"{hist.percentile(0.95) * 1000:6.1f} ms"
+                )
+        for i, line in enumerate(lines):
+            cv2.putText(
+                img,
+                line,
+                (10, 20 + 18 * i),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.45,
+                (255, 255, 0),
+                1,
+                cv2.LINE_AA,
+            )
+
+
+class StatsWriter:
+    """
+    Vuelca periódicamente un PipelineStats a `path`: en "jsonl" añade una
+    línea con el resumen; en "prometheus" reescribe el archivo de forma
+    atómica (apto para el textfile collector de node_exporter).
+    """
+
+    def __init__(self, path, format="jsonl", interval=5.0):
+        if format not in ("jsonl", "prometheus"):
+            raise ValueError(f"Formato de estadísticas desconocido: {format}")
+        self.path = path
+        self.format = format
+        self.interval = interval
+        self._last = time.perf_counter()
+
+    def maybe_write(self, stats, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last < self.interval:
+            return False
+        self._last = now
+        if self.format == "jsonl":
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"time": time.time(), **stats.summary()}) + "\n")
+        else:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(stats.to_prometheus())
+            os.replace(tmp_path, self.path)
+        return True
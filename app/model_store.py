@@ -0,0 +1,123 @@
+import json
+import os
+import struct
+import numpy as np
+
+from app.classifier import PrototypeIndex
+
+MAGIC = b"GESTPROT"
+SCHEMA_VERSION = 1
+# Alineación de cada sección binaria dentro del archivo.
+ALIGN = 64
+
+# Secciones binarias tras la cabecera: nombre -> dtype. Cada una ocupa
+# `rows` filas (la matriz de prototipos, `rows` x `dim`).
+SECTIONS = {
+    "matrix": np.float32,
+    "sq_norms": np.float32,
+    "row_labels": np.int32,
+    "thresholds": np.float32,
+}
+
+
+class ModelFormatError(ValueError):
+    """El archivo de modelo no es válido o no corresponde a los datos actuales."""
+
+
+def _align(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def save_model(path, index, normalization, fingerprint=None):
+    """
+    Guarda el índice de prototipos en el formato binario del modelo:
+    MAGIC, longitud de la cabecera (uint32), cabecera JSON y las secciones
+    float32/int32 contiguas y alineadas, listas para np.memmap.
+    """
+    rows, dim = index.matrix.shape
+    header = {
+        "schema_version": SCHEMA_VERSION,
+        "dim": dim,
+        "rows": rows,
+        "labels": index.labels,
+        "normalization": normalization,
+        "dataset_fingerprint": fingerprint,
+        "sections": {},
+    }
+    # La cabecera se serializa dos veces: la primera solo para conocer su
+    # tamaño y poder calcular los offsets de las secciones.
+    arrays = {name: getattr(index, name) for name in SECTIONS}
+    for _ in range(2):
+        blob = json.dumps(header).encode("utf-8")
+        offset = _align(len(MAGIC) + 4 + len(blob) + ALIGN)
+        for name, dtype in SECTIONS.items():
+            header["sections"][name] = offset
+            offset = _align(offset + arrays[name].size * np.dtype(dtype).itemsize)
+    blob = json.dumps(header).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(blob)) + blob)
+        for name, dtype in SECTIONS.items():
+            f.write(b"\0" * (header["sections"][name] - f.tell()))
+            np.ascontiguousarray(arrays[name], dtype=dtype).tofile(f)
+    os.replace(tmp_path, path)
+
+
+def read_header(path):
+    """Lee y valida solo la cabecera del modelo."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ModelFormatError(f"{path} no es un modelo de gestos")
+        raw = f.read(4)
+        if len(raw) < 4:
+            raise ModelFormatError(f"{path} está truncado")
+        (size,) = struct.unpack("<I", raw)
+        blob = f.read(size)
+    if len(blob) < size:
+        raise ModelFormatError(f"{path} está truncado")
+    try:
+        header = json.loads(blob.decode("utf-8"))
+    except ValueError:
+        raise ModelFormatError(f"Cabecera dañada en {path}") from None
+    if header.get("schema_version") != SCHEMA_VERSION:
+        raise ModelFormatError(
+            f"Versión de modelo {header.get('schema_version')} no soportada"
+        )
+    return header
+
+
+def load_model(path, normalization=None, fingerprint=None):
+    """
+    Abre el modelo sin ejecutar pickle: la cabecera se valida y las
+    secciones se mapean en memoria, así que el coste no depende del tamaño
+    del vocabulario. Se rechaza el modelo si `normalization` o `fingerprint`
+    (cuando se indican) no coinciden con los usados al entrenarlo.
+    """
+    header = read_header(path)
+    if normalization is not None and header["normalization"] != normalization:
+        raise ModelFormatError("El modelo se entrenó con otra normalización")
+    if normalization is not None and header["dim"] != normalization["dim"]:
+        raise ModelFormatError("Dimensión de características incompatible")
+    if fingerprint is not None and header["dataset_fingerprint"] != fingerprint:
+        raise ModelFormatError("El modelo no corresponde a los datos actuales")
+    rows, dim = header["rows"], header["dim"]
+    file_size = os.path.getsize(path)
+    arrays = {}
+    for name, dtype in SECTIONS.items():
+        shape = (rows, dim) if name == "matrix" else (rows,)
+        offset = header["sections"][name]
+        size = rows * (dim if name == "matrix" else 1) * np.dtype(dtype).itemsize
+        if offset + size > file_size:
+            raise ModelFormatError(f"{path} está truncado")
+        arrays[name] = np.memmap(
+            path, dtype=dtype, mode="r", offset=offset, shape=shape
+        )
+    index = PrototypeIndex(
+        header["labels"],
+        arrays["matrix"],
+        arrays["row_labels"],
+        arrays["thresholds"],
+        arrays["sq_norms"],
+    )
+    index.header = header
+    return index
@@ -0,0 +1,506 @@
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+from app.startup import lazy_import
+from app.utils import landmarks_to_array, normalize_landmarks_batch, draw_zones
+from app.frame_sources import open_source
+from app.pipeline import FrameBuffers
+from app.scheduler import InferenceScheduler
+from app.key_dispatcher import KeyDispatcher, PynputBackend
+from app.metrics import PipelineStats
+from app.landmark_log import HAND_DTYPE, hand_info
+from app.core_logic import PlayOutput, load_config, load_gesture_model, stats_output
+from app.session_pool import open_hands
+
+cv2 = lazy_import("cv2")
+mp = lazy_import("mediapipe")
+
+# Fotogramas en memoria compartida por cámara: uno llenándose, uno en los
+# procesos de inferencia y uno en la etapa de salida.
+CAMERA_SLOTS = 3
+# Manos como máximo que detecta cada vista (cámara o mosaico).
+MAX_HANDS_PER_VIEW = 4
+# Solape entre mosaicos vecinos, en fracción del mosaico, para no cortar
+# las manos que quedan en un borde.
+TILE_OVERLAP = 0.1
+# Dos manos de mosaicos distintos son la misma si la intersección de sus
+# cajas supera esta fracción de la menor (ver drop_duplicates).
+DUPLICATE_OVERLAP = 0.5
+# Segundos que se espera a que los procesos de inferencia carguen MediaPipe.
+WORKER_START_TIMEOUT = 120.0
+# Ancho del lienzo de la vista previa, en píxeles.
+PREVIEW_WIDTH = 1280
+
+
+def parse_cameras(cameras):
+    """
+    Normaliza config["cameras"]: una lista de especificaciones de fuente o
+    de dicts {"source", "rect", "tiles"}. `rect` es [x1, y1, x2, y2], la
+    posición de la cámara en el lienzo común (en fracciones) donde se
+    definen las zonas de los jugadores; por defecto las cámaras se colocan
+    una al lado de otra. `tiles` es [columnas, filas]: cada mosaico de la
+    imagen se procesa en su propio proceso (por defecto [1, 1]).
+    """
+    cameras = [c if isinstance(c, dict) else {"source": c} for c in cameras]
+    n = len(cameras)
+    return [
+        {
+            "source": c.get("source", i),
+            "rect": list(c.get("rect") or [i / n, 0.0, (i + 1) / n, 1.0]),
+            "tiles": list(c.get("tiles") or [1, 1]),
+        }
+        for i, c in enumerate(cameras)
+    ]
+
+
+def tile_crops(width, height, cols, rows, overlap=TILE_OVERLAP):
+    """Recortes [x1, y1, x2, y2] en píxeles de una rejilla cols x rows con solape."""
+    crops = []
+    tile_w, tile_h = width / cols, height / rows
+    pad_x = round(tile_w * overlap / 2) if cols > 1 else 0
+    pad_y = round(tile_h * overlap / 2) if rows > 1 else 0
+    for row in range(rows):
+        for col in range(cols):
+            crops.append(
+                [
+                    max(0, round(col * tile_w) - pad_x),
+                    max(0, round(row * tile_h) - pad_y),
+                    min(width, round((col + 1) * tile_w) + pad_x),
+                    min(height, round((row + 1) * tile_h) + pad_y),
+                ]
+            )
+    return crops
+
+
+def drop_duplicates(hands, views):
+    """
+    Índices (ordenados) de las manos HAND_DTYPE de un fotograma que se
+    conservan. Una mano en el solape entre mosaicos la detectan las dos
+    vistas, a menudo una de ellas recortada; si las cajas de dos manos de
+    vistas distintas se solapan más de DUPLICATE_OVERLAP, queda la de mayor
+    confianza.
+    """
+    points = hands["landmarks"][..., :2]
+    lo, hi = points.min(axis=1), points.max(axis=1)
+    area = np.prod(hi - lo, axis=1)
+    inter = np.prod(
+        np.clip(
+            np.minimum(hi[:, None], hi[None]) - np.maximum(lo[:, None], lo[None]),
+            0,
+            None,
+        ),
+        axis=2,
+    )
+    smaller = np.maximum(np.minimum(area[:, None], area[None]), 1e-12)
+    same = (inter / smaller > DUPLICATE_OVERLAP) & (views[:, None] != views[None])
+    keep = []
+    for i in np.argsort(-hands["score"], kind="stable"):
+        if not same[i, keep].any():
+            keep.append(i)
+    return np.sort(np.array(keep, dtype=np.intp))
+
+
+def inference_worker(
+    view, frames_name, frame_shape, crop, results_name, settings, jobs, done
+):
+    """
+    Proceso de inferencia de una vista: recibe por `jobs` (hueco,
+    secuencia), ejecuta MediaPipe sobre su recorte del fotograma en memoria
+    compartida y escribe las manos (HAND_DTYPE, en coordenadas del
+    fotograma completo) en su bloque de resultados. Avisa por `done` con
+    (vista, hueco, secuencia, manos, inferido, segundos). None termina.
+    """
+    # Los bloques los crea y los libera (unlink) el proceso principal.
+    frames_shm = shared_memory.SharedMemory(name=frames_name)
+    results_shm = shared_memory.SharedMemory(name=results_name)
+    frames = np.ndarray(frame_shape, dtype=np.uint8, buffer=frames_shm.buf)
+    results = np.ndarray(
+        (CAMERA_SLOTS, MAX_HANDS_PER_VIEW), dtype=HAND_DTYPE, buffer=results_shm.buf
+    )
+    x1, y1, x2, y2 = crop
+    height, width = frame_shape[1:3]
+    scheduler = InferenceScheduler(settings, governor=False)
+    try:
+        with open_hands(MAX_HANDS_PER_VIEW, 0.7) as hands:
+            done.put(("ready", view))
+            while (job := jobs.get()) is not None:
+                slot, seq = job
+                start = time.perf_counter()
+                output, inferred = scheduler.process(hands, frames[slot, y1:y2, x1:x2])
+                found = (output.multi_hand_landmarks or [])[:MAX_HANDS_PER_VIEW]
+                if found:
+                    coords = landmarks_to_array(found)
+                    # Del recorte al fotograma completo (z escala como x).
+                    coords[..., 0] = (x1 + coords[..., 0] * (x2 - x1)) / width
+                    coords[..., 1] = (y1 + coords[..., 1] * (y2 - y1)) / height
+                    coords[..., 2] *= (x2 - x1) / width
+                    hands_out = results[slot, : len(found)]
+                    hands_out["landmarks"] = coords
+                    hands_out["handedness"], hands_out["score"] = hand_info(
+                        output.multi_handedness, len(found)
+                    )
+                done.put(
+                    (view, slot, seq, len(found), inferred, time.perf_counter() - start)
+                )
+    finally:
+        del frames, results
+        frames_shm.close()
+        results_shm.close()
+
+
+class Camera:
+    """
+    Una cámara del motor multicámara: su fuente, los CAMERA_SLOTS
+    fotogramas en memoria compartida, los huecos libres y su posición
+    (`rect`) en el lienzo común. `dropped` cuenta los fotogramas de una
+    cámara en vivo descartados porque todos los huecos estaban ocupados.
+    """
+
+    def __init__(self, index, source, rect, tiles):
+        self.index = index
+        self.source = open_source(source)
+        if not self.source.isOpened():
+            raise IOError(f"No se puede abrir la fuente de video: {source}")
+        self.rect = rect
+        # El primer fotograma fija la resolución de la memoria compartida.
+        ret, self.first_frame = self.source.read()
+        if not ret:
+            raise IOError(f"La fuente de video no devuelve imágenes: {source}")
+        height, width = self.first_frame.shape[:2]
+        self.shape = (CAMERA_SLOTS, height, width, 3)
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=int(np.prod(self.shape))
+        )
+        self.frames = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.crops = tile_crops(width, height, *tiles)
+        self.views = []
+        self.timestamps = [0.0] * CAMERA_SLOTS
+        self.free = queue.SimpleQueue()
+        for slot in range(CAMERA_SLOTS):
+            self.free.put(slot)
+        self.in_flight = 0
+        self.dropped = 0
+        self.finished = False
+
+    def to_canvas(self, points):
+        """Puntos (N, 2) normalizados de esta cámara -> normalizados del lienzo."""
+        x1, y1, x2, y2 = self.rect
+        return points * (x2 - x1, y2 - y1) + (x1, y1)
+
+    def close(self):
+        self.source.release()
+        del self.frames
+        self.shm.close()
+        self.shm.unlink()
+
+
+class View:
+    """Recorte de una cámara con su proceso de inferencia y sus resultados."""
+
+    def __init__(self, index, camera, crop, settings, done, context):
+        self.index = index
+        self.camera = camera
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=CAMERA_SLOTS * MAX_HANDS_PER_VIEW * HAND_DTYPE.itemsize
+        )
+        self.results = np.ndarray(
+            (CAMERA_SLOTS, MAX_HANDS_PER_VIEW), dtype=HAND_DTYPE, buffer=self.shm.buf
+        )
+        self.jobs = context.Queue()
+        self.process = context.Process(
+            target=inference_worker,
+            args=(
+                index,
+                camera.shm.name,
+                camera.shape,
+                crop,
+                self.shm.name,
+                settings,
+                self.jobs,
+                done,
+            ),
+            name=f"gesture-view-{index}",
+            daemon=True,
+        )
+        self.process.start()
+
+    def close(self):
+        if self.process.is_alive():
+            self.jobs.put(None)
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.jobs.close()
+        del self.results
+        self.shm.close()
+        self.shm.unlink()
+
+
+class MultiCameraController:
+    """
+    Motor de juego con varias cámaras (config["cameras"], ver
+    parse_cameras) y un proceso de MediaPipe por cámara o por mosaico, de
+    modo que el seguimiento de manos escala con los núcleos. Cada cámara
+    tiene un hilo lector que escribe el fotograma (volteado) en memoria
+    compartida y lo reparte entre los procesos de sus vistas; estos
+    devuelven las manos por memoria compartida y solo un aviso pequeño por
+    cola. Las zonas de los jugadores (config["layout"] o la rejilla
+    automática) se definen sobre el lienzo común de todas las cámaras, y
+    las teclas se deciden con el menor ratio de cada gesto entre cámaras.
+    Misma interfaz que OpenCVController.run_play; la captura de gestos
+    sigue usando OpenCVController con una sola cámara.
+    """
+
+    def __init__(
+        self,
+        update_callback,
+        cameras=None,
+        keyboard=None,
+        draw_overlay=True,
+        mirror_landmarks=False,
+    ):
+        config = load_config() or {}
+        cameras = parse_cameras(cameras or config.get("cameras") or [0])
+        self.update_callback = update_callback
+        self.kb = keyboard if keyboard is not None else PynputBackend()
+        self.draw_overlay = draw_overlay
+        self.flip_image = draw_overlay or not mirror_landmarks
+        self.inferences = 0
+        self.cameras, self.views = [], []
+        self._lock = threading.Lock()
+        # "spawn": cada proceso carga su propio MediaPipe, sin heredar hilos.
+        context = multiprocessing.get_context("spawn")
+        self.done = context.Queue()
+        try:
+            for spec in cameras:
+                camera = Camera(
+                    len(self.cameras), spec["source"], spec["rect"], spec["tiles"]
+                )
+                self.cameras.append(camera)
+                for crop in camera.crops:
+                    view = View(
+                        len(self.views),
+                        camera,
+                        crop,
+                        config.get("inference"),
+                        self.done,
+                        context,
+                    )
+                    camera.views.append(view)
+                    self.views.append(view)
+        except BaseException:
+            self.release()
+            raise
+
+    @property
+    def canvas_size(self):
+        """Tamaño en píxeles del lienzo común, a la resolución de las cámaras."""
+        width = max(c.shape[2] / (c.rect[2] - c.rect[0]) for c in self.cameras)
+        height = max(c.shape[1] / (c.rect[3] - c.rect[1]) for c in self.cameras)
+        return int(width), int(height)
+
+    def _wait_ready(self, stop_event):
+        pending = set(range(len(self.views)))
+        deadline = time.monotonic() + WORKER_START_TIMEOUT
+        while pending and not stop_event.is_set():
+            if time.monotonic() > deadline or not all(
+                v.process.is_alive() for v in self.views
+            ):
+                raise RuntimeError("Los procesos de inferencia no arrancaron")
+            try:
+                message = self.done.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if message[0] == "ready":
+                pending.discard(message[1])
+
+    def run_play(self, stop_event):
+        """
+        Bucle de juego multicámara. Los lectores y los procesos trabajan en
+        paralelo; en este hilo se combinan los resultados de cada fotograma
+        (todas las vistas de su cámara, sin las manos repetidas en el
+        solape entre mosaicos), se clasifica y se deciden las teclas con un
+        PlayOutput, y se entrega la vista previa. Con una cámara en vivo, si sus
+        huecos están todos ocupados el fotograma se descarta. Las latencias
+        quedan en `self.stats` (la inferencia, medida en cada proceso).
+        """
+        self._wait_ready(stop_event)
+        config = load_config()
+        # Una vista de PlayOutput (y un HandTracker) por cámara, con los
+        # centroides en coordenadas del lienzo.
+        output = PlayOutput(config, load_gesture_model(), views=len(self.cameras))
+        canvas_w, canvas_h = self.canvas_size
+        stats_config, writer = stats_output(config)
+        self.stats = stats = PipelineStats(self.cameras)
+        scale = min(1.0, PREVIEW_WIDTH / canvas_w)
+        mosaic = None
+        if self.draw_overlay:
+            mosaic = np.zeros(
+                (int(canvas_h * scale), int(canvas_w * scale), 3), dtype=np.uint8
+            )
+        pending = {}
+        # Cámaras con un fotograma nuevo desde el último paso de las teclas.
+        fresh = set()
+        halt = threading.Event()
+        readers = [
+            threading.Thread(
+                target=self._read_frames,
+                args=(camera, stats, halt),
+                name=f"camera-reader-{i}",
+                daemon=True,
+            )
+            for i, camera in enumerate(self.cameras)
+        ]
+        for reader in readers:
+            reader.start()
+        self.dispatcher = KeyDispatcher(self.kb)
+        try:
+            while not stop_event.is_set():
+                try:
+                    message = self.done.get(timeout=0.1)
+                except queue.Empty:
+                    if not all(v.process.is_alive() for v in self.views):
+                        raise RuntimeError("Un proceso de inferencia terminó")
+                    if all(c.finished and not c.in_flight for c in self.cameras):
+                        break
+                    continue
+                view_id, slot, seq, count, inferred, elapsed = message
+                stats.histograms["inference"].record(elapsed)
+                self.inferences += inferred
+                view = self.views[view_id]
+                camera = view.camera
+                parts = pending.setdefault((camera.index, seq), [])
+                parts.append((view, count))
+                if len(parts) < len(camera.views):
+                    continue
+                del pending[(camera.index, seq)]
+                t0 = camera.timestamps[slot]
+                t = time.perf_counter()
+                for key in output.reload():
+                    self.dispatcher.submit(key, False, t0)
+                config = output.config
+                hands = np.concatenate([v.results[slot, :n] for v, n in parts])
+                if len(parts) > 1 and len(hands) > 1:
+                    views = np.repeat(
+                        [v.index for v, _ in parts], [n for _, n in parts]
+                    )
+                    hands = hands[drop_duplicates(hands, views)]
+                coords = hands["landmarks"]
+                if not self.flip_image:
+                    np.subtract(1.0, coords[..., 0], out=coords[..., 0])
+                features, centroids, valid = normalize_landmarks_batch(coords)
+                t = stats.lap("normalize", t)
+                canvas = camera.to_canvas(centroids[valid])
+                hand_results = output.classify(
+                    features[valid],
+                    canvas,
+                    output.players(canvas, canvas_w, canvas_h),
+                    view=camera.index,
+                )
+                if hand_results:
+                    t = stats.lap("classify", t)
+                accepted = np.array([ok for _, ok in hand_results], dtype=bool)
+                # La histéresis avanza una vez por ronda (un fotograma de cada
+                # cámara activa), no una por fotograma de cualquier cámara:
+                # así min_hold_frames dura lo mismo que con una sola cámara.
+                fresh.add(camera.index)
+                if fresh.issuperset(c.index for c in self.cameras if not c.finished):
+                    fresh.clear()
+                    for key, pressed, ratio in output.keys():
+                        self.dispatcher.submit(key, pressed, t0, ratio)
+                    t = stats.lap("keys", t)
+                image = camera.frames[slot]
+                if self.draw_overlay:
+                    self._draw(mosaic, camera, image, coords[valid], accepted)
+                    draw_zones(
+                        mosaic, config["num_players"], layout=config.get("layout")
+                    )
+                    if stats_config["overlay"]:
+                        stats.draw(mosaic)
+                    image = mosaic
+                    t = stats.lap("draw", t)
+                self.update_callback(image=image, timestamp=t0)
+                stats.lap("handoff", t)
+                stats.frame_done()
+                with self._lock:
+                    camera.in_flight -= 1
+                camera.free.put(slot)
+                if writer is not None:
+                    writer.maybe_write(stats)
+        finally:
+            halt.set()
+            for reader in readers:
+                reader.join()
+            self.dispatcher.close()
+            if writer is not None:
+                writer.maybe_write(stats, force=True)
+
+    def _read_frames(self, camera, stats, halt):
+        """Hilo lector de una cámara: fotograma a memoria compartida y a sus vistas."""
+        buffers = FrameBuffers()
+        seq = 0
+        while not halt.is_set():
+            try:
+                slot = camera.free.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            t = time.perf_counter()
+            if camera.first_frame is not None:
+                frame, camera.first_frame = camera.first_frame, None
+            else:
+                frame = buffers.read(camera.source)
+            if frame is None:
+                camera.free.put(slot)
+                break
+            with self._lock:
+                t0 = stats.lap("read", t)
+                if self.flip_image:
+                    cv2.flip(frame, 1, dst=camera.frames[slot])
+                else:
+                    np.copyto(camera.frames[slot], frame)
+                stats.lap("flip", t0)
+                camera.timestamps[slot] = t0
+                camera.in_flight += 1
+            for view in camera.views:
+                view.jobs.put((slot, seq))
+            seq += 1
+            # Con una cámara en vivo se descartan los fotogramas que llegan
+            # mientras no hay hueco libre, para no acumular retraso.
+            while camera.source.live and not halt.is_set() and camera.free.empty():
+                if buffers.read(camera.source) is None:
+                    break
+                camera.dropped += 1
+        camera.finished = True
+
+    def _draw(self, mosaic, camera, image, coords, accepted):
+        """Copia la imagen de la cámara en su lugar del lienzo con sus manos."""
+        height, width = mosaic.shape[:2]
+        x1, y1, x2, y2 = camera.rect
+        box = (
+            int(x1 * width),
+            int(y1 * height),
+            int(x2 * width),
+            int(y2 * height),
+        )
+        region = mosaic[box[1] : box[3], box[0] : box[2]]
+        region[:] = cv2.resize(
+            image, (region.shape[1], region.shape[0]), interpolation=cv2.INTER_AREA
+        )
+        points = (coords[..., :2] * (region.shape[1], region.shape[0])).astype(np.int32)
+        for hand, ok in zip(points, accepted):
+            color = (0, 255, 0) if ok else (0, 0, 255)
+            for a, b in mp.solutions.hands.HAND_CONNECTIONS:
+                cv2.line(
+                    region, tuple(hand[a].tolist()), tuple(hand[b].tolist()), color, 2
+                )
+
+    def release(self):
+        for view in self.views:
+            view.close()
+        for camera in self.cameras:
+            camera.close()
+        self.views, self.cameras = [], []
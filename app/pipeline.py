@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+import numpy as np
+
+from app.startup import lazy_import
+
+cv2 = lazy_import("cv2")
+
+
+class LatestSlot:
+    """
+    Cola acotada de un solo elemento entre dos etapas del pipeline.
+
+    En modo no bloqueante `put` reemplaza el elemento pendiente (gana el
+    fotograma más reciente) y cuenta el descartado en `dropped`. En modo
+    bloqueante espera a que el consumidor lo recoja, para fuentes grabadas
+    en las que no se debe perder ningún fotograma. `on_drop` recibe cada
+    elemento descartado (p. ej. para devolver su buffer a un FrameRing).
+    """
+
+    def __init__(self, on_drop=None):
+        self._cond = threading.Condition()
+        self._item = None
+        self._full = False
+        self.closed = False
+        self.dropped = 0
+        self.on_drop = on_drop
+
+    def put(self, item, block=False):
+        """Deposita `item`. Devuelve False si la cola ya está cerrada."""
+        with self._cond:
+            if block:
+                self._cond.wait_for(lambda: not self._full or self.closed)
+            if self.closed:
+                return False
+            if self._full:
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop(self._item)
+            self._item, self._full = item, True
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Devuelve el elemento pendiente, o None si expira o está cerrada y vacía."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._full or self.closed, timeout)
+            if not self._full:
+                return None
+            item, self._item, self._full = self._item, None, False
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Despierta a productores y consumidores; no se aceptan más elementos."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    @property
+    def exhausted(self):
+        with self._cond:
+            return self.closed and not self._full
+
+
+class FrameBuffers:
+    """
+    Buffers de un fotograma: `frame` recibe la lectura de la fuente e `image`
+    la versión volteada. Se reservan con la primera lectura y se reutilizan.
+    Leer y voltear son pasos separados para poder medirlos por separado.
+    """
+
+    __slots__ = ("frame", "image")
+
+    def __init__(self):
+        self.frame = None
+        self.image = None
+
+    def read(self, source):
+        """Lee de `source` en `frame`; devuelve el fotograma o None."""
+        ret, frame = source.read(self.frame)
+        if not ret:
+            return None
+        self.frame = frame
+        return frame
+
+    def mirror(self):
+        """Voltea horizontalmente `frame` en `image` y la devuelve."""
+        if self.image is None or self.image.shape != self.frame.shape:
+            self.image = np.empty_like(self.frame)
+        return cv2.flip(self.frame, 1, dst=self.image)
+
+
+class FrameRing:
+    """
+    Anillo de FrameBuffers preasignados que circulan entre las etapas del
+    pipeline: el lector toma uno libre con `acquire` y la última etapa lo
+    devuelve con `release`. Si todos están ocupados el lector espera, así
+    que la memoria en régimen estacionario queda acotada a `size` fotogramas.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._free = queue.SimpleQueue()
+        for _ in range(size):
+            self._free.put(FrameBuffers())
+
+    def acquire(self, timeout=None):
+        """Buffers libres, o None si no se liberó ninguno antes de `timeout`."""
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, buffers):
+        self._free.put(buffers)
+
+
+class PreviewFrames:
+    """
+    Triple buffer entre el hilo de visión y la interfaz. `publish` convierte
+    el fotograma BGR a RGB (reduciéndolo a `size` si es más grande) en uno
+    de tres buffers reutilizados que la interfaz no está leyendo, y le asigna
+    un número de secuencia; `acquire` solo devuelve algo si hay un fotograma
+    nuevo, así que la interfaz no repite trabajo con fotogramas ya mostrados.
+    """
+
+    def __init__(self, size=None):
+        self.size = size
+        self._lock = threading.Lock()
+        self._buffers = [None, None, None]
+        self._scratch = None
+        self._latest = -1
+        self._reading = -1
+        self._last_time = None
+        self.seq = 0
+        self.meta = {}
+        # Intervalo medio (media exponencial) entre fotogramas publicados.
+        self.interval = None
+
+    def publish(self, image, **meta):
+        with self._lock:
+            target = next(i for i in range(3) if i not in (self._latest, self._reading))
+        h, w = image.shape[:2]
+        if self.size and (w > self.size[0] or h > self.size[1]):
+            scale = min(self.size[0] / w, self.size[1] / h)
+            dsize = (max(1, int(w * scale)), max(1, int(h * scale)))
+            if self._scratch is None or self._scratch.shape[1::-1] != dsize:
+                self._scratch = np.empty((dsize[1], dsize[0], 3), dtype=np.uint8)
+            image = cv2.resize(
+                image, dsize, dst=self._scratch, interpolation=cv2.INTER_AREA
+            )
+        buf = self._buffers[target]
+        if buf is None or buf.shape != image.shape:
+            buf = self._buffers[target] = np.empty_like(image)
+        cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=buf)
+        now = time.perf_counter()
+        with self._lock:
+            self._latest = target
+            self.seq += 1
+            self.meta = meta
+            if self._last_time is not None:
+                dt = now - self._last_time
+                self.interval = (
+                    dt if self.interval is None else 0.9 * self.interval + 0.1 * dt
+                )
+            self._last_time = now
+
+    def acquire(self, last_seq):
+        """
+        (seq, rgb, meta) del último fotograma si es posterior a `last_seq`,
+        o None.
+        """
+        with self._lock:
+            if self._latest < 0 or self.seq == last_seq:
+                return None
+            self._reading = self._latest
+            return self.seq, self._buffers[self._reading], self.meta
+
+    def refresh_ms(self, default=16, lo=8, hi=50):
+        """Periodo de refresco sugerido: la mitad del intervalo entre fotogramas."""
+        if self.interval is None:
+            return default
+        return int(min(hi, max(lo, self.interval * 500)))
@@ -0,0 +1,168 @@
+"""
+Reproduce un registro de landmarks sin cámara ni MediaPipe.
+
+Uso:
+    python -m app.replay recordings/20250101-120000.glog
+    python -m app.replay partida.glog --model otro_modelo.gpm --json
+"""
+
+import argparse
+import json
+import sys
+import time
+import numpy as np
+
+from app.classifier import PrototypeClassifier, best_ratios
+from app.core_logic import (
+    PlayOutput,
+    is_model_trained,
+    load_config,
+    load_gesture_model,
+)
+from app.key_dispatcher import KeyDispatcher, MemoryBackend
+from app.landmark_log import read_landmark_log
+from app.model_store import load_model
+from app.utils import NORMALIZATION, get_zone_map, normalize_landmarks_batch
+
+# Manos clasificadas por bloque; acota la memoria de la búsqueda.
+CHUNK_HANDS = 8192
+
+
+def log_hands(log, config):
+    """
+    Características (H, D), centroides (H, 2), validez (H,) y zona (H,) de
+    cada mano del registro, normalizadas por bloques vectorizados.
+    """
+    zone_map = get_zone_map(
+        log.header["width"],
+        log.header["height"],
+        config["num_players"],
+        config.get("layout"),
+    )
+    hands = len(log.hands)
+    features = np.zeros((hands, NORMALIZATION["dim"]), dtype=np.float32)
+    centroids = np.zeros((hands, 2), dtype=np.float32)
+    valid = np.zeros(hands, dtype=bool)
+    players = np.zeros(hands, dtype=np.int32)
+    for lo in range(0, hands, CHUNK_HANDS):
+        hi = min(lo + CHUNK_HANDS, hands)
+        features[lo:hi], centroids[lo:hi], valid[lo:hi] = normalize_landmarks_batch(
+            log.hands["landmarks"][lo:hi]
+        )
+        players[lo:hi] = zone_map.lookup(centroids[lo:hi])
+    return features, centroids, valid, players
+
+
+def classify_log(log, config, model):
+    """
+    Ratio distancia/umbral (H,) y etiqueta (H,) de cada mano del registro,
+    calculados en bloque: normalización, zonas y clasificación vectorizadas.
+    Las manos inválidas o fuera de zona quedan con ratio inf y etiqueta -1.
+    """
+    classifier = PrototypeClassifier(model, config["players"])
+    features, _, valid, players = log_hands(log, config)
+    ratios = np.full(len(log.hands), np.inf, dtype=np.float32)
+    label_ids = np.full(len(log.hands), -1, dtype=np.int64)
+    for lo in range(0, len(log.hands), CHUNK_HANDS):
+        ok = valid[lo : lo + CHUNK_HANDS]
+        if not ok.any():
+            continue
+        match = classifier.classify(
+            features[lo : lo + CHUNK_HANDS][ok], players[lo : lo + CHUNK_HANDS][ok]
+        )
+        idx = np.flatnonzero(ok) + lo
+        ratios[idx] = match.ratios
+        label_ids[idx] = match.label_ids
+    return classifier.labels, ratios, label_ids
+
+
+def frame_keys(log, config, model):
+    """
+    Genera, para cada fotograma, los cambios de tecla [(tecla, pulsada,
+    ratio)] de un PlayOutput, como en run_play. Sin seguimiento
+    (config["tracking"]) las manos se clasifican todas de una vez con
+    classify_log y solo la histéresis va fotograma a fotograma.
+    """
+    output = PlayOutput(config, model)
+    bounds = np.concatenate([[0], np.cumsum(log.counts)])
+    if output.trackers[0] is None:
+        labels, ratios, label_ids = classify_log(log, config, model)
+        names = [labels[i] if i >= 0 else None for i in label_ids.tolist()]
+        for f in range(len(log)):
+            lo, hi = bounds[f], bounds[f + 1]
+            output.view_ratios[0] = best_ratios(names[lo:hi], ratios[lo:hi].tolist())
+            yield output.keys()
+        return
+    features, centroids, valid, players = log_hands(log, config)
+    for f in range(len(log)):
+        lo, hi = bounds[f], bounds[f + 1]
+        ok = valid[lo:hi]
+        output.classify(features[lo:hi][ok], centroids[lo:hi][ok], players[lo:hi][ok])
+        yield output.keys()
+
+
+def replay(log, config, model, backend=None):
+    """
+    Pasa el registro por normalización, zonas, seguimiento, clasificación,
+    histéresis y KeyDispatcher tan rápido como permite la CPU. Devuelve un
+    dict con estadísticas y `events`: [(segundo del registro, tecla, pulsada)].
+    """
+    start = time.perf_counter()
+    backend = backend if backend is not None else MemoryBackend()
+    dispatcher = KeyDispatcher(backend)
+    events = []
+    try:
+        for t, changes in zip(log.timestamps.tolist(), frame_keys(log, config, model)):
+            for key, pressed, ratio in changes:
+                dispatcher.submit(key, pressed, ratio=ratio)
+                events.append((t, key, pressed))
+    finally:
+        dispatcher.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": len(log),
+        "hands": len(log.hands),
+        "duration_s": log.duration,
+        "elapsed_s": elapsed,
+        "speedup": log.duration / elapsed if elapsed > 0 else 0.0,
+        "key_presses": sum(1 for _, _, pressed in events if pressed),
+        "key_events": len(events),
+        "events": events,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log", help="registro grabado con LandmarkRecorder")
+    parser.add_argument("--model", help="modelo a evaluar en lugar del actual")
+    parser.add_argument(
+        "--events", action="store_true", help="listar los eventos de teclado"
+    )
+    parser.add_argument("--json", action="store_true", help="salida en formato JSON")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    if config is None or not (args.model or is_model_trained()):
+        print("Se necesita config.json y un modelo entrenado.", file=sys.stderr)
+        return 1
+    if args.model:
+        model = load_model(args.model, NORMALIZATION)
+    else:
+        model = load_gesture_model()
+    stats = replay(read_landmark_log(args.log), config, model)
+    events = stats.pop("events")
+    if args.json:
+        if args.events:
+            stats["events"] = events
+        print(json.dumps(stats))
+        return 0
+    for k, v in stats.items():
+        print(f"{k:>12}: {v:.3f}" if isinstance(v, float) else f"{k:>12}: {v}")
+    if args.events:
+        for t, key, pressed in events:
+            print(f"{t:10.3f}  {key}  {'pulsar' if pressed else 'soltar'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
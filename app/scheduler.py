@@ -0,0 +1,136 @@
+import time
+import numpy as np
+
+from app.startup import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# Valores por defecto de config["inference"].
+INFERENCE_DEFAULTS = {
+    # Ancho máximo de la imagen que recibe MediaPipe (0 = resolución original).
+    "width": 0,
+    # Diferencia (0-255, en el canal que más cambie) a partir de la cual un
+    # píxel de la miniatura cuenta como cambiado.
+    "motion_threshold": 20,
+    # Fracción de píxeles cambiados a partir de la cual hay movimiento. Es
+    # una medida local: una mano que cambia de pose ocupa poco del encuadre
+    # y apenas mueve la diferencia media de toda la imagen.
+    "motion_fraction": 0.002,
+    # Fotogramas seguidos que se puede reutilizar un resultado sin movimiento.
+    "max_reuse": 15,
+    # Inferencias por segundo deseadas; 0 = sin límite.
+    "target_fps": 30,
+}
+# Tamaño de la miniatura sobre la que se mide el movimiento.
+MOTION_SIZE = (64, 48)
+# Fracción máxima del tiempo que puede ocupar la inferencia antes de espaciarla.
+MAX_LOAD = 0.8
+# Tolerancia del regulador: evita saltarse fotogramas de una cámara que
+# llega justo al ritmo objetivo por pequeñas variaciones de tiempo.
+GOVERNOR_SLACK = 0.25
+
+
+class InferenceScheduler:
+    """
+    Decide en qué fotogramas se vuelve a ejecutar MediaPipe. Si la escena
+    apenas cambió respecto al último fotograma procesado (pocos píxeles de
+    una miniatura con una diferencia apreciable) se reutiliza el último
+    resultado, como mucho `max_reuse` veces seguidas. Con movimiento se
+    infiere siempre, salvo que el regulador de FPS lo impida: el intervalo
+    mínimo entre inferencias es 1 / target_fps, y se alarga si la
+    inferencia tarda más de MAX_LOAD de ese intervalo (CPU saturada). Con
+    `governor=False` (fuentes grabadas, que no llegan en tiempo real) solo
+    se aplica la detección de movimiento.
+    """
+
+    def __init__(self, settings=None, governor=True):
+        settings = {**INFERENCE_DEFAULTS, **(settings or {})}
+        self.width = int(settings["width"])
+        self.motion_threshold = float(settings["motion_threshold"])
+        self.motion_pixels = max(
+            1,
+            round(float(settings["motion_fraction"]) * MOTION_SIZE[0] * MOTION_SIZE[1]),
+        )
+        self.max_reuse = int(settings["max_reuse"])
+        self.target_fps = float(settings["target_fps"])
+        self.governor = governor
+        self._thumb = np.empty((MOTION_SIZE[1], MOTION_SIZE[0], 3), dtype=np.uint8)
+        self._reference = np.empty_like(self._thumb)
+        self._diff = np.empty_like(self._thumb)
+        self._changed = np.empty(MOTION_SIZE[::-1], dtype=np.uint8)
+        self._scaled = None
+        self._rgb = None
+        self._has_reference = False
+        self._results = None
+        self._last_start = None
+        self._reused = 0
+        # Duración media (media exponencial) de una inferencia, en segundos.
+        self.cost = None
+        self.inferred = 0
+        self.skipped = 0
+
+    @property
+    def interval(self):
+        """Intervalo mínimo actual entre inferencias, en segundos."""
+        if not self.governor:
+            return 0.0
+        interval = 1.0 / self.target_fps if self.target_fps > 0 else 0.0
+        if self.cost is not None:
+            interval = max(interval, self.cost / MAX_LOAD)
+        return interval
+
+    def should_infer(self, img, now=None):
+        """True si hay que ejecutar MediaPipe sobre `img`."""
+        now = time.perf_counter() if now is None else now
+        cv2.resize(img, MOTION_SIZE, dst=self._thumb, interpolation=cv2.INTER_AREA)
+        if not self._has_reference or self._reused >= self.max_reuse:
+            return True
+        elapsed = now - self._last_start
+        if elapsed < self.interval * (1 - GOVERNOR_SLACK):
+            return False
+        cv2.absdiff(self._thumb, self._reference, dst=self._diff)
+        np.max(self._diff, axis=2, out=self._changed)
+        changed = np.count_nonzero(self._changed >= self.motion_threshold)
+        return changed >= self.motion_pixels
+
+    def to_rgb(self, img):
+        """Imagen RGB para MediaPipe, reducida a `width` de ancho si es mayor."""
+        h, w = img.shape[:2]
+        if self.width and w > self.width:
+            dsize = (self.width, max(1, round(h * self.width / w)))
+            if self._scaled is None or self._scaled.shape[1::-1] != dsize:
+                self._scaled = np.empty((dsize[1], dsize[0], 3), dtype=np.uint8)
+            img = cv2.resize(img, dsize, dst=self._scaled, interpolation=cv2.INTER_AREA)
+        self._rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+    def process(self, hands, img, stats=None):
+        """
+        Resultado de MediaPipe para `img`: uno nuevo o el último reutilizado.
+        Devuelve (results, inferido). Con `stats` (PipelineStats) se miden
+        las etapas motion, convert e inference.
+        """
+        start = time.perf_counter()
+        infer = self.should_infer(img, start)
+        t = stats.lap("motion", start) if stats else start
+        if not infer:
+            self._reused += 1
+            self.skipped += 1
+            return self._results, False
+        rgb = self.to_rgb(img)
+        t = stats.lap("convert", t) if stats else time.perf_counter()
+        self._results = hands.process(rgb)
+        if stats:
+            stats.lap("inference", t)
+        elapsed = time.perf_counter() - start
+        # La primera inferencia incluye la inicialización del grafo.
+        if self.inferred == 1:
+            self.cost = elapsed
+        elif self.inferred > 1:
+            self.cost = 0.9 * self.cost + 0.1 * elapsed
+        self._thumb, self._reference = self._reference, self._thumb
+        self._has_reference = True
+        self._last_start = start
+        self._reused = 0
+        self.inferred += 1
+        return self._results, True
@@ -0,0 +1,131 @@
+import threading
+import numpy as np
+
+from app.startup import lazy_import
+from app.frame_sources import open_source
+
+mp = lazy_import("mediapipe")
+
+# Segundos sin usar tras los que se liberan la cámara y los modelos.
+IDLE_TIMEOUT = 120.0
+
+
+def open_hands(max_num_hands, min_detection_confidence):
+    """
+    MediaPipe Hands ya inicializado: un primer process() construye el grafo
+    y carga el modelo, para que no lo pague el primer fotograma real.
+    """
+    hands = mp.solutions.hands.Hands(
+        max_num_hands=max_num_hands,
+        min_detection_confidence=min_detection_confidence,
+    )
+    hands.process(np.zeros((64, 64, 3), dtype=np.uint8))
+    return hands
+
+
+class SessionPool:
+    """
+    Mantiene abiertos entre tareas la fuente de video y las instancias de
+    MediaPipe Hands (una por (max_num_hands, min_detection_confidence)), de
+    modo que capturar o jugar no vuelve a pagar la apertura de la cámara ni
+    la inicialización del grafo. Todo se libera tras `idle_timeout` segundos
+    sin uso, y `prewarm` lo prepara en segundo plano.
+    """
+
+    def __init__(self, source=0, idle_timeout=IDLE_TIMEOUT):
+        self.source_spec = source
+        self.idle_timeout = idle_timeout
+        self._lock = threading.RLock()
+        self._source = None
+        self._hands = {}
+        self._users = 0
+        self._timer = None
+
+    def _open_source(self):
+        if self._source is None or not self._source.isOpened():
+            self._source = open_source(self.source_spec)
+        return self._source
+
+    def _get_hands(self, max_num_hands, min_detection_confidence):
+        key = (max_num_hands, min_detection_confidence)
+        hands = self._hands.get(key)
+        if hands is None:
+            hands = self._hands[key] = open_hands(
+                max_num_hands, min_detection_confidence
+            )
+        return hands
+
+    def acquire_source(self):
+        """Fuente de video abierta; marca el pool como en uso hasta `release`."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            source = self._open_source()
+            if not source.isOpened():
+                raise IOError("No se puede abrir la webcam")
+            self._users += 1
+            return source
+
+    def hands(self, max_num_hands, min_detection_confidence=0.7):
+        """Instancia de Hands reutilizable con esa configuración."""
+        with self._lock:
+            hands = self._get_hands(max_num_hands, min_detection_confidence)
+        if hasattr(hands, "reset"):
+            hands.reset()
+        return hands
+
+    def release(self):
+        """Devuelve la sesión al pool y programa la liberación por inactividad."""
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            self._schedule_expiry()
+
+    def _schedule_expiry(self):
+        if self._users == 0 and self._timer is None:
+            self._timer = threading.Timer(self.idle_timeout, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _expire(self):
+        with self._lock:
+            self._timer = None
+            if self._users == 0:
+                self._close_resources()
+
+    def _close_resources(self):
+        if self._source is not None:
+            self._source.release()
+            self._source = None
+        for hands in self._hands.values():
+            hands.close()
+        self._hands = {}
+
+    def prewarm(self, hands_configs=((1, 0.7),)):
+        """
+        Abre la cámara y crea las instancias de Hands en un hilo de fondo.
+        Los errores se ignoran: se volverán a producir al usar el pool.
+        """
+
+        def warm():
+            try:
+                with self._lock:
+                    self._open_source()
+                    for max_num_hands, confidence in hands_configs:
+                        self._get_hands(max_num_hands, confidence)
+                    self._schedule_expiry()
+            except Exception:
+                pass
+
+        thread = threading.Thread(target=warm, daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Libera todo inmediatamente."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._users = 0
+            self._close_resources()
@@ -0,0 +1,94 @@
+import importlib
+import sys
+import threading
+import time
+
+# Instante de referencia: main.py importa este módulo antes que nada.
+T0 = time.perf_counter()
+# Presupuesto de tiempo hasta que se muestra el panel de control, en segundos.
+FIRST_WINDOW_BUDGET = 1.0
+# Dependencias que solo se necesitan al capturar, entrenar o jugar.
+HEAVY_MODULES = ("cv2", "mediapipe", "pynput.keyboard")
+
+_lock = threading.Lock()
+milestones = []
+imports = {}
+_warmup = None
+
+
+def mark(name):
+    """Registra un hito del arranque (segundos desde T0)."""
+    with _lock:
+        milestones.append((name, time.perf_counter() - T0))
+
+
+def timed_import(name):
+    """Importa `name` registrando cuánto tardó y en qué hilo."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    with _lock:
+        imports.setdefault(
+            name, (time.perf_counter() - start, threading.current_thread().name)
+        )
+    return module
+
+
+class LazyModule:
+    """Módulo que se importa la primera vez que se accede a un atributo."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = timed_import(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def warm_up(modules=HEAVY_MODULES):
+    """Importa las dependencias pesadas en un hilo de fondo."""
+    global _warmup
+
+    def run():
+        for name in modules:
+            try:
+                timed_import(name)
+            except ImportError:
+                pass
+        mark("dependencias cargadas")
+
+    _warmup = threading.Thread(target=run, name="warm-up", daemon=True)
+    _warmup.start()
+    return _warmup
+
+
+def warmup_done():
+    return _warmup is not None and not _warmup.is_alive()
+
+
+def report():
+    """Resumen del arranque al estilo de `python -X importtime`."""
+    with _lock:
+        lines = ["Arranque (s desde el inicio):"]
+        lines += [f"  {t:8.3f}  {name}" for name, t in milestones]
+        lines.append("Importaciones (s acumulados, hilo):")
+        lines += [
+            f"  {t:8.3f}  {name} [{thread}]"
+            for name, (t, thread) in sorted(imports.items(), key=lambda i: -i[1][0])
+        ]
+        first_window = dict(milestones).get("primera ventana")
+    if first_window is not None:
+        status = "OK" if first_window <= FIRST_WINDOW_BUDGET else "EXCEDIDO"
+        lines.append(
+            f"Primera ventana: {first_window:.3f} s "
+            f"(presupuesto {FIRST_WINDOW_BUDGET:.1f} s) {status}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,204 @@
+from collections import Counter, deque
+import numpy as np
+
+from app.classifier import best_ratios
+
+# Valores por defecto de config["tracking"].
+TRACKING_DEFAULTS = {
+    "enabled": True,
+    # Distancia máxima (en fracción de la imagen) entre el centroide de una
+    # pista y el de una mano para considerarlas la misma.
+    "max_distance": 0.15,
+    # Fotogramas que una pista sobrevive sin mano (MediaPipe la perdió un
+    # momento); mientras tanto conserva su gesto.
+    "grace_frames": 5,
+    # Fotogramas seguidos en otra zona antes de cambiar de jugador.
+    "zone_frames": 10,
+    # Fotogramas sobre los que se vota la etiqueta de cada pista.
+    "window": 5,
+    # Peso de la mano actual en la media exponencial de las características;
+    # 1 = sin suavizado. Valores menores filtran cámaras ruidosas a costa de
+    # retrasar las pulsaciones unos fotogramas.
+    "feature_alpha": 1.0,
+    # Cambio de características por debajo del cual no se vuelve a clasificar.
+    "feature_epsilon": 0.05,
+}
+
+
+class Track:
+    """
+    Una mano seguida a lo largo de los fotogramas: centroide, jugador,
+    características (las del último fotograma, o su media exponencial con
+    `feature_alpha` < 1) y las últimas clasificaciones (`window`). `label`
+    es la etiqueta más votada entre las clasificaciones aceptadas de la
+    ventana (o la última, si no hay ninguna) y `ratio` la distancia
+    relativa del fotograma actual, o infinito si ese fotograma no eligió
+    `label`. El voto retrasa el cambio de etiqueta, pero no la liberación.
+    """
+
+    __slots__ = (
+        "id",
+        "centroid",
+        "player",
+        "features",
+        "missed",
+        "window",
+        "label",
+        "ratio",
+        "_zone",
+        "_zone_frames",
+        "_classified",
+    )
+
+    def __init__(self, track_id, centroid, features, player, window):
+        self.id = track_id
+        self.centroid = centroid
+        self.player = int(player)
+        self.features = np.array(features, dtype=np.float32)
+        self.missed = 0
+        self.window = deque(maxlen=window)
+        self.label = None
+        self.ratio = float("inf")
+        self._zone, self._zone_frames = self.player, 0
+        # (características, jugador, etiqueta, ratio) de la última clasificación.
+        self._classified = None
+
+    def record(self, label, ratio):
+        """Añade la clasificación del fotograma y vuelve a votar la etiqueta."""
+        self.window.append((label, float(ratio)))
+        counts = Counter(l for l, r in self.window if l is not None and r < 1)
+        if not counts:
+            self.label = label
+            self.ratio = float(ratio) if label is not None else float("inf")
+            return
+        # A igualdad de votos gana la etiqueta más reciente.
+        best = max(counts.values())
+        self.label = next(l for l, _ in reversed(self.window) if counts.get(l) == best)
+        # Un fotograma que elige otra etiqueta suelta la votada en el acto.
+        self.ratio = float(ratio) if label == self.label else float("inf")
+
+    @property
+    def accepted(self):
+        return self.ratio < 1
+
+
+class HandTracker:
+    """
+    Asocia las manos de cada fotograma con las pistas del anterior por
+    distancia entre centroides (matriz de distancias vectorizada y
+    asignación voraz de la pareja más cercana), con una distancia máxima.
+    Las manos sin pareja abren una pista nueva; las pistas sin mano se
+    conservan `grace_frames` fotogramas. Cada pista mantiene su jugador
+    aunque el centroide cruce un momento el borde de una zona, y solo se
+    vuelve a clasificar cuando sus características cambian.
+    """
+
+    def __init__(self, settings=None):
+        settings = {**TRACKING_DEFAULTS, **(settings or {})}
+        self.max_distance = float(settings["max_distance"])
+        self.grace_frames = int(settings["grace_frames"])
+        self.zone_frames = int(settings["zone_frames"])
+        self.window = max(1, int(settings["window"]))
+        self.alpha = float(settings["feature_alpha"])
+        self.epsilon = float(settings["feature_epsilon"])
+        self.tracks = []
+        self._next_id = 1
+        # Clasificaciones ejecutadas y evitadas por no haber cambios.
+        self.classified = 0
+        self.reused = 0
+
+    def update(self, centroids, features, players):
+        """
+        Incorpora las manos (N,) de un fotograma: centroides (N, 2),
+        características (N, D) y zona (N,). Devuelve la pista de cada mano.
+        """
+        centroids = np.asarray(centroids, dtype=np.float32).reshape(-1, 2)
+        matched = [None] * len(centroids)
+        free = list(range(len(self.tracks)))
+        if self.tracks and len(centroids):
+            previous = np.array([t.centroid for t in self.tracks])
+            dist = np.linalg.norm(previous[:, None] - centroids[None], axis=2)
+            used_tracks, used_hands = set(), set()
+            for flat in np.argsort(dist, axis=None):
+                t, h = divmod(int(flat), len(centroids))
+                if dist[t, h] > self.max_distance:
+                    break
+                if t in used_tracks or h in used_hands:
+                    continue
+                used_tracks.add(t)
+                used_hands.add(h)
+                matched[h] = self.tracks[t]
+            free = [t for t in free if t not in used_tracks]
+        for t in free:
+            self.tracks[t].missed += 1
+        self.tracks = [t for t in self.tracks if t.missed <= self.grace_frames]
+        for h, track in enumerate(matched):
+            if track is None:
+                track = matched[h] = Track(
+                    self._next_id, centroids[h], features[h], players[h], self.window
+                )
+                self._next_id += 1
+                self.tracks.append(track)
+                continue
+            track.centroid = centroids[h]
+            track.missed = 0
+            track.features += self.alpha * (features[h] - track.features)
+            self._update_player(track, int(players[h]))
+        return matched
+
+    def _update_player(self, track, zone):
+        if zone == track.player or zone == 0:
+            track._zone_frames = 0
+            return
+        if track.player == 0:
+            track.player = zone
+            return
+        if zone != track._zone:
+            track._zone, track._zone_frames = zone, 0
+        track._zone_frames += 1
+        if track._zone_frames >= self.zone_frames:
+            track.player, track._zone_frames = zone, 0
+
+    def classify(self, tracks, classifier):
+        """
+        Clasifica con `classifier` (PrototypeClassifier) las pistas cuyas
+        características o jugador cambiaron desde su última clasificación;
+        las demás repiten su último resultado. Devuelve cuántas se clasificaron.
+        """
+        stale, fresh = [], []
+        for track in tracks:
+            last = track._classified
+            if (
+                last is None
+                or last[1] != track.player
+                or np.linalg.norm(track.features - last[0]) > self.epsilon
+            ):
+                stale.append(track)
+            else:
+                fresh.append(track)
+        if stale:
+            match = classifier.classify(
+                np.array([t.features for t in stale]),
+                np.array([t.player for t in stale]),
+            )
+            for track, label, ratio in zip(stale, match.labels, match.ratios):
+                track._classified = (track.features.copy(), track.player, label, ratio)
+                track.record(label, ratio)
+        for track in fresh:
+            track.record(*track._classified[2:])
+        self.classified += len(stale)
+        self.reused += len(fresh)
+        return len(stale)
+
+    def ratios(self):
+        """{etiqueta: menor distancia relativa suavizada} de las pistas vivas."""
+        return best_ratios(
+            [t.label for t in self.tracks], [t.ratio for t in self.tracks]
+        )
+
+
+def make_tracker(settings):
+    """HandTracker con config["tracking"], o None si está desactivado."""
+    if not {**TRACKING_DEFAULTS, **(settings or {})}["enabled"]:
+        return None
+    return HandTracker(settings)
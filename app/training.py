@@ -0,0 +1,308 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Margen aplicado a la distancia máxima de entrenamiento para fijar el umbral.
+THRESHOLD_MARGIN = 1.2
+# Máximo de prototipos del modelo entre todas las etiquetas: acota el coste
+# de cada clasificación aunque se pidan muchos por etiqueta.
+PROTOTYPE_BUDGET = 256
+# k-means: iteraciones y muestras (submuestreadas) usadas para situar los centros.
+KMEANS_ITERATIONS = 25
+KMEANS_SAMPLES = 20_000
+# Los grupos con menos de esta fracción de las muestras de su etiqueta se
+# descartan: suelen ser capturas erróneas que inflarían un umbral propio.
+MIN_CLUSTER_FRACTION = 0.02
+# Filas leídas por bloque al asignar muestras a los centros.
+ASSIGN_BLOCK = 65_536
+# Muestras a reajustar a partir de las cuales se usa un pool de procesos.
+PARALLEL_MIN_SAMPLES = 200_000
+
+
+class LabelStats:
+    """
+    Estadísticos suficientes de un grupo de muestras (una etiqueta o uno de
+    sus grupos): número de muestras, suma de vectores, suma de normas al
+    cuadrado y distancia máxima a la media.
+    """
+
+    def __init__(self, dim):
+        self.count = 0
+        self.total = np.zeros(dim, dtype=np.float64)
+        self.sq_total = 0.0
+        self.max_dist = 0.0
+
+    @property
+    def mean(self):
+        return self.total / max(self.count, 1)
+
+    @property
+    def rms_dist(self):
+        """Distancia cuadrática media a la media, sin volver a leer los datos."""
+        var = self.sq_total / max(self.count, 1) - self.mean @ self.mean
+        return float(np.sqrt(max(var, 0.0)))
+
+    @property
+    def threshold(self):
+        return self.max_dist * THRESHOLD_MARGIN
+
+    def add(self, X):
+        """
+        Incorpora nuevas muestras. La distancia máxima de las muestras previas
+        se acota con el desplazamiento de la media, así que no hace falta
+        releerlas; el resultado es un umbral igual o algo más holgado.
+        """
+        X = np.asarray(X)
+        if len(X) == 0:
+            return
+        old_mean, had_data = self.mean, self.count > 0
+        self.count += len(X)
+        self.total += X.sum(axis=0, dtype=np.float64)
+        self.sq_total += float(np.einsum("ij,ij->", X, X, dtype=np.float64))
+        mean = self.mean
+        new_max = float(np.linalg.norm(X - mean, axis=1).max())
+        if had_data:
+            new_max = max(
+                new_max, self.max_dist + float(np.linalg.norm(mean - old_mean))
+            )
+        self.max_dist = new_max
+
+
+def nearest_center(X, centers):
+    """Índice (N,) del centro más cercano a cada fila de X."""
+    sq = np.einsum("ij,ij->i", centers, centers) - 2 * X @ centers.T
+    return sq.argmin(axis=1)
+
+
+def kmeans(X, k, iterations=KMEANS_ITERATIONS, seed=0):
+    """
+    Centros (k', D) de k-means sobre X (N, D), con k' <= k: inicialización
+    k-means++ e iteraciones de Lloyd vectorizadas (distancias y sumas por
+    grupo con productos de matrices). Los grupos vacíos se descartan.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    k = min(k, len(X))
+    rng = np.random.default_rng(seed)
+    centers = X[[rng.integers(len(X))]]
+    sq = np.einsum("ij,ij->i", X - centers[0], X - centers[0])
+    for _ in range(1, k):
+        if not sq.sum():
+            break
+        p = sq.astype(np.float64) / sq.sum(dtype=np.float64)
+        centers = np.vstack([centers, X[rng.choice(len(X), p=p)]])
+        sq = np.minimum(sq, np.einsum("ij,ij->i", X - centers[-1], X - centers[-1]))
+    for _ in range(iterations):
+        onehot = (nearest_center(X, centers)[:, None] == np.arange(len(centers))).T
+        counts = onehot.sum(axis=1)
+        keep = counts > 0
+        moved = (onehot.astype(np.float32) @ X)[keep] / counts[keep, None]
+        if moved.shape == centers.shape and np.allclose(moved, centers, atol=1e-6):
+            break
+        centers = moved.astype(np.float32)
+    return centers
+
+
+def fit_label(features, ranges, k, seed=0):
+    """
+    Ajusta hasta `k` grupos con las filas `ranges` de `features` (N, D) y
+    devuelve su lista de LabelStats; con k = 1 es la media de la etiqueta,
+    como sin k-means.
+    """
+    dim = features.shape[1]
+    if k == 1:
+        stats = LabelStats(dim)
+        for start, stop in ranges:
+            stats.add(features[start:stop])
+        return [stats]
+    total = sum(stop - start for start, stop in ranges)
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(total, min(total, KMEANS_SAMPLES), replace=False))
+    offsets = np.cumsum([0] + [stop - start for start, stop in ranges])
+    which = np.searchsorted(offsets, sample, side="right") - 1
+    starts = np.array([start for start, _ in ranges])
+    centers = kmeans(features[starts[which] + sample - offsets[which]], k, seed=seed)
+    blocks = [
+        (lo, min(lo + ASSIGN_BLOCK, stop))
+        for start, stop in ranges
+        for lo in range(start, stop, ASSIGN_BLOCK)
+    ]
+    clusters = [LabelStats(dim) for _ in centers]
+    # Primera pasada: recuento y sumas por grupo; segunda: distancia máxima
+    # exacta a la media final de cada grupo.
+    for lo, hi in blocks:
+        X = np.asarray(features[lo:hi])
+        nearest = nearest_center(X, centers)
+        for j, cluster in enumerate(clusters):
+            members = X[nearest == j]
+            cluster.count += len(members)
+            cluster.total += members.sum(axis=0, dtype=np.float64)
+            cluster.sq_total += float(
+                np.einsum("ij,ij->", members, members, dtype=np.float64)
+            )
+    means = np.array([c.mean for c in clusters])
+    for lo, hi in blocks:
+        X = np.asarray(features[lo:hi])
+        nearest = nearest_center(X, centers)
+        dist = np.linalg.norm(X - means[nearest], axis=1)
+        for j, cluster in enumerate(clusters):
+            mine = dist[nearest == j]
+            if len(mine):
+                cluster.max_dist = max(cluster.max_dist, float(mine.max()))
+    largest = max(c.count for c in clusters)
+    return [
+        c
+        for c in clusters
+        if c.count >= MIN_CLUSTER_FRACTION * total or c.count == largest
+    ]
+
+
+def fit_label_file(filename, rows, dim, ranges, k):
+    """
+    fit_label sobre el archivo de características `filename` (float32,
+    `rows` x `dim`). Es la tarea del pool de procesos: cada proceso abre el
+    memmap por su cuenta en lugar de recibir los datos serializados.
+    """
+    features = np.memmap(filename, dtype=np.float32, mode="r", shape=(rows, dim))
+    return fit_label(features, ranges, k)
+
+
+class IncrementalTrainer:
+    """
+    Entrenador incremental de prototipos sobre un GestureDataset: cada
+    etiqueta se resume en hasta `k` grupos (k-means), cada uno con su
+    prototipo y su umbral, sin superar `budget` prototipos en total. Guarda
+    los estadísticos en `state_path` (npz sin pickle) y en cada `refresh`
+    solo lee las etiquetas cuyo rango de filas cambió: si solo se añadieron
+    filas, las nuevas se suman al grupo más cercano; si se recapturó, la
+    etiqueta se reajusta completa. Los reajustes grandes se reparten entre
+    `workers` procesos (por defecto, todos los núcleos).
+    """
+
+    def __init__(self, dataset, state_path, k=1, budget=PROTOTYPE_BUDGET, workers=None):
+        self.dataset = dataset
+        self.state_path = state_path
+        self.k = max(1, int(k))
+        self.budget = budget
+        self.workers = workers
+        self.clusters = {}
+        self.ranges = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.state_path):
+            return
+        with np.load(self.state_path, allow_pickle=False) as state:
+            if state["total"].shape[1:] != (self.dataset.dim,):
+                return
+            labels = [str(l) for l in state["labels"]]
+            # Los estados anteriores tienen un único grupo por etiqueta.
+            if "cluster_label" in state:
+                cluster_label, k = state["cluster_label"], int(state["k"])
+            else:
+                cluster_label, k = np.arange(len(labels)), 1
+            if k != self.k:
+                return
+            ranges = json.loads(str(state["ranges"]))
+            for i, label_id in enumerate(cluster_label):
+                label = labels[label_id]
+                s = LabelStats(self.dataset.dim)
+                s.count = int(state["count"][i])
+                s.total = state["total"][i].copy()
+                s.sq_total = float(state["sq_total"][i])
+                s.max_dist = float(state["max_dist"][i])
+                self.clusters.setdefault(label, []).append(s)
+                self.ranges[label] = ranges[label]
+
+    def save(self):
+        labels = list(self.clusters)
+        clusters = [c for l in labels for c in self.clusters[l]]
+        dim = self.dataset.dim
+        tmp_path = f"{self.state_path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            labels=np.array(labels, dtype=str),
+            k=np.array(self.k),
+            cluster_label=np.repeat(
+                np.arange(len(labels)), [len(self.clusters[l]) for l in labels]
+            ),
+            count=np.array([c.count for c in clusters], dtype=np.int64),
+            total=np.array([c.total for c in clusters]).reshape(-1, dim),
+            sq_total=np.array([c.sq_total for c in clusters]),
+            max_dist=np.array([c.max_dist for c in clusters]),
+            ranges=np.array(json.dumps({l: self.ranges[l] for l in labels})),
+        )
+        os.replace(tmp_path, self.state_path)
+
+    def clusters_per_label(self, num_labels):
+        """Grupos por etiqueta: `k`, recortado para no superar el presupuesto."""
+        return max(1, min(self.k, self.budget // max(num_labels, 1)))
+
+    def refresh(self):
+        """
+        Actualiza los estadísticos con el dataset. Devuelve las etiquetas
+        que cambiaron.
+        """
+        current = {l: self.dataset.index["ranges"][l] for l in self.dataset.labels()}
+        k = self.clusters_per_label(len(current))
+        changed = [l for l in self.clusters if l not in current]
+        for label in changed:
+            del self.clusters[label], self.ranges[label]
+        # Si el presupuesto recorta k de otra forma que en el entrenamiento
+        # anterior, todas las etiquetas se reajustan.
+        if any(len(c) > k for c in self.clusters.values()):
+            self.clusters.clear()
+            self.ranges.clear()
+        features = self.dataset.column("features")
+        refit = []
+        for label, ranges in current.items():
+            known = self.ranges.get(label)
+            if known == ranges:
+                continue
+            if known is not None and ranges[: len(known)] == known:
+                clusters = self.clusters[label]
+                means = np.array([c.mean for c in clusters])
+                for start, stop in ranges[len(known) :]:
+                    X = features[start:stop]
+                    nearest = nearest_center(X, means)
+                    for j, cluster in enumerate(clusters):
+                        cluster.add(X[nearest == j])
+            else:
+                refit.append(label)
+            self.ranges[label] = [list(r) for r in ranges]
+            changed.append(label)
+        self._refit(features, refit, k)
+        return changed
+
+    def _refit(self, features, labels, k):
+        if not labels:
+            return
+        samples = sum(stop - start for l in labels for start, stop in self.ranges[l])
+        workers = self.workers or os.cpu_count() or 1
+        if len(labels) > 1 and workers > 1 and samples >= PARALLEL_MIN_SAMPLES:
+            jobs = [
+                (features.filename, len(features), self.dataset.dim, self.ranges[l], k)
+                for l in labels
+            ]
+            # "spawn": la aplicación tiene hilos (Tk, cámara) que no deben
+            # heredarse con fork.
+            with ProcessPoolExecutor(
+                min(workers, len(labels)),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                results = list(pool.map(fit_label_file, *zip(*jobs)))
+        else:
+            results = [fit_label(features, self.ranges[l], k) for l in labels]
+        for label, clusters in zip(labels, results):
+            self.clusters[label] = clusters
+
+    def prototypes(self):
+        """Dicts etiqueta -> prototipos (k, D) y etiqueta -> umbrales (k,)."""
+        prototypes, thresholds = {}, {}
+        for label, clusters in self.clusters.items():
+            clusters = [c for c in clusters if c.count]
+            if clusters:
+                prototypes[label] = np.array([c.mean for c in clusters])
+                thresholds[label] = np.array([c.threshold for c in clusters])
+        return prototypes, thresholds
@@ -1,9 +1,56 @@
+import json
+import math
 import numpy as np
-import cv2
 
+from app.startup import lazy_import
 
-def get_player_zone(player, width, height, num_players):
-    """Calcula las coordenadas de la zona de un jugador en la pantalla."""
+cv2 = lazy_import("cv2")
+
+# Tamaño en píxeles de cada celda de la rejilla de ZoneMap.
+ZONE_CELL = 4
+
+# Parámetros de normalize_landmarks_batch; se guardan en el modelo para
+# rechazar modelos entrenados con otra normalización.
+NORMALIZATION = {"origin": 0, "scale_ref": 9, "min_scale": 1e-6, "dim": 63}
+
+
+def get_grid_shape(num_players, width, height):
+    """Filas y columnas de la rejilla genérica, según la proporción de la imagen."""
+    rows = max(1, min(num_players, round(math.sqrt(num_players * height / width))))
+    return rows, -(-num_players // rows)
+
+
+def get_grid_zone(player, width, height, rows, cols):
+    """Zona del jugador en una rejilla de rows x cols, llenada por filas."""
+    zone_width, zone_height = width // cols, height // rows
+    row, col = divmod(player - 1, cols)
+    if row >= rows:
+        return None
+    x1, y1 = col * zone_width, row * zone_height
+    return x1, y1, x1 + zone_width, y1 + zone_height
+
+
+def get_player_zone(player, width, height, num_players, layout=None):
+    """
+    Calcula las coordenadas de la zona de un jugador en la pantalla.
+    `layout` (config["layout"]) puede definir una rejilla {"rows", "cols"} o
+    zonas propias {"zones": {"1": [x1, y1, x2, y2], ...}} en fracciones de la
+    imagen. Sin layout, de 1 a 4 jugadores se usan las zonas fijas y a partir
+    de 5 una rejilla automática.
+    """
+    if layout:
+        if "zones" in layout:
+            zone = layout["zones"].get(str(player))
+            if zone is None:
+                return None
+            fx1, fy1, fx2, fy2 = zone
+            return (
+                int(fx1 * width),
+                int(fy1 * height),
+                int(fx2 * width),
+                int(fy2 * height),
+            )
+        return get_grid_zone(player, width, height, layout["rows"], layout["cols"])
     if num_players == 1:
         return 0, 0, width, height
     elif num_players == 2:
@@ -24,22 +71,68 @@ def get_player_zone(player, width, height, num_players):
         x1 = ((player - 1) % 2) * zone_width
         y1 = ((player - 1) // 2) * zone_height
         return x1, y1, x1 + zone_width, y1 + zone_height
+    elif num_players > 4:
+        rows, cols = get_grid_shape(num_players, width, height)
+        return get_grid_zone(player, width, height, rows, cols)
     return None
 
 
-def draw_zones(img, num_players, active_player=None):
-    """Dibuja las zonas de los jugadores en la imagen."""
-    height, width, _ = img.shape
-    for i in range(1, num_players + 1):
-        x1, y1, x2, y2 = get_player_zone(i, width, height, num_players)
+class ZoneMap:
+    """
+    Rejilla precalculada con el id de jugador de cada celda de ZONE_CELL
+    píxeles (0 = ninguno). Se construye una vez por resolución y número de
+    jugadores; asignar una mano a un jugador es una sola indexación.
+    """
+
+    def __init__(self, width, height, num_players, layout=None, cell=ZONE_CELL):
+        self.width, self.height, self.cell = width, height, cell
+        self.zones = {}
+        for i in range(1, num_players + 1):
+            zone = get_player_zone(i, width, height, num_players, layout)
+            if zone is not None:
+                self.zones[i] = zone
+        self.grid = np.zeros((-(-height // cell), -(-width // cell)), dtype=np.uint8)
+        # En orden inverso para que, si dos zonas se solapan, gane la de menor id.
+        for i, (x1, y1, x2, y2) in reversed(list(self.zones.items())):
+            self.grid[y1 // cell : -(-y2 // cell), x1 // cell : -(-x2 // cell)] = i
+
+    def lookup(self, centroids):
+        """Ids de jugador (N,) para centroides (N, 2) en coordenadas normalizadas."""
+        centroids = np.asarray(centroids, dtype=np.float32).reshape(-1, 2)
+        rows, cols = self.grid.shape
+        ix = np.clip((centroids[:, 0] * self.width) // self.cell, 0, cols - 1)
+        iy = np.clip((centroids[:, 1] * self.height) // self.cell, 0, rows - 1)
+        return self.grid[iy.astype(np.intp), ix.astype(np.intp)].astype(np.int32)
+
+
+_zone_maps = {}
+
+
+def get_zone_map(width, height, num_players, layout=None):
+    """ZoneMap en caché por (resolución, jugadores, layout)."""
+    key = (width, height, num_players, json.dumps(layout, sort_keys=True))
+    zone_map = _zone_maps.get(key)
+    if zone_map is None:
+        zone_map = _zone_maps[key] = ZoneMap(width, height, num_players, layout)
+    return zone_map
+
+
+def render_zone_overlay(width, height, num_players, active_player=None, layout=None):
+    """
+    Dibuja las zonas sobre una imagen negra y devuelve (overlay, máscara) con
+    los píxeles dibujados, listos para componerse sobre cada fotograma.
+    """
+    overlay = np.zeros((height, width, 3), dtype=np.uint8)
+    zones = get_zone_map(width, height, num_players, layout).zones
+    for i, (x1, y1, x2, y2) in zones.items():
         color = (0, 255, 0)
         thickness = 2
         if active_player is not None and i == active_player:
             color = (0, 255, 255)
             thickness = 4
-        cv2.rectangle(img, (x1, y1), (x2, y2), color, thickness)
+        cv2.rectangle(overlay, (x1, y1), (x2, y2), color, thickness)
         cv2.putText(
-            img,
+            overlay,
             f"Jugador {i}",
             (x1 + 10, y1 + 30),
             cv2.FONT_HERSHEY_SIMPLEX,
@@ -47,27 +140,81 @@ def draw_zones(img, num_players, active_player=None):
             color,
             2,
         )
+    mask = overlay.any(axis=2).astype(np.uint8)
+    return overlay, mask
 
 
-def normalize_landmarks(hand_landmarks):
+_zone_overlays = {}
+
+
+def draw_zones(img, num_players, active_player=None, layout=None):
     """
-    Normaliza los 21x3 landmarks para que sean invariantes a la escala,
-    posición y rotación de la mano. Devuelve un vector de 63 elementos.
+    Dibuja las zonas de los jugadores en la imagen. El overlay se genera una
+    vez por (resolución, jugadores, jugador activo, layout) y después solo se
+    copia con su máscara.
     """
-    if hand_landmarks is None:
-        return None
+    height, width, _ = img.shape
+    key = (
+        width,
+        height,
+        num_players,
+        active_player,
+        json.dumps(layout, sort_keys=True),
+    )
+    cached = _zone_overlays.get(key)
+    if cached is None:
+        cached = _zone_overlays[key] = render_zone_overlay(
+            width, height, num_players, active_player, layout
+        )
+    overlay, mask = cached
+    cv2.copyTo(overlay, mask, img)
+
+
+def landmarks_to_array(multi_hand_landmarks):
+    """
+    Convierte de una sola vez los landmarks de todas las manos detectadas
+    (protobuf de MediaPipe) en un array (N, 21, 3) float32.
+    """
+    if not multi_hand_landmarks:
+        return np.empty((0, 21, 3), dtype=np.float32)
+    return np.array(
+        [[(p.x, p.y, p.z) for p in lm.landmark] for lm in multi_hand_landmarks],
+        dtype=np.float32,
+    )
 
-    coords = np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark])
+
+def normalize_landmarks_batch(coords):
+    """
+    Normaliza un lote (N, 21, 3) de manos en una sola pasada vectorizada.
+    Acepta arrays ya calculados (p. ej. datos grabados). Devuelve:
+    - features: (N, 63) invariantes a escala y posición,
+    - centroids: (N, 2) centro de cada mano en coordenadas normalizadas,
+    - valid: (N,) máscara de manos con escala no degenerada.
+    """
+    coords = np.asarray(coords, dtype=np.float32)
+    n = coords.shape[0]
 
     # 1. Centrar en el origen (usando la muñeca como punto de referencia)
-    coords_translated = coords - coords[0]
+    translated = coords - coords[:, NORMALIZATION["origin"], None]
 
-    # 2. Normalizar la escala
-    scaling_dist = np.linalg.norm(coords_translated[9] - coords_translated[0])
-    if scaling_dist < 1e-6:
-        return None
+    # 2. Normalizar la escala (distancia muñeca - base del dedo medio)
+    scale = np.linalg.norm(translated[:, NORMALIZATION["scale_ref"]], axis=1)
+    valid = scale >= NORMALIZATION["min_scale"]
+    translated /= np.where(valid, scale, 1.0)[:, None, None]
 
-    coords_normalized = coords_translated / scaling_dist
+    # 3. Aplanar cada mano a un vector de (63,)
+    features = translated.reshape(n, coords.shape[1] * coords.shape[2])
+    centroids = coords[:, :, :2].mean(axis=1)
+    return features, centroids, valid
+
+
+def normalize_landmarks(hand_landmarks):
+    """
+    Normaliza los 21x3 landmarks para que sean invariantes a la escala,
+    posición y rotación de la mano. Devuelve un vector de 63 elementos.
+    """
+    if hand_landmarks is None:
+        return None
 
-    # 3. Aplanar el array a un vector de (63,)
-    return coords_normalized.flatten()
+    features, _, valid = normalize_landmarks_batch(landmarks_to_array([hand_landmarks]))
+    return features[0] if valid[0] else None
@@ -0,0 +1,312 @@
+"""
+Benchmarks de rendimiento con datos sintéticos (sin cámara ni red).
+
+Uso:
+    python -m benchmarks.run                  # compara con benchmarks/baseline.json
+    python -m benchmarks.run --save           # guarda los resultados como nueva base
+    python -m benchmarks.run --quick          # omite los casos más grandes
+    python -m benchmarks.run -k classify      # solo los casos que contienen "classify"
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+from contextlib import contextmanager
+from types import SimpleNamespace
+import numpy as np
+
+from app import core_logic
+from app.classifier import PrototypeClassifier, PrototypeIndex
+from app.dataset import GestureDataset
+from app.model_store import load_model, save_model
+from app.utils import (
+    NORMALIZATION,
+    draw_zones,
+    get_player_zone,
+    landmarks_to_array,
+    normalize_landmarks,
+    normalize_landmarks_batch,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Variación relativa tolerada antes de considerar un caso una regresión.
+TOLERANCE = 0.3
+# Diferencia absoluta, en segundos, por debajo de la cual un caso no cambia:
+# en los casos de microsegundos el ruido supera con facilidad TOLERANCE.
+MIN_DIFFERENCE = 50e-6
+# Tiempo mínimo de cada repetición y número de repeticiones (se toma la mejor).
+MIN_TIME = 0.2
+REPEAT = 7
+
+# name -> (fábrica, parámetro, es_pesado)
+BENCHMARKS = {}
+
+
+def benchmark(name, params, heavy=()):
+    """
+    Registra una fábrica de casos `name/param` para cada parámetro. La fábrica
+    es un generador: prepara los datos, cede la función a medir y limpia.
+    """
+
+    def register(factory):
+        for param in params:
+            BENCHMARKS[f"{name}/{param}"] = (factory, param, param in heavy)
+        return factory
+
+    return register
+
+
+def synthetic_hands(n, seed=0):
+    """Landmarks (n, 21, 3) con forma de mano: una pose base más ruido."""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(-0.08, 0.08, (21, 3)).astype(np.float32)
+    centers = rng.uniform(0.2, 0.8, (n, 1, 3)).astype(np.float32)
+    centers[..., 2] = 0
+    noise = rng.normal(0, 0.01, (n, 21, 3)).astype(np.float32)
+    return base + centers + noise
+
+
+def as_protobuf(coords):
+    """Imita multi_hand_landmarks de MediaPipe a partir de un array (N, 21, 3)."""
+    return [
+        SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in hand])
+        for hand in coords.tolist()
+    ]
+
+
+def synthetic_model(num_gestures, seed=0):
+    rng = np.random.default_rng(seed)
+    labels = [f"g{i}" for i in range(num_gestures)]
+    prototypes = {l: rng.normal(0, 1, NORMALIZATION["dim"]) for l in labels}
+    return PrototypeIndex.build(prototypes, dict.fromkeys(labels, 1.0))
+
+
+@contextmanager
+def workdir():
+    """Directorio temporal como directorio actual (rutas relativas de core_logic)."""
+    cwd, path = os.getcwd(), tempfile.mkdtemp(prefix="gesture-bench-")
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@benchmark("normalize_landmarks", ["single"])
+def bench_normalize_single(_):
+    hand = as_protobuf(synthetic_hands(1))[0]
+    yield lambda: normalize_landmarks(hand)
+
+
+@benchmark("normalize_landmarks_batch", [1, 2, 8, 64, 1024])
+def bench_normalize_batch(n):
+    coords = synthetic_hands(n)
+    yield lambda: normalize_landmarks_batch(coords)
+
+
+@benchmark("landmarks_to_array", [1, 2, 8])
+def bench_landmarks_to_array(n):
+    hands = as_protobuf(synthetic_hands(n))
+    yield lambda: landmarks_to_array(hands)
+
+
+@benchmark("get_player_zone", [1, 4, 8])
+def bench_player_zone(num_players):
+    players = range(1, num_players + 1)
+    yield lambda: [get_player_zone(p, 640, 480, num_players) for p in players]
+
+
+@benchmark("draw_zones", [1, 4, 8])
+def bench_draw_zones(num_players):
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    yield lambda: draw_zones(img, num_players, active_player=1)
+
+
+@benchmark("classify", [1, 10, 100, 1000])
+def bench_classify(num_gestures):
+    index = synthetic_model(num_gestures)
+    players = {"1": index.labels[::2], "2": index.labels[1::2] or index.labels}
+    classifier = PrototypeClassifier(index, players)
+    features, _, _ = normalize_landmarks_batch(synthetic_hands(4))
+    hand_players = np.array([1, 1, 2, 2])
+    yield lambda: classifier.classify(features, hand_players)
+
+
+@benchmark("train_model", [300, 10_000, 100_000, 1_000_000], heavy=(1_000_000,))
+def bench_train_model(num_samples, num_gestures=10, prototypes_per_label=1):
+    with workdir():
+        with open(core_logic.CONFIG_FILE, "w") as f:
+            json.dump(
+                {
+                    "num_players": 1,
+                    "players": {"1": [f"g{i}" for i in range(num_gestures)]},
+                    "training": {"prototypes_per_label": prototypes_per_label},
+                },
+                f,
+            )
+        dataset = GestureDataset(core_logic.DATASET_DIR)
+        rng = np.random.default_rng(0)
+        for i, n in enumerate(np.array_split(np.arange(num_samples), num_gestures)):
+            with dataset.writer(f"g{i}", 1) as writer:
+                writer.add_batch(rng.normal(i, 1, (len(n), NORMALIZATION["dim"])))
+                writer.commit()
+
+        def train():
+            # Entrenamiento completo: sin estado incremental previo.
+            if os.path.exists(core_logic.TRAINING_STATE_PATH):
+                os.remove(core_logic.TRAINING_STATE_PATH)
+            core_logic._dataset = None
+            message, ok = core_logic.train_model()
+            assert ok, message
+
+        yield train
+        core_logic._dataset = None
+
+
+@benchmark("train_model_kmeans", [10_000, 100_000])
+def bench_train_model_kmeans(num_samples):
+    yield from bench_train_model(num_samples, prototypes_per_label=4)
+
+
+@benchmark("load_model", [10, 1000])
+def bench_load_model(num_gestures):
+    with workdir():
+        save_model("model.gpm", synthetic_model(num_gestures), NORMALIZATION)
+        yield lambda: load_model("model.gpm", NORMALIZATION)
+
+
+def measure(fn, min_time=MIN_TIME, repeat=REPEAT):
+    """Mejor tiempo por llamada, en segundos, al estilo de timeit."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    if elapsed >= min_time:
+        # Casos lentos: pocas repeticiones de una sola llamada.
+        return min([elapsed / number] + timer.repeat(max(1, repeat // 2), number))
+    number = max(number, int(number * min_time / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run(names):
+    results = {}
+    for name in names:
+        factory, param, _ = BENCHMARKS[name]
+        cases = factory(param)
+        fn = next(cases)
+        results[name] = measure(fn)
+        cases.close()
+        print(f"  {name:<36} {format_time(results[name]):>10}", file=sys.stderr)
+    return results
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def changed(seconds, base, tolerance=TOLERANCE):
+    """1 si `seconds` es una regresión respecto a `base`, -1 si mejora, 0 si no."""
+    if abs(seconds - base) < MIN_DIFFERENCE:
+        return 0
+    if seconds > base * (1 + tolerance):
+        return 1
+    if seconds < base * (1 - tolerance):
+        return -1
+    return 0
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Imprime la comparación con la base; devuelve los casos con regresión."""
+    regressions = []
+    print(f"{'caso':<36} {'actual':>10} {'base':>10} {'ratio':>7}")
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<36} {format_time(seconds):>10} {'-':>10} {'-':>7}  nuevo")
+            continue
+        ratio = seconds / base
+        status = ""
+        change = changed(seconds, base, tolerance)
+        if change > 0:
+            status = "REGRESIÓN"
+            regressions.append(name)
+        elif change < 0:
+            status = "mejora"
+        print(
+            f"{name:<36} {format_time(seconds):>10} {format_time(base):>10} "
+            f"{ratio:7.2f}  {status}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", dest="filter", help="solo casos que contengan este texto")
+    parser.add_argument("--quick", action="store_true", help="omitir casos pesados")
+    parser.add_argument("--save", action="store_true", help="guardar como nueva base")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--json", help="escribir los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    names = [
+        name
+        for name, (_, _, heavy) in BENCHMARKS.items()
+        if (not args.filter or args.filter in name) and not (args.quick and heavy)
+    ]
+    results = run(names)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "machine": platform.platform(),
+                    "processor": platform.processor() or platform.machine(),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "results": baseline,
+                },
+                f,
+                indent=4,
+            )
+        print(f"Base guardada en {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No hay base guardada; ejecute con --save.", file=sys.stderr)
+        return 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print(f"Base: {baseline['machine']} (Python {baseline['python']})")
+    # Los casos que parecen más lentos se miden otra vez antes de darlos por
+    # regresión: una sola medición en una máquina cargada es poco fiable.
+    suspects = [
+        name
+        for name, seconds in results.items()
+        if name in baseline["results"]
+        and changed(seconds, baseline["results"][name], args.tolerance) > 0
+    ]
+    for name, seconds in run(suspects).items():
+        results[name] = min(results[name], seconds)
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regresiones: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,20 @@
-from app.gui_app import GestureApp
+from app import startup
 import os
+import sys
+
+from app.gui_app import GestureApp
+
+startup.mark("interfaz importada")
+
+
+def print_startup_report(app):
+    """Imprime el informe de arranque cuando termina la precarga y cierra la app."""
+    if not startup.warmup_done():
+        app.after(100, print_startup_report, app)
+        return
+    print(startup.report())
+    app.on_closing()
+
 
 if __name__ == "__main__":
     # Asegurar que las carpetas de datos existen
@@ -8,4 +23,8 @@ if __name__ == "__main__":
 
     # Iniciar la aplicación
     app = GestureApp()
+    startup.mark("ventana creada")
+    # `python main.py --startup-report` mide el arranque y sale
+    if "--startup-report" in sys.argv:
+        app.after(100, print_startup_report, app)
     app.mainloop()
@@ -0,0 +1,89 @@
+"""
+Servicio sin interfaz: ejecuta el bucle de juego y publica los gestos por
+un socket local en lugar de pulsar teclas.
+
+Uso:
+    python serve.py                          # socket Unix gesture-events.sock
+    python serve.py --socket /tmp/gestos.sock
+    python serve.py --port 8765 --source video.mp4
+
+Cada cliente recibe líneas JSON ("hello", "gesture", "sync"); ver
+app.event_server.GestureEventServer.
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+import threading
+
+from app.core_logic import OpenCVController, is_model_trained, load_config
+from app.event_server import DEFAULT_SOCKET, EventBackend, GestureEventServer
+from app.multi_camera import MultiCameraController
+
+
+def ignore_frame(**kwargs):
+    pass
+
+
+async def serve(args):
+    config = load_config()
+    server = GestureEventServer(args.socket, args.port)
+    await server.start()
+    print(f"Publicando gestos en {server.address}", file=sys.stderr)
+    stop_event = threading.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
+    backend = EventBackend(server)
+    # Sin vista previa: no se dibuja y los landmarks se reflejan en lugar de
+    # voltear la imagen.
+    if args.source is None and config.get("cameras"):
+        controller = MultiCameraController(
+            ignore_frame,
+            config["cameras"],
+            keyboard=backend,
+            draw_overlay=False,
+            mirror_landmarks=True,
+        )
+    else:
+        controller = OpenCVController(
+            ignore_frame,
+            source=args.source if args.source is not None else 0,
+            keyboard=backend,
+            draw_overlay=False,
+            mirror_landmarks=True,
+        )
+    try:
+        await loop.run_in_executor(None, controller.run_play, stop_event)
+    finally:
+        controller.release()
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="ruta del socket Unix")
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="escuchar en 127.0.0.1:PORT (TCP) en vez de un socket Unix",
+    )
+    parser.add_argument(
+        "--source",
+        help="video, directorio de imágenes, índice de cámara o synthetic[:N] "
+        "(por defecto, config['cameras'] o la webcam 0)",
+    )
+    args = parser.parse_args(argv)
+    if load_config() is None or not is_model_trained():
+        print("Se necesita config.json y un modelo entrenado.", file=sys.stderr)
+        return 1
+    asyncio.run(serve(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+from benchmarks.run import changed, compare
+
+
+def test_small_absolute_differences_are_noise():
+    # Casi el doble, pero con menos de MIN_DIFFERENCE de diferencia.
+    assert changed(37e-6, 20e-6) == 0
+    assert changed(230e-6, 124e-6) == 1
+    assert changed(1e-6, 40e-6) == 0
+
+
+def test_relative_tolerance_applies_above_the_floor():
+    assert changed(1.2, 1.0) == 0
+    assert changed(1.5, 1.0) == 1
+    assert changed(0.5, 1.0) == -1
+
+
+def test_compare_reports_only_real_regressions(capsys):
+    results = {"rapido": 40e-6, "lento": 2.0, "nuevo": 1.0}
+    baseline = {"rapido": 10e-6, "lento": 1.0}
+    assert compare(results, baseline) == ["lento"]
+    out = capsys.readouterr().out
+    assert "nuevo" in out
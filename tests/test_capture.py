@@ -0,0 +1,90 @@
+import json
+import threading
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app import core_logic
+from app.config_store import ConfigStore
+from app.core_logic import OpenCVController
+from app.dataset import GestureDataset
+from app.key_dispatcher import MemoryBackend
+
+
+class Hands:
+    """Sustituto de MediaPipe Hands: la misma mano en cada fotograma."""
+
+    def __init__(self, center):
+        rng = np.random.default_rng(0)
+        coords = np.asarray(center) + rng.uniform(-0.05, 0.05, (21, 3))
+        self.result = SimpleNamespace(
+            multi_hand_landmarks=[
+                SimpleNamespace(
+                    landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in coords]
+                )
+            ]
+        )
+
+    def process(self, rgb):
+        return self.result
+
+
+@pytest.fixture
+def capture(tmp_path, monkeypatch):
+    def run(config, player, center=(0.25, 0.5, 0.0), frames=400):
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps(config))
+        monkeypatch.setattr(core_logic, "config_store", ConfigStore(path))
+        dataset = GestureDataset(tmp_path / "gestures", dim=63)
+        monkeypatch.setattr(core_logic, "_dataset", dataset)
+        monkeypatch.setattr(
+            OpenCVController,
+            "_hands_session",
+            lambda self, n: nullcontext(Hands(center)),
+        )
+        controller = OpenCVController(
+            lambda **kwargs: None,
+            source=f"synthetic:{frames}",
+            keyboard=MemoryBackend(),
+            draw_overlay=False,
+        )
+        try:
+            result = controller.run_capture(player, "a", threading.Event())
+        finally:
+            controller.release()
+        return result, dataset, controller.stats
+
+    return run
+
+
+def test_capture_commits_hands_inside_the_players_zone(capture):
+    config = {"num_players": 2, "players": {"1": "a", "2": "b"}}
+    (message, success), dataset, stats = capture(config, "1")
+    assert success
+    assert dataset.count("a") == 300
+    # Sin dibujo no se mide una etapa de dibujo.
+    stages = stats.summary()["stages"]
+    assert "draw" not in stages
+    assert stages["normalize"]["count"] == 300
+
+
+def test_capture_outside_the_zone_is_incomplete(capture):
+    config = {"num_players": 2, "players": {"1": "a", "2": "b"}}
+    (message, success), dataset, _ = capture(config, "2")
+    assert not success
+    assert message == "Captura cancelada o incompleta."
+    assert dataset.labels() == []
+
+
+def test_layout_without_the_players_zone_is_an_error(capture):
+    config = {
+        "num_players": 2,
+        "players": {"1": "a", "2": "b"},
+        "layout": {"zones": {"1": [0.0, 0.0, 0.5, 1.0]}},
+    }
+    (message, success), dataset, _ = capture(config, "2")
+    assert not success
+    assert "zona del jugador 2" in message
+    assert dataset.labels() == []
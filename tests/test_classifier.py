@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from app.classifier import PrototypeClassifier, PrototypeIndex, best_ratios
+
+# Un prototipo por gesto en un eje distinto, con umbral 0.5.
+CENTERS = {"a": [1, 0, 0, 0], "b": [0, 1, 0, 0], "c": [0, 0, 1, 0], "d": [0, 0, 0, 1]}
+
+
+@pytest.fixture
+def index():
+    return PrototypeIndex.build(
+        {l: np.array(c, dtype=np.float32) for l, c in CENTERS.items()},
+        {l: 0.5 for l in CENTERS},
+    )
+
+
+def hands(*labels):
+    return np.array([CENTERS[l] for l in labels], dtype=np.float32)
+
+
+def test_hand_matches_only_its_players_gestures(index):
+    classifier = PrototypeClassifier(index, {"1": ["a", "b"], "2": "c"})
+    match = classifier.classify(hands("a", "c", "c"), [1, 1, 2])
+    assert match.labels[0] == "a"
+    assert match.accepted.tolist() == [True, False, True]
+    # La mano 2 está sobre "c", pero el jugador 1 solo tiene "a" y "b".
+    assert match.labels[1] in ("a", "b")
+    assert match.labels[2] == "c"
+
+
+def test_shared_gesture_resolves_for_every_player(index):
+    classifier = PrototypeClassifier(index, {"1": ["a", "b"], "2": ["c", "a"]})
+    assert classifier.blocks == {0: (0, 1), 1: (1, 3), 2: (3, 5)}
+    match = classifier.classify(hands("a", "a", "b", "b"), [1, 2, 1, 2])
+    assert match.labels[:3] == ["a", "a", "b"]
+    assert match.accepted.tolist() == [True, True, True, False]
+    assert match.label_ids.tolist()[:3] == [0, 0, 1]
+
+
+def test_hands_outside_any_zone_get_no_candidates(index):
+    classifier = PrototypeClassifier(index, {"1": "a"})
+    match = classifier.classify(hands("a", "a"), [0, 3])
+    assert match.labels == [None, None]
+    assert match.label_ids.tolist() == [-1, -1]
+    assert np.isinf(match.ratios).all()
+    assert not match.accepted.any()
+
+
+def test_without_players_every_gesture_is_a_candidate(index):
+    classifier = PrototypeClassifier(index, {"1": "a"})
+    match = classifier.classify(hands("d", "a"))
+    assert match.labels == ["d", "a"]
+    assert match.accepted.all()
+
+
+def test_best_ratios_keeps_the_minimum_per_label():
+    ratios = best_ratios(["a", None, "a", "b"], [0.8, 0.1, 0.4, 1.5])
+    assert ratios == {"a": 0.4, "b": 1.5}
+    assert best_ratios(["b"], [0.9], ratios) is ratios
+    assert ratios == {"a": 0.4, "b": 0.9}
@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+from app.config_store import ConfigStore
+
+CONFIG = {"num_players": 1, "players": {"1": "a"}}
+
+
+def write(path, text, stamp):
+    path.write_text(text)
+    # mtime explícito: dos escrituras seguidas pueden caer en el mismo tick.
+    os.utime(path, ns=(stamp, stamp))
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, json.dumps(CONFIG), 1_000_000_000)
+    return ConfigStore(path, required=("num_players", "players"))
+
+
+def test_snapshot_is_cached_until_the_file_changes(store):
+    first = store.get()
+    assert first == CONFIG
+    assert store.get() is first
+    write(store.path, json.dumps({**CONFIG, "num_players": 2}), 2_000_000_000)
+    assert store.get()["num_players"] == 2
+
+
+@pytest.mark.parametrize(
+    "text", ['{"num_players": 2, "pla', '{"num_players": 2}', "[1, 2]"]
+)
+def test_invalid_reload_keeps_the_last_good_snapshot(store, text):
+    good = store.get()
+    write(store.path, text, 2_000_000_000)
+    assert store.get() is good
+    assert store.error is not None
+    write(store.path, json.dumps({**CONFIG, "num_players": 3}), 3_000_000_000)
+    assert store.get()["num_players"] == 3
+    assert store.error is None
+
+
+def test_missing_file_returns_none(tmp_path):
+    assert ConfigStore(tmp_path / "config.json").get() is None
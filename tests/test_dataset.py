@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from app.dataset import COLUMNS, GestureDataset
+
+
+def samples(n, value, dim=4):
+    return np.full((n, dim), value, dtype=np.float32)
+
+
+def capture(dataset, label, X, replace=True):
+    with dataset.writer(label) as writer:
+        writer.add_batch(X)
+        writer.commit(replace=replace)
+
+
+def test_commit_makes_rows_visible_and_persistent(tmp_path):
+    dataset = GestureDataset(tmp_path, dim=4)
+    capture(dataset, "a", samples(3, 1.0))
+    capture(dataset, "b", samples(2, 2.0))
+    assert dataset.labels() == ["a", "b"]
+    assert dataset.count("a") == 3
+    np.testing.assert_array_equal(dataset.get("b"), samples(2, 2.0))
+
+    reopened = GestureDataset(tmp_path, dim=4)
+    assert reopened.rows == 5
+    np.testing.assert_array_equal(reopened.get("a"), samples(3, 1.0))
+
+
+def test_uncommitted_writer_is_discarded(tmp_path):
+    dataset = GestureDataset(tmp_path, dim=4)
+    capture(dataset, "a", samples(3, 1.0))
+    with dataset.writer("b") as writer:
+        writer.add_batch(samples(5, 9.0))
+    assert dataset.labels() == ["a"]
+    assert dataset.rows == 3
+    # Las filas abortadas no quedan en los archivos de columnas.
+    assert (tmp_path / COLUMNS["features"][0]).stat().st_size == 3 * 4 * 4
+    capture(dataset, "b", samples(2, 2.0))
+    np.testing.assert_array_equal(dataset.get("b"), samples(2, 2.0))
+
+
+def test_open_truncates_rows_left_by_a_crash(tmp_path):
+    dataset = GestureDataset(tmp_path, dim=4)
+    capture(dataset, "a", samples(3, 1.0))
+    # Un proceso que muere a mitad de captura: filas escritas sin confirmar.
+    writer = dataset.writer("b")
+    writer.add_batch(samples(4, 9.0))
+    writer._close()
+
+    reopened = GestureDataset(tmp_path, dim=4)
+    assert reopened.labels() == ["a"]
+    for name, (filename, dtype) in COLUMNS.items():
+        width = 4 if name == "features" else 1
+        size = (tmp_path / filename).stat().st_size
+        assert size == 3 * width * np.dtype(dtype).itemsize
+    capture(reopened, "b", samples(2, 2.0))
+    np.testing.assert_array_equal(reopened.get("b"), samples(2, 2.0))
+
+
+def test_append_and_replace(tmp_path):
+    dataset = GestureDataset(tmp_path, dim=4)
+    capture(dataset, "a", samples(2, 1.0))
+    capture(dataset, "b", samples(1, 2.0))
+    capture(dataset, "a", samples(3, 3.0), replace=False)
+    assert dataset.index["ranges"]["a"] == [[0, 2], [3, 6]]
+    np.testing.assert_array_equal(
+        dataset.get("a"), np.concatenate([samples(2, 1.0), samples(3, 3.0)])
+    )
+    capture(dataset, "a", samples(1, 4.0))
+    np.testing.assert_array_equal(dataset.get("a"), samples(1, 4.0))
+
+
+def test_compact_keeps_only_current_rows(tmp_path):
+    dataset = GestureDataset(tmp_path, dim=4)
+    capture(dataset, "a", samples(2, 1.0))
+    capture(dataset, "b", samples(3, 2.0))
+    capture(dataset, "a", samples(1, 3.0))
+    capture(dataset, "c", samples(2, 4.0))
+    dataset.remove("c")
+    before = {l: np.array(dataset.get(l)) for l in dataset.labels()}
+    fingerprint = dataset.fingerprint()
+
+    dataset.compact()
+    assert dataset.rows == 4
+    assert dataset.labels() == ["a", "b"]
+    for label, X in before.items():
+        np.testing.assert_array_equal(dataset.get(label), X)
+    assert dataset.fingerprint() != fingerprint
+    labels = dataset.column("labels")[:, 0]
+    ids = dataset.index["label_ids"]
+    assert sorted(labels.tolist()) == sorted([ids["a"]] + [ids["b"]] * 3)
+
+    reopened = GestureDataset(tmp_path, dim=4)
+    for label, X in before.items():
+        np.testing.assert_array_equal(reopened.get(label), X)
+
+
+def test_single_writer(tmp_path):
+    dataset = GestureDataset(tmp_path, dim=4)
+    with dataset.writer("a"):
+        with pytest.raises(RuntimeError):
+            dataset.writer("b")
+        with pytest.raises(RuntimeError):
+            dataset.compact()
+
+
+def test_incompatible_dimension_is_rejected(tmp_path):
+    capture(GestureDataset(tmp_path, dim=4), "a", samples(1, 1.0))
+    with pytest.raises(ValueError):
+        GestureDataset(tmp_path, dim=8)
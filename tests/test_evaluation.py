@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from app.classifier import PrototypeIndex
+from app.evaluation import Evaluation
+
+
+def index():
+    # Dos gestos lejanos en 2D, con umbral 1 cada uno.
+    return PrototypeIndex.build(
+        {"a": np.array([0.0, 0.0]), "b": np.array([10.0, 0.0])},
+        {"a": 1.0, "b": 1.0},
+    )
+
+
+def ring(radii, center=(0.0, 0.0), seed=0):
+    """Puntos a las distancias `radii` de `center`, en direcciones al azar."""
+    angle = np.random.default_rng(seed).uniform(0, 2 * np.pi, len(radii))
+    direction = np.stack([np.cos(angle), np.sin(angle)], axis=1)
+    return direction * np.asarray(radii)[:, None] + np.asarray(center)
+
+
+def accepted_rate(index, X):
+    evaluation = Evaluation(index)
+    evaluation.add(X, np.full(len(X), -1))
+    n = len(index.labels)
+    return evaluation.confusion[n, :n].sum() / len(X)
+
+
+@pytest.mark.parametrize("target", [0.01, 0.05, 0.2])
+def test_calibrated_thresholds_meet_the_far_target_on_negatives(target):
+    evaluation = Evaluation(index())
+    genuine = ring(np.random.default_rng(1).uniform(0, 0.5, 500))
+    evaluation.add(genuine, np.zeros(500))
+    # Poses intermedias: muchas cerca del umbral actual (FAR actual alto).
+    negatives = ring(np.random.default_rng(2).uniform(0.5, 3.0, 2000), seed=3)
+    evaluation.add(negatives, np.full(len(negatives), -1))
+    assert accepted_rate(evaluation.index, negatives) > target
+
+    calibrated = evaluation.calibrated_index(target)
+    assert accepted_rate(calibrated, negatives) <= target
+    scale = evaluation.threshold_scales(target)[0]
+    assert 0 < scale < 1
+    np.testing.assert_allclose(calibrated.thresholds[0], scale, rtol=1e-6)
+    assert evaluation.summary(target)["per_label"]["a"]["calibrated_far"] <= target
+
+
+def test_without_negatives_thresholds_never_loosen():
+    evaluation = Evaluation(index())
+    genuine_a = ring(np.random.default_rng(1).uniform(0, 0.9, 300))
+    genuine_b = ring(np.random.default_rng(2).uniform(0, 0.9, 300), (10.0, 0.0))
+    evaluation.add(genuine_a, np.zeros(300))
+    evaluation.add(genuine_b, np.ones(300))
+    # Los gestos están a 10 umbrales uno del otro: sin muestras sin gesto,
+    # la curva ROC permitiría agrandar el umbral hasta RATIO_MAX.
+    assert evaluation.negatives == 0
+    scales = evaluation.threshold_scales(0.01)
+    np.testing.assert_array_equal(scales, [1.0, 1.0])
+    calibrated = evaluation.calibrated_index(0.01)
+    assert np.all(calibrated.thresholds <= evaluation.index.thresholds)
+
+
+def test_without_negatives_thresholds_can_still_tighten():
+    evaluation = Evaluation(index())
+    evaluation.add(ring([0.2] * 100), np.zeros(100))
+    # Muestras de "b" que caen dentro del umbral de "a".
+    evaluation.add(ring([0.8] * 100, seed=4), np.ones(100))
+    scale = evaluation.threshold_scales(0.01)[0]
+    assert 0.2 <= scale <= 0.8
+
+
+def test_gestures_that_cannot_meet_the_target_are_rejected():
+    evaluation = Evaluation(index())
+    evaluation.add(ring([0.3] * 100), np.zeros(100))
+    # Negativos encima del prototipo: ningún umbral da FAR <= 0.01.
+    evaluation.add(np.zeros((100, 2)), np.full(100, -1))
+    assert evaluation.threshold_scales(0.01)[0] == 0
+    with pytest.raises(ValueError, match="a"):
+        evaluation.calibrated_index(0.01)
+
+
+def test_blocks_do_not_change_the_result(monkeypatch):
+    X = ring(np.random.default_rng(5).uniform(0, 3, 1000))
+    y = np.where(np.arange(1000) % 3 == 0, -1, 0)
+    whole = Evaluation(index())
+    whole.add(X, y)
+    monkeypatch.setattr("app.evaluation.BLOCK_BYTES", 16 * 2 * 7)
+    blocked = Evaluation(index())
+    assert blocked.block_size == 7
+    blocked.add(X, y)
+    np.testing.assert_array_equal(whole.confusion, blocked.confusion)
+    np.testing.assert_array_equal(whole.genuine, blocked.genuine)
+    np.testing.assert_array_equal(whole.impostor, blocked.impostor)
+    assert whole.negatives == blocked.negatives == 334
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+from app import event_server
+from app.event_server import SUBSCRIBER_QUEUE, GestureEventServer, Subscriber
+from app.key_dispatcher import KeyEvent
+
+
+async def connect(server):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    hello = json.loads(await reader.readline())
+    return reader, writer, hello
+
+
+async def read_messages(reader, count):
+    return [
+        json.loads(await asyncio.wait_for(reader.readline(), 5)) for _ in range(count)
+    ]
+
+
+async def wait_until(condition, timeout=5):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_clients_get_hello_and_gestures():
+    async def main():
+        server = GestureEventServer(port=0)
+        await server.start()
+        server.publish(KeyEvent("a", True, 1.0, 0.4))
+        reader, writer, hello = await connect(server)
+        assert hello == {"type": "hello", "version": 1, "seq": 1, "pressed": ["a"]}
+        server.publish(KeyEvent("a", False, 2.0, float("inf")))
+        (message,) = await read_messages(reader, 1)
+        assert message["type"] == "gesture"
+        assert (message["seq"], message["key"], message["pressed"]) == (2, "a", False)
+        assert message["frame_time"] == 2.0
+        assert message["ratio"] is None
+        writer.close()
+        await server.close()
+
+    asyncio.run(main())
+
+
+def test_overflow_is_replaced_by_a_sync_message():
+    async def main():
+        server = GestureEventServer(port=0)
+        await server.start()
+        reader, writer, _ = await connect(server)
+        await wait_until(lambda: server.subscribers)
+        # Sin ceder el bucle: la cola del suscriptor se llena.
+        total = SUBSCRIBER_QUEUE + 44
+        for i in range(1, total + 1):
+            server.publish(KeyEvent(f"k{i % 3}", i % 2 == 1, float(i)))
+        sync, *gestures = await read_messages(reader, total - SUBSCRIBER_QUEUE)
+        assert sync["type"] == "sync"
+        assert sync["dropped"] == SUBSCRIBER_QUEUE
+        assert sync["seq"] == SUBSCRIBER_QUEUE + 1
+        assert [m["seq"] for m in gestures] == list(
+            range(SUBSCRIBER_QUEUE + 2, total + 1)
+        )
+        # El estado del sync más los eventos siguientes es el del servidor.
+        pressed = set(sync["pressed"])
+        for m in gestures:
+            (pressed.add if m["pressed"] else pressed.discard)(m["key"])
+        assert pressed == server.pressed
+        writer.close()
+        await server.close()
+
+    asyncio.run(main())
+
+
+def test_disconnected_clients_are_removed():
+    async def main():
+        server = GestureEventServer(port=0)
+        await server.start()
+        clients = [await connect(server) for _ in range(3)]
+        await wait_until(lambda: len(server.subscribers) == 3)
+        clients[0][1].close()
+        await wait_until(lambda: len(server.subscribers) == 2)
+        server.publish(KeyEvent("a", True, 1.0))
+        for reader, _, _ in clients[1:]:
+            (message,) = await read_messages(reader, 1)
+            assert message["key"] == "a"
+        await server.close()
+        assert not server.subscribers
+        for reader, _, _ in clients[1:]:
+            assert await asyncio.wait_for(reader.read(), 5) == b""
+
+    asyncio.run(main())
+
+
+def test_close_does_not_wait_forever_for_stuck_clients(monkeypatch):
+    monkeypatch.setattr(event_server, "CLOSE_TIMEOUT", 0.05)
+
+    async def main():
+        server = GestureEventServer(port=0)
+        await server.start()
+        # Un suscriptor que nunca vacía su cola.
+        stuck = Subscriber()
+        stuck.queue.put_nowait(b"{}\n")
+        stuck.task = asyncio.ensure_future(asyncio.sleep(60))
+        server.subscribers.add(stuck)
+        await asyncio.wait_for(server.close(), 5)
+        await asyncio.sleep(0)
+        assert stuck.task.cancelled()
+        others = asyncio.all_tasks() - {asyncio.current_task()}
+        assert all(task.done() for task in others)
+
+    asyncio.run(main())
+
+
+def test_unix_socket_is_removed_on_close(tmp_path):
+    async def main():
+        server = GestureEventServer(str(tmp_path / "events.sock"))
+        await server.start()
+        reader, writer = await asyncio.open_unix_connection(server.path)
+        assert json.loads(await reader.readline())["type"] == "hello"
+        await server.close()
+        assert not (tmp_path / "events.sock").exists()
+
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+import time
+
+from app.key_dispatcher import GestureDebouncer, KeyDispatcher, KeyEvent, MemoryBackend
+
+
+def run(debouncer, frames):
+    """Cambios de cada fotograma para una secuencia de ratios de la tecla "a"."""
+    return [debouncer.update({"a": r} if r is not None else {}) for r in frames]
+
+
+def test_press_below_enter_and_release_above_exit():
+    debouncer = GestureDebouncer(
+        ["a"], {"enter": 1.0, "exit": 1.2, "min_hold_frames": 1}
+    )
+    changes = run(debouncer, [1.5, 0.9, 1.1, 1.19, 1.2, 0.95])
+    assert changes == [[], [("a", True)], [], [], [("a", False)], [("a", True)]]
+
+
+def test_noise_around_the_threshold_does_not_chatter():
+    debouncer = GestureDebouncer(["a"])
+    frames = [0.98, 1.02, 0.99, 1.05, 0.97, 1.1, 1.0] * 10
+    events = [c for changes in run(debouncer, frames) for c in changes]
+    assert events == [("a", True)]
+
+
+def test_min_hold_frames_delays_release():
+    debouncer = GestureDebouncer(
+        ["a"], {"enter": 1.0, "exit": 1.15, "min_hold_frames": 3}
+    )
+    changes = run(debouncer, [0.5, None, None, None, None])
+    assert changes == [[("a", True)], [], [], [("a", False)], []]
+
+
+def test_set_keys_returns_pressed_keys_that_disappear():
+    debouncer = GestureDebouncer(["a", "b"])
+    debouncer.update({"a": 0.5, "b": 0.5})
+    assert debouncer.set_keys(["b", "c"]) == ["a"]
+    assert debouncer.pressed() == ["b"]
+
+
+def test_dispatcher_sends_in_order_and_releases_on_close():
+    backend = MemoryBackend()
+    dispatcher = KeyDispatcher(backend)
+    t0 = time.perf_counter()
+    dispatcher.submit("a", True, t0)
+    dispatcher.submit("b", True, t0)
+    dispatcher.submit("a", False, t0)
+    dispatcher.close()
+    assert [(k, p) for k, p, _ in backend.events] == [
+        ("a", True),
+        ("b", True),
+        ("a", False),
+        ("b", False),
+    ]
+    assert backend.presses == 2
+    assert dispatcher.sent == 3
+    assert len(dispatcher.latencies) == 3
+    assert all(latency >= 0 for latency in dispatcher.latencies)
+
+
+def test_dispatcher_passes_whole_events_to_send_backends():
+    class EventsBackend:
+        def __init__(self):
+            self.events = []
+
+        def send(self, event):
+            self.events.append(event)
+
+    backend = EventsBackend()
+    dispatcher = KeyDispatcher(backend)
+    dispatcher.submit("a", True, 1.0, 0.4)
+    dispatcher.close()
+    assert backend.events[0] == KeyEvent("a", True, 1.0, 0.4)
+    assert [(e.key, e.pressed) for e in backend.events] == [("a", True), ("a", False)]
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from app import core_logic
+from app.classifier import PrototypeIndex
+from app.dataset import GestureDataset
+from app.model_store import MAGIC, ModelFormatError, load_model, save_model
+from app.utils import NORMALIZATION
+
+DIM = NORMALIZATION["dim"]
+
+
+@pytest.fixture
+def index():
+    rng = np.random.default_rng(0)
+    return PrototypeIndex.build(
+        {"a": rng.random((2, DIM)), "b": rng.random((1, DIM))},
+        {"a": np.array([0.5, 0.6]), "b": np.array([0.7])},
+    )
+
+
+@pytest.fixture
+def model_path(tmp_path, index):
+    path = tmp_path / "model.gpm"
+    save_model(path, index, NORMALIZATION, "huella")
+    return path
+
+
+def test_round_trip(model_path, index):
+    model = load_model(model_path, NORMALIZATION, "huella")
+    assert model.labels == index.labels
+    np.testing.assert_array_equal(model.matrix, index.matrix)
+    np.testing.assert_array_equal(model.row_labels, index.row_labels)
+    np.testing.assert_array_equal(model.thresholds, index.thresholds)
+    np.testing.assert_array_equal(model.sq_norms, index.sq_norms)
+
+
+def test_fingerprint_mismatch_is_rejected(model_path):
+    with pytest.raises(ModelFormatError):
+        load_model(model_path, NORMALIZATION, "otra")
+
+
+def test_normalization_mismatch_is_rejected(model_path):
+    with pytest.raises(ModelFormatError):
+        load_model(model_path, {**NORMALIZATION, "scale_ref": 5})
+
+
+def test_not_a_model_is_rejected(tmp_path):
+    path = tmp_path / "model.gpm"
+    path.write_bytes(b"PK\x03\x04" + b"\0" * 100)
+    with pytest.raises(ModelFormatError):
+        load_model(path)
+
+
+@pytest.mark.parametrize(
+    "size", [len(MAGIC), len(MAGIC) + 2, len(MAGIC) + 4, len(MAGIC) + 20, -1]
+)
+def test_truncated_file_is_rejected(model_path, size):
+    data = model_path.read_bytes()
+    model_path.write_bytes(data[:size])
+    with pytest.raises(ModelFormatError):
+        load_model(model_path, NORMALIZATION)
+
+
+def test_is_model_trained(tmp_path, model_path, index, monkeypatch):
+    dataset = GestureDataset(tmp_path / "gestures", dim=DIM)
+    monkeypatch.setattr(core_logic, "_dataset", dataset)
+    monkeypatch.setattr(core_logic, "MODEL_PATH", str(model_path))
+    # Sin datos capturados no se comprueba la huella.
+    assert core_logic.is_model_trained()
+
+    with dataset.writer("a") as writer:
+        writer.add_batch(np.zeros((3, DIM)))
+        writer.commit()
+    assert not core_logic.is_model_trained()
+    save_model(model_path, index, NORMALIZATION, dataset.fingerprint(index.labels))
+    assert core_logic.is_model_trained()
+
+    model_path.write_bytes(model_path.read_bytes()[: len(MAGIC)])
+    assert not core_logic.is_model_trained()
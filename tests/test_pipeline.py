@@ -0,0 +1,72 @@
+import threading
+
+from app.core_logic import OpenCVController
+from app.pipeline import LatestSlot
+
+
+def test_put_replaces_pending_item_and_reports_drop():
+    dropped = []
+    slot = LatestSlot(on_drop=dropped.append)
+    assert slot.put(1)
+    assert slot.put(2)
+    assert slot.get(timeout=0) == 2
+    assert slot.dropped == 1
+    assert dropped == [1]
+    assert slot.get(timeout=0) is None
+
+
+def test_close_wakes_a_waiting_consumer():
+    slot = LatestSlot()
+    result = []
+    consumer = threading.Thread(target=lambda: result.append(slot.get(timeout=5)))
+    consumer.start()
+    slot.close()
+    consumer.join(timeout=1)
+    assert not consumer.is_alive()
+    assert result == [None]
+
+
+def test_close_keeps_pending_item_until_consumed():
+    slot = LatestSlot()
+    slot.put("fotograma")
+    slot.close()
+    assert not slot.put("otro")
+    assert not slot.exhausted
+    assert slot.get(timeout=0) == "fotograma"
+    assert slot.exhausted
+
+
+def test_close_wakes_a_blocked_producer():
+    slot = LatestSlot()
+    slot.put(1)
+    result = []
+    producer = threading.Thread(target=lambda: result.append(slot.put(2, block=True)))
+    producer.start()
+    slot.close()
+    producer.join(timeout=1)
+    assert not producer.is_alive()
+    assert result == [False]
+
+
+def test_blocking_put_waits_for_the_consumer():
+    slot = LatestSlot()
+    slot.put(1, block=True)
+    producer = threading.Thread(target=slot.put, args=(2,), kwargs={"block": True})
+    producer.start()
+    producer.join(timeout=0.1)
+    assert producer.is_alive()
+    assert slot.get(timeout=1) == 1
+    producer.join(timeout=1)
+    assert slot.get(timeout=1) == 2
+    assert slot.dropped == 0
+
+
+def test_failing_stage_closes_its_output_and_keeps_the_error():
+    def stage(output, halt):
+        raise RuntimeError("cámara desconectada")
+
+    output, halt, errors = LatestSlot(), threading.Event(), []
+    OpenCVController._run_stage(stage, output, halt, errors)
+    assert output.exhausted
+    assert halt.is_set()
+    assert [str(e) for e in errors] == ["cámara desconectada"]
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from app.classifier import PrototypeIndex
+from app.landmark_log import (
+    MAGIC,
+    UNKNOWN_HANDEDNESS,
+    LandmarkLogFormatError,
+    LandmarkRecorder,
+    read_landmark_log,
+)
+from app.replay import replay
+from app.utils import normalize_landmarks_batch
+
+
+def pose(seed, center=(0.5, 0.5)):
+    """Mano de 21 landmarks alrededor de `center`."""
+    rng = np.random.default_rng(seed)
+    coords = rng.uniform(-0.1, 0.1, (21, 3)).astype(np.float32)
+    coords[:, :2] += center
+    return coords
+
+
+A, B = pose(1), pose(2)
+NO_HANDS = np.empty((0, 21, 3), dtype=np.float32)
+
+
+def model():
+    features, _, _ = normalize_landmarks_batch(np.stack([A, B]))
+    return PrototypeIndex.build(
+        {"a": features[0], "b": features[1]}, {"a": 1.0, "b": 1.0}
+    )
+
+
+def record(path, frames):
+    with LandmarkRecorder(path, 640, 480, source="prueba") as recorder:
+        for i, coords in enumerate(frames):
+            handedness = np.arange(len(coords), dtype=np.uint8) % 2
+            scores = np.linspace(0.5, 1.0, len(coords), dtype=np.float32)
+            recorder.write(100.0 + i / 30, coords, handedness, scores)
+
+
+def test_round_trip(tmp_path):
+    frames = [A[None], NO_HANDS, np.stack([A, B, np.zeros((21, 3))]), B[None]]
+    path = tmp_path / "partida.glog"
+    record(path, frames)
+    log = read_landmark_log(path)
+    assert (log.header["width"], log.header["height"]) == (640, 480)
+    assert log.header["source"] == "prueba"
+    assert len(log) == 4
+    np.testing.assert_allclose(log.timestamps, np.arange(4) / 30, atol=1e-9)
+    assert log.counts.tolist() == [1, 0, 3, 1]
+    assert log.frame_of_hand.tolist() == [0, 2, 2, 2, 3]
+    np.testing.assert_array_equal(
+        log.hands["landmarks"], np.concatenate(frames).astype(np.float32)
+    )
+    assert log.hands["handedness"].tolist() == [0, 0, 1, 0, 0]
+    np.testing.assert_allclose(log.hands["score"][1:4], [0.5, 0.75, 1.0])
+    assert log.duration == pytest.approx(0.1)
+
+
+def test_truncated_last_frame_is_ignored(tmp_path):
+    path = tmp_path / "partida.glog"
+    record(path, [A[None], np.stack([A, B])])
+    data = path.read_bytes()
+    path.write_bytes(data[:-10])
+    log = read_landmark_log(path)
+    assert len(log) == 1
+    np.testing.assert_array_equal(log.hands["landmarks"][0], A)
+
+
+def test_hands_without_info_are_unknown(tmp_path):
+    path = tmp_path / "partida.glog"
+    with LandmarkRecorder(path, 640, 480) as recorder:
+        recorder.write(0.0, A[None])
+    hands = read_landmark_log(path).hands
+    assert hands["handedness"].tolist() == [UNKNOWN_HANDEDNESS]
+    assert hands["score"].tolist() == [0.0]
+
+
+@pytest.mark.parametrize("data", [b"", MAGIC, b"PK\x03\x04" + b"\0" * 40])
+def test_not_a_log_is_rejected(tmp_path, data):
+    path = tmp_path / "partida.glog"
+    path.write_bytes(data)
+    with pytest.raises(LandmarkLogFormatError):
+        read_landmark_log(path)
+
+
+@pytest.mark.parametrize("tracking", [False, True])
+def test_replay_presses_the_recorded_gestures(tmp_path, tracking):
+    frames = [A[None]] * 10 + [NO_HANDS] * 10 + [B[None]] * 10 + [NO_HANDS] * 10
+    path = tmp_path / "partida.glog"
+    record(path, frames)
+    config = {
+        "num_players": 1,
+        "players": {"1": ["a", "b"]},
+        "tracking": {"enabled": tracking},
+    }
+    stats = replay(read_landmark_log(path), config, model())
+    events = [(round(t * 30), key, pressed) for t, key, pressed in stats["events"]]
+    keys = [(key, pressed) for _, key, pressed in events]
+    assert keys == [("a", True), ("a", False), ("b", True), ("b", False)]
+    assert (events[0][0], events[2][0]) == (0, 20)
+    assert stats["frames"] == 40
+    assert stats["hands"] == 20
+    assert stats["key_presses"] == 2
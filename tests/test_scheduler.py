@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from app.scheduler import InferenceScheduler
+
+
+class Hands:
+    """Sustituto de MediaPipe Hands que cuenta las llamadas a process()."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def process(self, rgb):
+        self.calls += 1
+        return self.calls
+
+
+def scene(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+
+
+def run(scheduler, frames):
+    hands = Hands()
+    return [scheduler.process(hands, frame)[1] for frame in frames], hands
+
+
+def test_static_scene_reuses_the_last_result():
+    scheduler = InferenceScheduler(governor=False)
+    hands = Hands()
+    img = scene()
+    assert scheduler.process(hands, img) == (1, True)
+    assert scheduler.process(hands, img.copy()) == (1, False)
+    assert (scheduler.inferred, scheduler.skipped, hands.calls) == (1, 1, 1)
+
+
+def test_reuse_is_limited_by_max_reuse():
+    scheduler = InferenceScheduler({"max_reuse": 3}, governor=False)
+    inferred, _ = run(scheduler, [scene()] * 9)
+    assert inferred == [True, False, False, False, True, False, False, False, True]
+
+
+def test_sensor_noise_is_not_motion():
+    scheduler = InferenceScheduler(governor=False)
+    img = scene()
+    rng = np.random.default_rng(1)
+    noisy = []
+    for _ in range(5):
+        noise = rng.integers(-6, 7, img.shape)
+        noisy.append(np.clip(img + noise, 0, 255).astype(np.uint8))
+    inferred, _ = run(scheduler, [img] + noisy)
+    assert inferred == [True] + [False] * 5
+
+
+@pytest.mark.parametrize("size", [60, 200])
+def test_local_change_is_motion(size):
+    # Una mano que cambia de pose: una zona pequeña cambia mucho y la
+    # diferencia media de toda la imagen apenas se mueve.
+    scheduler = InferenceScheduler(governor=False)
+    img = np.full((480, 640, 3), 90, dtype=np.uint8)
+    frames = [img]
+    for i in range(4):
+        frame = img.copy()
+        frame[200 : 200 + size, 300 : 300 + size] = 200 if i % 2 == 0 else 20
+        frames.append(frame)
+    inferred, _ = run(scheduler, frames)
+    assert inferred == [True] * 5
+
+
+def test_governor_spaces_inferences():
+    scheduler = InferenceScheduler({"target_fps": 10})
+    hands = Hands()
+    a, b = scene(0), scene(1)
+    assert scheduler.process(hands, a)[1]
+    start = scheduler._last_start
+    # Con movimiento, pero antes del intervalo mínimo (0.1 s).
+    assert not scheduler.should_infer(b, start + 0.02)
+    assert scheduler.should_infer(b, start + 0.1)
+
+
+def test_to_rgb_limits_the_width():
+    img = scene()
+    assert InferenceScheduler().to_rgb(img).shape == img.shape
+    rgb = InferenceScheduler({"width": 320}).to_rgb(img)
+    assert rgb.shape == (240, 320, 3)
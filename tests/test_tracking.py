@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from app.tracking import HandTracker, Track
+
+
+def track(window=5):
+    return Track(1, np.zeros(2), np.zeros(3), 1, window)
+
+
+def test_label_change_releases_the_voted_label_at_once():
+    t = track()
+    for _ in range(5):
+        t.record("a", 0.5)
+    assert (t.label, t.ratio, t.accepted) == ("a", 0.5, True)
+    t.record("b", 1.6)
+    assert t.label == "a"
+    assert not t.accepted
+
+
+def test_rejected_frame_of_the_voted_label_releases():
+    t = track()
+    for _ in range(5):
+        t.record("a", 0.5)
+    t.record("a", 1.6)
+    assert (t.label, t.ratio) == ("a", 1.6)
+    assert not t.accepted
+
+
+def test_new_label_needs_the_vote_to_win():
+    t = track()
+    for _ in range(3):
+        t.record("a", 0.5)
+    t.record("b", 0.5)
+    t.record("b", 0.5)
+    assert t.label == "a"
+    assert not t.accepted
+    t.record("b", 0.5)
+    assert (t.label, t.ratio) == ("b", 0.5)
+
+
+def test_without_accepted_votes_the_last_label_is_kept():
+    t = track()
+    t.record("a", 1.5)
+    t.record("b", 1.3)
+    assert (t.label, t.ratio) == ("b", 1.3)
+    t.record(None, 0.0)
+    assert t.label is None
+    assert t.ratio == float("inf")
+
+
+def features(value):
+    return np.full((1, 3), value, dtype=np.float32)
+
+
+def test_tracks_are_created_matched_and_expire():
+    tracker = HandTracker({"grace_frames": 2, "max_distance": 0.1})
+    (first,) = tracker.update([[0.2, 0.2]], features(0), [1])
+    (same,) = tracker.update([[0.25, 0.2]], features(0), [1])
+    assert same is first
+    # Demasiado lejos: otra pista, y la primera empieza a contar su ausencia.
+    (other,) = tracker.update([[0.8, 0.8]], features(0), [2])
+    assert other is not first
+    assert first.missed == 1
+    assert other.id == first.id + 1
+    tracker.update([[0.8, 0.8]], features(0), [2])
+    assert first in tracker.tracks
+    tracker.update([[0.8, 0.8]], features(0), [2])
+    assert tracker.tracks == [other]
+
+
+def test_closest_pairs_are_matched_first():
+    tracker = HandTracker()
+    a, b = tracker.update([[0.2, 0.2], [0.4, 0.2]], np.zeros((2, 3)), [1, 1])
+    matched = tracker.update([[0.42, 0.2], [0.22, 0.2]], np.zeros((2, 3)), [1, 1])
+    assert matched == [b, a]
+
+
+@pytest.mark.parametrize("alpha, expected", [(1.0, 1.0), (0.5, 0.5), (0.25, 0.25)])
+def test_feature_smoothing(alpha, expected):
+    tracker = HandTracker({"feature_alpha": alpha})
+    (t,) = tracker.update([[0.5, 0.5]], features(0), [1])
+    tracker.update([[0.5, 0.5]], features(1), [1])
+    np.testing.assert_allclose(t.features, expected)
+
+
+def test_player_changes_only_after_zone_frames():
+    tracker = HandTracker({"zone_frames": 3})
+    (t,) = tracker.update([[0.5, 0.5]], features(0), [1])
+    for _ in range(2):
+        tracker.update([[0.5, 0.5]], features(0), [2])
+    assert t.player == 1
+    tracker.update([[0.5, 0.5]], features(0), [2])
+    assert t.player == 2
+
+
+def test_unchanged_features_reuse_the_last_classification():
+    class Classifier:
+        calls = 0
+
+        def classify(self, X, players):
+            self.calls += 1
+            match = type("Match", (), {})()
+            match.labels = ["a"] * len(X)
+            match.ratios = [0.5] * len(X)
+            return match
+
+    classifier = Classifier()
+    tracker = HandTracker({"feature_epsilon": 0.05})
+    tracks = tracker.update([[0.5, 0.5]], features(0), [1])
+    assert tracker.classify(tracks, classifier) == 1
+    tracks = tracker.update([[0.5, 0.5]], features(0.01), [1])
+    assert tracker.classify(tracks, classifier) == 0
+    tracks = tracker.update([[0.5, 0.5]], features(0.5), [1])
+    assert tracker.classify(tracks, classifier) == 1
+    assert (classifier.calls, tracker.classified, tracker.reused) == (2, 2, 1)
+    assert tracker.ratios() == {"a": 0.5}
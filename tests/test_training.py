@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from app.dataset import GestureDataset
+from app.training import IncrementalTrainer, fit_label, kmeans
+
+DIM = 4
+
+
+def blob(center, n, seed, spread=0.05):
+    rng = np.random.default_rng(seed)
+    return (np.asarray(center) + rng.normal(0, spread, (n, DIM))).astype(np.float32)
+
+
+def capture(dataset, label, X, replace=True):
+    with dataset.writer(label) as writer:
+        writer.add_batch(X)
+        writer.commit(replace=replace)
+
+
+def means(clusters):
+    return sorted(tuple(np.round(c.mean, 5)) for c in clusters)
+
+
+def test_two_cluster_label_gets_two_prototypes():
+    X = np.concatenate([blob([0, 0, 0, 0], 300, 1), blob([1, 1, 0, 0], 200, 2)])
+    clusters = fit_label(X, [(0, len(X))], k=2)
+    assert sorted(c.count for c in clusters) == [200, 300]
+    np.testing.assert_allclose(means(clusters), [[0, 0, 0, 0], [1, 1, 0, 0]], atol=0.02)
+    # Cada umbral cubre su grupo, no la distancia entre los dos.
+    assert all(c.threshold < 0.5 for c in clusters)
+    (single,) = fit_label(X, [(0, len(X))], k=1)
+    assert single.threshold > 0.5
+
+
+def test_fit_label_reads_only_the_given_ranges():
+    X = np.concatenate([blob([0] * 4, 50, 1), blob([5] * 4, 50, 2)])
+    X = np.concatenate([X, blob([1, 1, 0, 0], 50, 3)])
+    clusters = fit_label(X, [(0, 50), (100, 150)], k=2)
+    assert sum(c.count for c in clusters) == 100
+    np.testing.assert_allclose(means(clusters), [[0, 0, 0, 0], [1, 1, 0, 0]], atol=0.05)
+
+
+def test_k_is_capped_by_the_sample_count():
+    X = blob([0] * 4, 3, 1, spread=1.0)
+    assert len(kmeans(X, 8)) == 3
+    clusters = fit_label(X, [(0, 3)], k=8)
+    assert len(clusters) <= 3
+    assert sum(c.count for c in clusters) == 3
+    # Muestras repetidas: un solo centro distinto.
+    assert len(kmeans(np.zeros((10, DIM)), 4)) == 1
+
+
+def test_budget_caps_prototypes_per_label(tmp_path):
+    dataset = GestureDataset(tmp_path / "gestures", dim=DIM)
+    trainer = IncrementalTrainer(dataset, tmp_path / "state.npz", k=8, budget=12)
+    assert trainer.clusters_per_label(2) == 6
+    assert trainer.clusters_per_label(20) == 1
+
+
+@pytest.mark.parametrize("k", [1, 2])
+def test_appending_samples_matches_a_full_retrain(tmp_path, k):
+    dataset = GestureDataset(tmp_path / "gestures", dim=DIM)
+    capture(
+        dataset, "a", np.concatenate([blob([0] * 4, 200, 1), blob([1] * 4, 200, 2)])
+    )
+    capture(dataset, "b", blob([3] * 4, 100, 3))
+    trainer = IncrementalTrainer(dataset, tmp_path / "state.npz", k=k)
+    assert sorted(trainer.refresh()) == ["a", "b"]
+    trainer.save()
+
+    more = np.concatenate([blob([0.02] * 4, 50, 4), blob([1.02] * 4, 50, 5)])
+    capture(dataset, "a", more, replace=False)
+    incremental = IncrementalTrainer(dataset, tmp_path / "state.npz", k=k)
+    assert incremental.refresh() == ["a"]
+    full = IncrementalTrainer(dataset, tmp_path / "other.npz", k=k)
+    full.refresh()
+
+    for label in ("a", "b"):
+        got = sorted(incremental.clusters[label], key=lambda c: c.mean.sum())
+        want = sorted(full.clusters[label], key=lambda c: c.mean.sum())
+        assert [c.count for c in got] == [c.count for c in want]
+        for g, w in zip(got, want):
+            np.testing.assert_allclose(g.mean, w.mean, atol=1e-6)
+            np.testing.assert_allclose(g.sq_total, w.sq_total, rtol=1e-6)
+            # La distancia máxima se acota sin releer: igual o algo mayor.
+            assert w.max_dist - 1e-6 <= g.max_dist <= w.max_dist + 0.05
+
+
+def test_recapture_refits_the_label(tmp_path):
+    dataset = GestureDataset(tmp_path / "gestures", dim=DIM)
+    capture(dataset, "a", blob([0] * 4, 100, 1))
+    trainer = IncrementalTrainer(dataset, tmp_path / "state.npz")
+    trainer.refresh()
+    capture(dataset, "a", blob([2] * 4, 80, 2))
+    assert trainer.refresh() == ["a"]
+    (cluster,) = trainer.clusters["a"]
+    assert cluster.count == 80
+    np.testing.assert_allclose(cluster.mean, [2] * 4, atol=0.02)
+    assert trainer.refresh() == []
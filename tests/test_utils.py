@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.utils import (
+    ZoneMap,
+    get_player_zone,
+    landmarks_to_array,
+    normalize_landmarks,
+    normalize_landmarks_batch,
+)
+
+
+@pytest.mark.parametrize("num_players", [1, 2, 3, 4, 5, 7])
+def test_zone_map_matches_get_player_zone(num_players):
+    width, height = 640, 480
+    zone_map = ZoneMap(width, height, num_players)
+    rng = np.random.default_rng(num_players)
+    centroids = rng.random((500, 2))
+    players = zone_map.lookup(centroids)
+    for (cx, cy), player in zip(centroids * (width, height), players):
+        if player:
+            x1, y1, x2, y2 = get_player_zone(player, width, height, num_players)
+            assert x1 - zone_map.cell <= cx <= x2 + zone_map.cell
+            assert y1 - zone_map.cell <= cy <= y2 + zone_map.cell
+    # Las zonas fijas cubren toda la imagen.
+    if num_players <= 4:
+        assert players.all()
+
+
+def test_custom_zones_leave_gaps_and_missing_players():
+    layout = {"zones": {"1": [0.0, 0.0, 0.25, 1.0], "3": [0.75, 0.0, 1.0, 1.0]}}
+    zone_map = ZoneMap(400, 200, 3, layout)
+    assert set(zone_map.zones) == {1, 3}
+    players = zone_map.lookup([[0.1, 0.5], [0.5, 0.5], [0.9, 0.5]])
+    assert players.tolist() == [1, 0, 3]
+
+
+def test_overlapping_zones_go_to_the_lowest_player():
+    layout = {"zones": {"1": [0.0, 0.0, 0.6, 1.0], "2": [0.4, 0.0, 1.0, 1.0]}}
+    players = ZoneMap(400, 200, 2, layout).lookup([[0.5, 0.5], [0.8, 0.5]])
+    assert players.tolist() == [1, 2]
+
+
+def test_lookup_clips_centroids_outside_the_image():
+    zone_map = ZoneMap(640, 480, 2)
+    assert zone_map.lookup([[-0.2, 0.5], [1.3, 0.5]]).tolist() == [1, 2]
+
+
+def hand(seed):
+    rng = np.random.default_rng(seed)
+    return rng.random((21, 3)).astype(np.float32)
+
+
+def test_batch_normalization_is_invariant_to_scale_and_position():
+    coords = hand(0)
+    moved = coords * 0.5 + np.array([0.2, -0.1, 0.05], dtype=np.float32)
+    features, centroids, valid = normalize_landmarks_batch(np.stack([coords, moved]))
+    assert features.shape == (2, 63)
+    assert valid.all()
+    np.testing.assert_allclose(features[0], features[1], atol=1e-5)
+    np.testing.assert_allclose(centroids[0], coords[:, :2].mean(axis=0), atol=1e-6)
+    # Muñeca en el origen y distancia de referencia 1.
+    assert np.allclose(features[0][:3], 0)
+    np.testing.assert_allclose(np.linalg.norm(features[0][27:30]), 1, atol=1e-6)
+
+
+def test_degenerate_hands_are_marked_invalid():
+    coords = np.stack([hand(1), np.zeros((21, 3), dtype=np.float32)])
+    features, _, valid = normalize_landmarks_batch(coords)
+    assert valid.tolist() == [True, False]
+    assert np.isfinite(features).all()
+    assert normalize_landmarks_batch(np.empty((0, 21, 3)))[0].shape == (0, 63)
+
+
+def test_batch_matches_single_hand_normalization():
+    hands = [hand(2), hand(3)]
+    protobufs = [
+        SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in h])
+        for h in hands
+    ]
+    np.testing.assert_array_equal(landmarks_to_array(protobufs), np.stack(hands))
+    features, _, _ = normalize_landmarks_batch(np.stack(hands))
+    for protobuf, expected in zip(protobufs, features):
+        np.testing.assert_allclose(normalize_landmarks(protobuf), expected, atol=1e-6)